@@ -0,0 +1,5 @@
+"""
+Headless performance benchmarks for the task list.
+
+Run with ``python -m benchmarks.bench run``; see benchmarks/bench.py.
+"""
@@ -0,0 +1,394 @@
+"""
+Benchmark suite - Times the task list on synthetic task files, headless.
+
+Usage:
+    python -m benchmarks.bench run [--sizes 100 1000 ...] [-o results.json]
+    python -m benchmarks.bench compare baseline.json results.json
+
+Each size runs in its own process under QT_QPA_PLATFORM=offscreen, with
+its own temporary data directory, so peak memory is per size and the real
+task files are never touched. Results are JSON; compare exits with status
+1 when a benchmark got slower (or bigger) than the baseline by more than
+the threshold.
+
+To compare the JSON and binary task file formats, run the suite once per
+backend and compare the results (file_kib and storage_load show the
+formats themselves, without the widget):
+
+    python -m benchmarks.bench run --storage json -o json.json
+    python -m benchmarks.bench run --storage binary -o binary.json
+    python -m benchmarks.bench compare json.json binary.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+DEFAULT_SIZES = (100, 1000, 10000, 100000)
+DEFAULT_REPEAT = 5
+
+# Single operations (add/remove/save) are timed this many times per repeat
+OPS_PER_REPEAT = 20
+
+# Frame step used to drive the expand/collapse animation (~60 fps)
+FRAME_MS = 16
+
+# Changes smaller than this are noise, whatever the ratio
+NOISE_FLOOR_MS = 0.05
+
+_WORDS = ("buy", "call", "email", "fix", "write", "review", "plan", "book",
+          "milk", "report", "the", "team", "dentist", "release", "notes",
+          "invoice", "garden", "tickets", "slides", "backup")
+
+
+# -- synthetic data --------------------------------------------------------
+
+def synthetic_tasks(count, seed=0):
+    """
+    Generate reproducible task dicts of varying length.
+
+    Args:
+        count (int): Number of tasks
+        seed (int): Random seed
+
+    Returns:
+        list: Task dicts in storage format, a third of them checked
+    """
+    rng = random.Random(seed)
+    now = time.time()
+    ids = rng.sample(range(1, 2 ** 53), count)
+    return [{"id": ids[i],
+             "text": " ".join(rng.choice(_WORDS) for _ in range(rng.randint(2, 24))),
+             "checked": i % 3 == 0,
+             "created": now - (count - i)}
+            for i in range(count)]
+
+
+def write_task_file(storage, tasks):
+    """Store tasks as a fresh task file in the given backend."""
+    from storage.journal import add_record, clear_record
+
+    if hasattr(storage, "journal"):
+        storage.journal.write_snapshot(tasks)
+    else:
+        storage.apply([clear_record()] + [add_record(task) for task in tasks])
+
+
+def stored_size_kib(storage):
+    """Return the size of the files a backend watches, in KiB."""
+    return sum(os.path.getsize(path) for path in storage.watch_paths()
+               if os.path.exists(path)) // 1024
+
+
+# -- timing helpers --------------------------------------------------------
+
+def _summary(samples):
+    """Summarize timings in milliseconds."""
+    return {"median_ms": round(statistics.median(samples), 4),
+            "min_ms": round(min(samples), 4),
+            "max_ms": round(max(samples), 4),
+            "runs": len(samples)}
+
+
+def _time_ms(fn):
+    """Return how long fn() takes, in milliseconds."""
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000.0
+
+
+def _peak_rss_kib():
+    """Return the peak resident set size of this process in KiB, if known."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+# -- benchmarks ------------------------------------------------------------
+
+def _drive_animation(widget, app, expand):
+    """
+    Run the expand or collapse animation frame by frame.
+
+    Returns:
+        list: Milliseconds spent on each frame (property update + repaint)
+    """
+    animation = widget.expand_anim
+    if expand:
+        widget.expand()
+    else:
+        widget.collapse()
+    # Take over the clock: frames are stepped here instead of by the timer
+    animation.pause()
+    frames = []
+    duration = animation.duration()
+    for t in list(range(0, duration, FRAME_MS)) + [duration]:
+        def frame():
+            animation.setCurrentTime(t)
+            widget.repaint()
+        frames.append(_time_ms(frame))
+    widget.finish_animation()
+    app.processEvents()
+    return frames
+
+
+def run_size(size, backend, repeat):
+    """
+    Run every benchmark on a task file of the given size.
+
+    Must be called in a fresh process: it creates the QApplication and
+    reads the peak RSS of the whole process.
+
+    Returns:
+        dict: Benchmark name to timing summary, plus memory figures
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    from storage import open_storage
+    from widgets import GlassTaskList
+
+    app = QApplication(sys.argv[:1])
+    results = {}
+
+    storage = open_storage(backend)
+    write_task_file(storage, synthetic_tasks(size))
+    results["file_kib"] = stored_size_kib(storage)
+    results["storage_load"] = _summary(
+        [_time_ms(storage.load) for _ in range(repeat)])
+
+    widget = GlassTaskList(storage=storage)
+    widget.load_tasks(blocking=True)
+    widget.show()
+    app.processEvents()
+
+    results["load_tasks"] = _summary(
+        [_time_ms(lambda: widget.load_tasks(blocking=True)) for _ in range(repeat)])
+
+    tracemalloc.start()
+    widget.load_tasks(blocking=True)
+    results["load_peak_heap_kib"] = tracemalloc.get_traced_memory()[1] // 1024
+    tracemalloc.stop()
+
+    results["paint_collapsed"] = _summary(
+        [_time_ms(widget.repaint) for _ in range(repeat * OPS_PER_REPEAT)])
+
+    expand_frames = []
+    collapse_frames = []
+    for _ in range(repeat):
+        expand_frames.extend(_drive_animation(widget, app, expand=True))
+        collapse_frames.extend(_drive_animation(widget, app, expand=False))
+    results["expand_frame"] = _summary(expand_frames)
+    results["collapse_frame"] = _summary(collapse_frames)
+
+    _drive_animation(widget, app, expand=True)
+    results["paint_expanded"] = _summary(
+        [_time_ms(widget.repaint) for _ in range(repeat * OPS_PER_REPEAT)])
+
+    view = widget.task_view
+    scroll_samples = []
+    for _ in range(repeat):
+        view.scrollToTop()
+        app.processEvents()
+
+        def scroll():
+            view.scrollToBottom()
+            view.viewport().repaint()
+        scroll_samples.append(_time_ms(scroll))
+    results["scroll_to_end"] = _summary(scroll_samples)
+
+    def add():
+        widget.task_input.setText("benchmark task")
+        widget.add_task()
+    results["add_task"] = _summary(
+        [_time_ms(add) for _ in range(repeat * OPS_PER_REPEAT)])
+
+    save_samples = []
+    for _ in range(repeat * OPS_PER_REPEAT):
+        add()
+        save_samples.append(_time_ms(widget.save_tasks))
+    results["save_tasks"] = _summary(save_samples)
+
+    results["remove_task"] = _summary(
+        [_time_ms(lambda: widget.remove_task(0)) for _ in range(repeat * OPS_PER_REPEAT)])
+    widget.save_tasks()
+
+    def move():
+        # The longest move there is: the last task to the top
+        widget.task_model.move_row(widget.task_model.rowCount() - 1, 0)
+        view.viewport().repaint()
+    results["move_task"] = _summary(
+        [_time_ms(move) for _ in range(repeat * OPS_PER_REPEAT)])
+    widget.save_tasks()
+
+    tasks = widget.task_model.tasks()
+    check_samples = []
+    clear_samples = []
+    for _ in range(repeat):
+        # Restore the list without persisting it
+        widget.task_model.set_tasks(tasks)
+        check_samples.append(_time_ms(lambda: widget.set_all_checked(True)))
+        clear_samples.append(_time_ms(widget.clear_completed))
+        widget.save_tasks()
+    results["check_all"] = _summary(check_samples)
+    results["bulk_clear"] = _summary(clear_samples)
+
+    widget._shutdown_persistence()
+    results["peak_rss_kib"] = _peak_rss_kib()
+    return results
+
+
+def run(sizes, backend, repeat):
+    """
+    Run the suite, one subprocess per size.
+
+    Returns:
+        dict: Metadata and per-size results
+    """
+    from PyQt5.QtCore import QT_VERSION_STR
+
+    results = {}
+    for size in sizes:
+        print(f"Benchmarking {size:,} tasks ({backend})...", file=sys.stderr)
+        with tempfile.TemporaryDirectory(prefix="taskinator-bench-") as tmp:
+            output = Path(tmp) / "result.json"
+            env = dict(os.environ, TASKINATOR_DATA_DIR=str(Path(tmp) / "data"))
+            env.setdefault("QT_QPA_PLATFORM", "offscreen")
+            subprocess.run([sys.executable, "-m", "benchmarks.bench", "_size",
+                            str(size), "--storage", backend, "--repeat", str(repeat),
+                            "--output", str(output)],
+                           cwd=str(Path(__file__).parent.parent), env=env, check=True,
+                           stdout=subprocess.DEVNULL)
+            results[str(size)] = json.loads(output.read_text())
+
+    return {"meta": {"created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                     "python": platform.python_version(),
+                     "qt": QT_VERSION_STR,
+                     "platform": platform.platform(),
+                     "storage": backend,
+                     "repeat": repeat},
+            "results": results}
+
+
+# -- comparison ------------------------------------------------------------
+
+def compare(baseline, current, threshold):
+    """
+    Compare two result files.
+
+    A timing regresses when its median grows by more than threshold (a
+    fraction) and by more than NOISE_FLOOR_MS; memory figures regress when
+    they grow by more than threshold.
+
+    Returns:
+        list: (size, name, baseline, current, ratio, regressed) rows
+    """
+    rows = []
+    for size, current_results in current["results"].items():
+        baseline_results = baseline["results"].get(size)
+        if baseline_results is None:
+            continue
+        for name, value in current_results.items():
+            base = baseline_results.get(name)
+            if base is None or value is None:
+                continue
+            if isinstance(value, dict):
+                base, value = base["median_ms"], value["median_ms"]
+                grew = value - base > NOISE_FLOOR_MS
+            else:
+                grew = value > base
+            ratio = value / base if base else float("inf") if value else 1.0
+            rows.append((size, name, base, value, ratio, grew and ratio > 1 + threshold))
+    return rows
+
+
+def print_comparison(rows):
+    """Print a comparison table."""
+    print(f"{'size':>7}  {'benchmark':<20} {'baseline':>16} {'current':>16} {'change':>8}")
+    for size, name, base, value, ratio, regressed in rows:
+        unit = "KiB" if name.endswith("_kib") else "ms"
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{size:>7}  {name:<20} {base:>12.3f} {unit:<3} {value:>12.3f} {unit:<3}"
+              f"{(ratio - 1) * 100:>+8.1f}%{flag}")
+
+
+# -- command line ----------------------------------------------------------
+
+def parse_args(argv):
+    """Parse benchmark options."""
+    from storage import BACKENDS
+
+    parser = argparse.ArgumentParser(description="Taskinator benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                            help="task counts to benchmark (default: %(default)s)")
+    run_parser.add_argument("--storage", choices=BACKENDS, default="json",
+                            help="storage backend (default: json)")
+    run_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                            help="repetitions per benchmark (default: %(default)s)")
+    run_parser.add_argument("-o", "--output",
+                            help="write results to this file instead of stdout")
+
+    compare_parser = commands.add_parser("compare", help="compare against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.25,
+                                help="allowed slowdown as a fraction (default: %(default)s)")
+
+    # Internal: benchmark one size in this process
+    size_parser = commands.add_parser("_size")
+    size_parser.add_argument("size", type=int)
+    size_parser.add_argument("--storage", default="json")
+    size_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    size_parser.add_argument("--output", required=True)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Entry point; returns the process exit status."""
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.command == "_size":
+        results = run_size(args.size, args.storage, args.repeat)
+        Path(args.output).write_text(json.dumps(results))
+        return 0
+
+    if args.command == "run":
+        data = json.dumps(run(args.sizes, args.storage, args.repeat), indent=2)
+        if args.output:
+            Path(args.output).write_text(data + "\n")
+        else:
+            print(data)
+        return 0
+
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    rows = compare(baseline, current, args.threshold)
+    print_comparison(rows)
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+"""
+Command line - Lists and edits tasks without starting Qt.
+
+    python main.py list [--open | --done]
+    python main.py add "Call Bob"
+    python main.py done ID [ID ...]
+    python main.py rm ID [ID ...]
+    python main.py export [--format json|csv|markdown] [-o FILE]
+    python main.py archive [--keep N] [--older-than DAYS]
+    python main.py stats
+
+Every command takes --list NAME and --storage BACKEND. By default they
+act on the list shown in the running window, with its backend, or on the
+default list when no window runs. Works straight on the storage layer
+and never imports PyQt5, so a call costs tens of milliseconds. Changes
+to the list a window shows are sent to it (see ipc.py) so it shows them
+at once; others are written to storage, where the app picks them up.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import ipc
+from storage import BACKENDS, DEFAULT_LIST, list_names, open_archive, open_storage
+from storage.archive import KEEP_COMPLETED, select_completed
+from storage.journal import add_record, checked_many_record, remove_many_record
+from storage.tasks import new_task
+
+COMMANDS = ("list", "add", "done", "rm", "export", "archive", "stats")
+
+EXPORT_FORMATS = ("json", "csv", "markdown")
+
+
+def parse_args(argv):
+    """Parse a command line whose first argument is one of COMMANDS."""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--list", dest="list_name", metavar="NAME",
+                        help="task list (default: the one the running window shows, "
+                             "else the default list)")
+    common.add_argument("--storage", choices=BACKENDS,
+                        help="storage backend (default: the running window's, "
+                             "else json or $TASKINATOR_STORAGE)")
+
+    parser = argparse.ArgumentParser(prog="main.py",
+                                     description="Glass Task Manager command line")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", parents=[common],
+                                      help="print tasks, one per line, after their ID")
+    state = list_parser.add_mutually_exclusive_group()
+    state.add_argument("--open", action="store_true", help="only open tasks")
+    state.add_argument("--done", action="store_true", help="only completed tasks")
+    state.add_argument("--archived", action="store_true",
+                       help="archived tasks instead, oldest first")
+
+    add_parser = commands.add_parser("add", parents=[common], help="add a task")
+    add_parser.add_argument("text", nargs="+", help="task text")
+
+    done_parser = commands.add_parser("done", parents=[common], help="mark tasks done")
+    done_parser.add_argument("ids", type=int, nargs="+", metavar="ID")
+
+    rm_parser = commands.add_parser("rm", parents=[common], help="remove tasks")
+    rm_parser.add_argument("ids", type=int, nargs="+", metavar="ID")
+
+    export_parser = commands.add_parser("export", parents=[common], help="export tasks")
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS, default="json",
+                               help="output format (default: json)")
+    export_parser.add_argument("-o", "--output", metavar="FILE",
+                               help="write to FILE instead of stdout")
+
+    archive_parser = commands.add_parser(
+        "archive", parents=[common], help="move completed tasks to the archive")
+    archive_parser.add_argument("--keep", type=int, metavar="N",
+                                help=f"completed tasks to keep in the list, the latest "
+                                     f"(default: {KEEP_COMPLETED} unless --older-than is given)")
+    archive_parser.add_argument("--older-than", type=float, metavar="DAYS",
+                                help="archive completed tasks created more than DAYS ago")
+
+    commands.add_parser("stats", parents=[common], help="count tasks")
+    return parser.parse_args(argv)
+
+
+class Target:
+    """
+    The list a command works on, and the running window if it shows it.
+
+    Args:
+        list_name (str, optional): List given on the command line
+        backend (str, optional): Backend given on the command line
+    """
+
+    def __init__(self, list_name=None, backend=None):
+        status = self._instance_status()
+        shown = None
+        if status is not None:
+            shown = status.get("list")
+            backend = backend or status.get("storage")
+        self.list_name = list_name or shown or DEFAULT_LIST
+        self.backend = backend
+        # Changes to the shown list go through the window
+        self.instance = status is not None and self.list_name == shown \
+            and backend == status.get("storage")
+
+    @staticmethod
+    def _instance_status():
+        """Return the running window's status reply, or None."""
+        try:
+            reply = ipc.send_command({"cmd": "status"})
+        except (OSError, ValueError):
+            return None
+        return reply if reply and reply.get("ok") else None
+
+    def send(self, command):
+        """Send a command about this list to the running window."""
+        command["list"] = self.list_name
+        return ipc.send_command(command) or {"ok": False, "error": "the window has closed"}
+
+    def open(self):
+        """Open the list's storage; raises LookupError if the list does not exist."""
+        if self.list_name not in list_names(self.backend):
+            raise LookupError(f"No list named {self.list_name!r}")
+        return open_storage(self.backend, self.list_name)
+
+
+# -- commands --------------------------------------------------------------
+
+def cmd_list(args, target, out):
+    """Print tasks as "ID<tab>[x] text" lines."""
+    if args.archived:
+        for task in open_archive(target.backend, target.list_name).iter_tasks():
+            out.write(f"{task['id']}\t[x] {task['text']}\n")
+        return 0
+    storage = target.open()
+    try:
+        for task in storage.iter_load(only_open=args.open):
+            if args.done and not task["checked"]:
+                continue
+            out.write(f"{task['id']}\t[{'x' if task['checked'] else ' '}] {task['text']}\n")
+    finally:
+        storage.close()
+    return 0
+
+
+def cmd_add(args, target, out):
+    """Add one task and print its ID."""
+    text = " ".join(args.text).strip()
+    if not text:
+        print("Task text is empty.", file=sys.stderr)
+        return 1
+    if target.instance:
+        reply = target.send({"cmd": "add", "text": text})
+        if not reply.get("ok"):
+            print(reply.get("error", "Command failed"), file=sys.stderr)
+            return 1
+        task_id = reply["id"]
+    else:
+        storage = open_storage(target.backend, target.list_name)
+        try:
+            if not storage.exists():
+                storage.create()
+            task = new_task(text)
+            storage.apply([add_record(task)])
+            task_id = task["id"]
+        finally:
+            storage.close()
+    out.write(f"{task_id}\n")
+    return 0
+
+
+def _change_tasks(args, target, command, record_fn):
+    """
+    Apply done/rm to the given IDs, reporting the ones not in the list.
+
+    Args:
+        command (str): IPC command name
+        record_fn (callable): Builds the journal record for a list of IDs
+    """
+    task_ids = list(dict.fromkeys(args.ids))
+    if target.instance:
+        reply = target.send({"cmd": command, "ids": task_ids})
+        if not reply.get("ok"):
+            print(reply.get("error", "Command failed"), file=sys.stderr)
+            return 1
+        missing = reply.get("missing", [])
+    else:
+        storage = target.open()
+        try:
+            stored = {task["id"] for task in storage.load()}
+            found = [task_id for task_id in task_ids if task_id in stored]
+            missing = [task_id for task_id in task_ids if task_id not in stored]
+            if found:
+                storage.apply([record_fn(found)])
+        finally:
+            storage.close()
+    for task_id in missing:
+        print(f"No task {task_id} in list {target.list_name!r}", file=sys.stderr)
+    return 1 if missing else 0
+
+
+def cmd_done(args, target, out):
+    """Mark tasks done."""
+    return _change_tasks(args, target, "done",
+                         lambda task_ids: checked_many_record(task_ids, True))
+
+
+def cmd_rm(args, target, out):
+    """Remove tasks."""
+    return _change_tasks(args, target, "rm", remove_many_record)
+
+
+def cmd_export(args, target, out):
+    """Write every task in the chosen format."""
+    storage = target.open()
+    try:
+        tasks = storage.iter_load()
+        if args.output:
+            with open(args.output, "w", encoding="utf-8", newline="") as f:
+                _export(tasks, args.format, f)
+        else:
+            _export(tasks, args.format, out)
+    finally:
+        storage.close()
+    return 0
+
+
+def _export(tasks, fmt, out):
+    """Write tasks to a text stream as json, csv or markdown."""
+    if fmt == "json":
+        json.dump(list(tasks), out, indent=2, ensure_ascii=False)
+        out.write("\n")
+    elif fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(["id", "text", "checked", "created"])
+        for task in tasks:
+            writer.writerow([task["id"], task["text"], int(task["checked"]), task["created"]])
+    else:
+        for task in tasks:
+            out.write(f"- [{'x' if task['checked'] else ' '}] {task['text']}\n")
+
+
+def cmd_archive(args, target, out):
+    """Move completed tasks to the list's archive and print how many moved."""
+    keep = args.keep
+    if keep is None and args.older_than is None:
+        keep = KEEP_COMPLETED
+    if target.instance:
+        reply = target.send({"cmd": "archive", "keep": keep, "older_than": args.older_than})
+        if not reply.get("ok"):
+            print(reply.get("error", "Command failed"), file=sys.stderr)
+            return 1
+        count = reply["archived"]
+    else:
+        storage = target.open()
+        try:
+            tasks = [task for task in storage.load() if task["checked"]]
+            task_ids = set(select_completed([(task["id"], task["created"]) for task in tasks],
+                                            keep, args.older_than, time.time()))
+            tasks = [task for task in tasks if task["id"] in task_ids]
+            # Into the archive first: a crash in between duplicates, never loses
+            open_archive(target.backend, target.list_name).append(tasks)
+            if tasks:
+                storage.apply([remove_many_record(task["id"] for task in tasks)])
+            count = len(tasks)
+        finally:
+            storage.close()
+    out.write(f"Archived {count:,} task{'s' if count != 1 else ''}\n")
+    return 0
+
+
+def cmd_stats(args, target, out):
+    """Print task counts for the list."""
+    storage = target.open()
+    try:
+        total = storage.count()
+        done = storage.count(checked=True) if total else 0
+        location = storage.location
+    finally:
+        storage.close()
+    archived = open_archive(target.backend, target.list_name).count()
+    percent = f" ({done * 100 // total}%)" if total else ""
+    out.write(f"list     {target.list_name}\n"
+              f"storage  {location}\n"
+              f"tasks    {total:,}\n"
+              f"done     {done:,}{percent}\n"
+              f"open     {total - done:,}\n"
+              f"archived {archived:,}\n")
+    return 0
+
+
+HANDLERS = {"list": cmd_list, "add": cmd_add, "done": cmd_done, "rm": cmd_rm,
+            "export": cmd_export, "archive": cmd_archive, "stats": cmd_stats}
+
+
+def main(argv):
+    """
+    Run a command.
+
+    Args:
+        argv (list): Arguments after the program name, starting with the command
+
+    Returns:
+        int: Process exit status
+    """
+    args = parse_args(argv)
+    try:
+        target = Target(args.list_name, args.storage)
+        return HANDLERS[args.command](args, target, sys.stdout)
+    except LookupError as e:
+        print(e.args[0], file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # Output piped into something like head that stopped reading
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
@@ -0,0 +1,108 @@
+"""
+Instance IPC - Talks to the running app over a local socket, without Qt.
+
+The first instance listens on a QLocalServer (see widgets/command_server.py)
+named by server_name(). Later invocations send it one command per line as
+JSON and read one JSON reply line back:
+
+    {"cmd": "add", "text": "Call Bob"}     ->  {"ok": true, "id": 17}
+    {"cmd": "done", "id": 17}              ->  {"ok": true}
+    {"cmd": "show"}                        ->  {"ok": true}
+
+Failed commands reply {"ok": false, "error": "..."}. On Unix the server
+name is an absolute socket path, which QLocalServer uses as is, so plain
+Python sockets can connect; on Windows it is a named pipe.
+"""
+
+import getpass
+import hashlib
+import json
+import os
+import socket
+import sys
+import tempfile
+
+# How long a client waits for the running instance to answer
+TIMEOUT = 2.0
+
+
+def server_name():
+    """
+    Return the name the running instance listens on.
+
+    One instance serves each data directory, so benchmark runs and tests
+    with their own TASKINATOR_DATA_DIR never talk to the real app.
+    """
+    from storage.factory import data_dir
+
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "user"
+    digest = hashlib.sha1(str(data_dir().resolve()).encode("utf-8")).hexdigest()[:12]
+    name = f"taskinator-{user}-{digest}"
+    if sys.platform == "win32":
+        return name
+    # Unix socket paths are limited to ~100 bytes, so not under the data dir
+    runtime = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime, name + ".sock")
+
+
+def encode(message):
+    """Return a command or reply as one line of bytes."""
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def decode(line):
+    """Parse a command or reply line; raises ValueError if it is not a JSON object."""
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError("expected a JSON object")
+    return message
+
+
+def send_command(command, timeout=TIMEOUT):
+    """
+    Send a command to the running instance.
+
+    Args:
+        command (dict): Command with a "cmd" key
+        timeout (float): Seconds to wait for the reply
+
+    Returns:
+        dict: The reply, or None if no instance is running
+    """
+    name = server_name()
+    if sys.platform == "win32":
+        return _send_pipe(r"\\.\pipe" + "\\" + name, command)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        try:
+            sock.connect(name)
+        except (FileNotFoundError, ConnectionRefusedError):
+            # No socket, or a stale one left by a crash
+            return None
+        sock.sendall(encode(command))
+        with sock.makefile("rb") as reply:
+            return decode(reply.readline())
+    finally:
+        sock.close()
+
+
+def _send_pipe(path, command):
+    """send_command() over a Windows named pipe."""
+    try:
+        pipe = open(path, "r+b", buffering=0)
+    except FileNotFoundError:
+        return None
+    with pipe:
+        pipe.write(encode(command))
+        line = b""
+        while not line.endswith(b"\n"):
+            chunk = pipe.read(1)
+            if not chunk:
+                break
+            line += chunk
+        return decode(line)
@@ -6,27 +6,183 @@ Features expandable/collapsible interface with smooth animations.
 """
 
 import sys
-from PyQt5.QtWidgets import QApplication
-from widgets import GlassTaskList
+import os
+import argparse
+import logging
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent))
 
+import cli
+import ipc
+import metrics
+import profiling
+from storage import BACKENDS
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+
+def parse_args(argv):
+    """Parse application options, leaving Qt's own arguments alone."""
+    parser = argparse.ArgumentParser(description="Glass Task Manager")
+    parser.add_argument("--storage", choices=BACKENDS,
+                        help="task storage backend (default: json, or $TASKINATOR_STORAGE)")
+    parser.add_argument("--list", metavar="NAME",
+                        help="task list to open (default: the one opened last)")
+    parser.add_argument("--profile-startup", nargs="?", const="startup.prof",
+                        metavar="PATH",
+                        help="report startup phase times on stderr and write a "
+                             "cProfile dump to PATH (default: startup.prof)")
+    parser.add_argument("--log-level", type=str.upper, choices=LOG_LEVELS,
+                        help="log messages of this level and above "
+                             "(default: WARNING, or $TASKINATOR_LOG_LEVEL)")
+    parser.add_argument("--metrics", metavar="PATH",
+                        default=os.environ.get("TASKINATOR_METRICS"),
+                        help="write metrics as JSON to PATH on exit and on SIGUSR1 "
+                             "(default: $TASKINATOR_METRICS; SIGUSR1 alone prints "
+                             "them to stderr)")
+    return parser.parse_known_args(argv[1:])
+
+
+def _setup_logging(level=None):
+    """Send log messages to stderr, at the given level or $TASKINATOR_LOG_LEVEL."""
+    level = (level or os.environ.get("TASKINATOR_LOG_LEVEL") or "WARNING").upper()
+    logging.basicConfig(level=level if level in LOG_LEVELS else "WARNING",
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+
+def _command_argv(argv):
+    """
+    Return the arguments for cli.main() if argv runs a command-line
+    command, possibly after --storage/--list options; otherwise None.
+    """
+    i = 1
+    while i < len(argv) and argv[i].split("=")[0] in ("--storage", "--list"):
+        i += 1 if "=" in argv[i] else 2
+    if i < len(argv) and argv[i] in cli.COMMANDS:
+        # Options go after the command for its parser
+        return [argv[i]] + argv[1:i] + argv[i + 1:]
+    return None
+
+
+def _profile_first_paint(profiler, widget, app):
+    """Close the load and first-paint phases, then report once both are done."""
+    from PyQt5.QtCore import QObject, QEvent, QTimer
+
+    pending = {"load", "first paint"}
+
+    def phase_done(name):
+        if name in pending:
+            pending.discard(name)
+            profiler.end(name)
+            if not pending:
+                profiler.finish()
+
+    class FirstPaintFilter(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                obj.removeEventFilter(self)
+                # End the phase once the paint has been handled
+                QTimer.singleShot(0, lambda: phase_done("first paint"))
+            return False
+
+    paint_filter = FirstPaintFilter(app)
+    widget.installEventFilter(paint_filter)
+    widget.loading_finished.connect(lambda: phase_done("load"))
+    if not widget.is_loading():
+        phase_done("load")
+
+
+def _install_signal_handlers(app, metrics_path):
+    """
+    Quit cleanly on SIGINT/SIGTERM, so pending saves are written, and dump
+    metrics on SIGUSR1 where the platform has it.
+
+    Python only runs signal handlers between bytecodes, which it rarely
+    gets to while Qt's event loop waits; the wakeup fd wakes it up.
+    """
+    import signal
+    import socket
+    from PyQt5.QtCore import QSocketNotifier, QTimer
+
+    reader, writer = socket.socketpair()
+    reader.setblocking(False)
+    writer.setblocking(False)
+    signal.set_wakeup_fd(writer.fileno())
+    notifier = QSocketNotifier(reader.fileno(), QSocketNotifier.Read, app)
+    # The handlers themselves run as soon as Python regains control
+    notifier.activated.connect(lambda: reader.recv(64))
+    notifier.sockets = (reader, writer)
+
+    signal.signal(signal.SIGINT, lambda *args: app.quit())
+    signal.signal(signal.SIGTERM, lambda *args: app.quit())
+    if hasattr(signal, "SIGUSR1"):
+        # The handler may interrupt code holding the registry lock, so the
+        # dump itself waits for the event loop
+        signal.signal(signal.SIGUSR1, lambda *args: QTimer.singleShot(
+            0, lambda: metrics.registry.dump(metrics_path)))
+
 
 def main():
     """Initialize and run the application."""
-    app = QApplication(sys.argv)
-    
-    # Set application metadata
-    app.setApplicationName("Glass Task Manager")
-    app.setOrganizationName("GlassApps")
-    
-    # Create and show main widget
-    widget = GlassTaskList()
+    # Command-line use never imports Qt
+    command_argv = _command_argv(sys.argv)
+    if command_argv is not None:
+        _setup_logging()
+        sys.exit(cli.main(command_argv))
+
+    args, qt_args = parse_args(sys.argv)
+    _setup_logging(args.log_level)
+    profiler = None
+    if args.profile_startup:
+        profiler = profiling.StartupProfiler(args.profile_startup)
+        profiler.start()
+
+    # One window per data directory: launching again raises the first one
+    with profiling.phase("instance check"):
+        try:
+            running = ipc.send_command({"cmd": "show"}) is not None
+        except (OSError, ValueError):
+            # Hung or not ours; take over the socket
+            running = False
+    if running:
+        print("Glass Task Manager is already running.")
+        if profiler is not None:
+            profiler.finish()
+        return
+
+    with profiling.phase("imports"):
+        from PyQt5.QtWidgets import QApplication
+        from widgets import GlassTaskList
+        from widgets.command_server import CommandServer
+
+    with profiling.phase("QApplication"):
+        app = QApplication(sys.argv[:1] + qt_args)
+
+        # Set application metadata
+        app.setApplicationName("Glass Task Manager")
+        app.setOrganizationName("GlassApps")
+
+    # Create and show main widget; loading starts here and finishes in
+    # later event-loop ticks
+    if profiler is not None:
+        profiler.begin("load")
+    with profiling.phase("window setup"):
+        widget = GlassTaskList(backend=args.storage, list_name=args.list)
+        server = CommandServer(widget.handle_command, app)
+        server.listen()
+        app.aboutToQuit.connect(server.close)
+        _install_signal_handlers(app, args.metrics)
+    if profiler is not None:
+        profiler.begin("first paint")
+        _profile_first_paint(profiler, widget, app)
     widget.show()
-    
-    # Start event loop
-    sys.exit(app.exec_())
+
+    # Start event loop; pending saves are flushed on the way out
+    status = app.exec_()
+    if args.metrics:
+        metrics.registry.dump(args.metrics)
+    sys.exit(status)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,167 @@
+"""
+Metrics - Counters, gauges and latency histograms for hot paths.
+
+Code anywhere in the app records into the shared registry:
+
+    metrics.count("save.records", len(batch))
+    metrics.set_gauge("tasks", len(store))
+    with metrics.timed("load.seconds"):
+        ...
+
+Recording is a dict lookup and a bisect under a lock, cheap enough for
+paint handlers, and safe from the background writer thread. main.py can
+write snapshot() as JSON on exit or on SIGUSR1 (see --metrics).
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds: 25 µs doubling up to ~26 s;
+# slower observations land in a final overflow bucket
+BUCKETS = tuple(0.000025 * 2 ** i for i in range(21))
+
+
+class Histogram:
+    """
+    Distribution of observed durations in fixed exponential buckets.
+
+    Args:
+        bounds (tuple): Ascending bucket upper bounds
+    """
+
+    __slots__ = ("bounds", "counts", "count", "total", "min", "max")
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value):
+        """Add one observation."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """
+        Estimate a quantile as the upper bound of the bucket holding it.
+
+        Args:
+            q (float): Quantile between 0 and 1
+
+        Returns:
+            float: Estimated value, or 0.0 with no observations
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self):
+        """Return a JSON-ready summary with the non-empty buckets."""
+        if not self.count:
+            return {"count": 0}
+        buckets = {("inf" if i == len(self.bounds) else f"{self.bounds[i]:.6g}"): n
+                   for i, n in enumerate(self.counts) if n}
+        return {"count": self.count, "sum": self.total, "min": self.min, "max": self.max,
+                "mean": self.total / self.count, "p50": self.quantile(0.5),
+                "p90": self.quantile(0.9), "p99": self.quantile(0.99), "buckets": buckets}
+
+
+class Registry:
+    """Named counters, gauges and histograms shared across threads."""
+
+    def __init__(self):
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+
+    def count(self, name, n=1):
+        """Add n to a counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def set_gauge(self, name, value):
+        """Set a gauge to its current value."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name, seconds):
+        """Add a duration to a histogram."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timed(self, name):
+        """Observe how long the enclosed block takes."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def snapshot(self):
+        """Return every metric as a JSON-ready dict."""
+        with self._lock:
+            return {"started": self.started, "time": time.time(),
+                    "counters": dict(self._counters), "gauges": dict(self._gauges),
+                    "histograms": {name: histogram.to_dict()
+                                   for name, histogram in sorted(self._histograms.items())}}
+
+    def dump(self, path=None):
+        """
+        Write snapshot() as JSON.
+
+        Args:
+            path (str, optional): File to replace; stderr when None
+        """
+        data = json.dumps(self.snapshot(), indent=2, sort_keys=True)
+        if path is None:
+            sys.stderr.write(data + "\n")
+            return
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(data + "\n")
+        except OSError as e:
+            log.error("Could not write metrics to %s: %s", path, e)
+        else:
+            log.info("Metrics written to %s", path)
+
+    def reset(self):
+        """Forget every metric."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+registry = Registry()
+
+count = registry.count
+set_gauge = registry.set_gauge
+observe = registry.observe
+timed = registry.timed
@@ -0,0 +1,94 @@
+"""
+Startup profiling - Per-phase timings and a cProfile dump of app startup.
+
+Enabled with ``main.py --profile-startup``. Code anywhere in the app can
+mark a phase with ``profiling.phase(name)``; it costs nothing when no
+profiler is active.
+"""
+
+import cProfile
+import sys
+import time
+from contextlib import contextmanager
+
+
+_active = None
+
+
+class StartupProfiler:
+    """
+    Records how long each startup phase takes and profiles the whole run.
+
+    Phases are either timed blocks (``phase()``) or spans opened with
+    ``begin()`` and closed later with ``end()``, for phases such as task
+    loading that finish in a later event-loop tick.
+
+    Args:
+        dump_path (str): File the cProfile statistics are written to
+    """
+
+    def __init__(self, dump_path):
+        self.dump_path = dump_path
+        self.started = time.perf_counter()
+        self.phases = []
+        self._open = {}
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        """Make this the active profiler and start collecting call stats."""
+        global _active
+        _active = self
+        self._profile.enable()
+
+    def begin(self, name):
+        """Open a phase that is closed later with end()."""
+        self._open[name] = time.perf_counter()
+
+    def end(self, name):
+        """Close a phase opened with begin(); ignored if it is not open."""
+        started = self._open.pop(name, None)
+        if started is not None:
+            self.phases.append((name, started, time.perf_counter()))
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as a phase."""
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def finish(self):
+        """
+        Stop profiling, write the cProfile dump and print the phase report
+        to stderr.
+        """
+        global _active
+        self._profile.disable()
+        if _active is self:
+            _active = None
+        self._profile.dump_stats(self.dump_path)
+
+        total = time.perf_counter() - self.started
+        print("Startup phases (ms since start / duration):", file=sys.stderr)
+        for name, started, ended in sorted(self.phases, key=lambda p: p[1]):
+            print(f"  {name:<14} {(started - self.started) * 1000:8.1f} "
+                  f"{(ended - started) * 1000:8.1f}", file=sys.stderr)
+        print(f"  {'total':<14} {total * 1000:8.1f}", file=sys.stderr)
+        print(f"cProfile stats written to {self.dump_path}", file=sys.stderr)
+
+
+@contextmanager
+def phase(name):
+    """Time the enclosed block on the active profiler, if there is one."""
+    if _active is None:
+        yield
+        return
+    with _active.phase(name):
+        yield
+
+
+def active():
+    """Return the active StartupProfiler, or None."""
+    return _active
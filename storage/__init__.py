@@ -0,0 +1,23 @@
+"""
+Storage package for Glass Task Manager.
+Contains task persistence helpers that do not depend on Qt.
+"""
+
+from .atomic import atomic_write_bytes
+from .writer import PersistenceWorker
+from .journal import TaskJournal
+from .base import TaskStorage
+from .json_store import JsonTaskStorage
+from .binary_store import BinaryTaskStorage
+from .sqlite_store import SqliteTaskStorage
+from .task_store import Task, TaskStore
+from .text_index import TextIndex
+from .history import UndoHistory
+from .archive import TaskArchive
+from .factory import (BACKENDS, DEFAULT_LIST, data_dir, list_names, open_archive,
+                      open_storage)
+
+__all__ = ['atomic_write_bytes', 'PersistenceWorker', 'TaskJournal', 'Task', 'TaskStore',
+           'TextIndex', 'UndoHistory', 'TaskArchive', 'TaskStorage', 'JsonTaskStorage',
+           'BinaryTaskStorage', 'SqliteTaskStorage', 'BACKENDS', 'DEFAULT_LIST', 'data_dir',
+           'list_names', 'open_archive', 'open_storage']
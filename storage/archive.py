@@ -0,0 +1,222 @@
+"""
+TaskArchive - Append-only, compressed store of completed tasks.
+
+Archived tasks leave the list's storage backend and TaskStore for good,
+so loads, saves and memory follow the tasks still in the list. Each
+list's archive is a directory of segments:
+
+    seg-000001.ndjson.gz   gzip members, each a block of NDJSON task lines
+    seg-000001.idx         one "offset length count" line per member
+
+Archiving appends whole members to the newest segment, then their index
+lines; a member without an index line (a crash in between) is cut off by
+the next append. Every gzip member inflates on its own, so reading a
+range of tasks seeks to the blocks holding it and decompresses only
+those: the archive is never read whole. `zcat seg-*.ndjson.gz` still
+prints the plain NDJSON.
+"""
+
+import gzip
+import json
+import os
+import re
+import zlib
+from array import array
+from bisect import bisect_right
+
+from storage.locking import file_lock
+
+# Tasks per gzip member: the unit a read decompresses
+BLOCK_TASKS = 256
+
+# Compressed size after which appends start a new segment file
+SEGMENT_BYTES = 4 * 1024 * 1024
+
+# Completed tasks a list keeps by default, the most recent ones
+KEEP_COMPLETED = 200
+
+_SEGMENT_RE = re.compile(r"seg-(\d+)\.idx$")
+
+
+def select_completed(completed, keep=KEEP_COMPLETED, max_age_days=None, now=0.0):
+    """
+    Pick the completed tasks an archiving policy moves to the archive.
+
+    Args:
+        completed (list): (task_id, created) of the completed tasks, in list order
+        keep (int, optional): Completed tasks left in the list, the last
+            ones in list order; None for no limit
+        max_age_days (float, optional): Also archive completed tasks
+            created longer ago than this
+        now (float): Current time, for max_age_days
+
+    Returns:
+        list: IDs to archive, in list order
+    """
+    chosen = set()
+    if keep is not None and len(completed) > keep:
+        chosen.update(task_id for task_id, _ in completed[:len(completed) - keep])
+    if max_age_days is not None:
+        cutoff = now - max_age_days * 86400
+        chosen.update(task_id for task_id, created in completed if created < cutoff)
+    return [task_id for task_id, _ in completed if task_id in chosen]
+
+
+class TaskArchive:
+    """
+    Archive of one task list.
+
+    Positions run from 0 (archived first) to count() - 1 (archived last).
+
+    Args:
+        directory (Path): Directory of the list's segments; created on first append
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock_path = directory / "archive.lock"
+        # Per block: segment number, offset, length; and the position of
+        # its first task, plus the total as a final entry
+        self._segments = array("q")
+        self._offsets = array("q")
+        self._lengths = array("q")
+        self._starts = array("q", [0])
+        # Index files as last read: name -> size
+        self._index_sizes = {}
+
+    def _segment_path(self, number, suffix):
+        """Return the data (".ndjson.gz") or index (".idx") file of a segment."""
+        return self.directory / f"seg-{number:06d}{suffix}"
+
+    def _index_files(self):
+        """Return (number, name, size) of every segment index, in order."""
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return []
+        files = []
+        for entry in entries:
+            match = _SEGMENT_RE.match(entry.name)
+            if match:
+                files.append((int(match.group(1)), entry.name, entry.stat().st_size))
+        return sorted(files)
+
+    def refresh(self):
+        """Re-read the block index if any process has archived since the last read."""
+        files = self._index_files()
+        if {name: size for _, name, size in files} == self._index_sizes:
+            return
+        segments, offsets, lengths = array("q"), array("q"), array("q")
+        starts = array("q", [0])
+        for number, name, _ in files:
+            with open(self.directory / name, "rb") as f:
+                for line in f:
+                    fields = line.split()
+                    if len(fields) != 3 or not line.endswith(b"\n"):
+                        break  # torn last line
+                    segments.append(number)
+                    offsets.append(int(fields[0]))
+                    lengths.append(int(fields[1]))
+                    starts.append(starts[-1] + int(fields[2]))
+        self._segments, self._offsets, self._lengths, self._starts = (
+            segments, offsets, lengths, starts)
+        self._index_sizes = {name: size for _, name, size in files}
+
+    def count(self):
+        """Return the number of archived tasks."""
+        self.refresh()
+        return self._starts[-1]
+
+    def read(self, start, count):
+        """
+        Return archived tasks by position, inflating only the blocks holding them.
+
+        Args:
+            start (int): Position of the first task
+            count (int): Number of tasks; fewer come back past the end
+
+        Returns:
+            list: Task dicts in archive order
+        """
+        self.refresh()
+        end = min(start + count, self._starts[-1])
+        start = max(0, start)
+        tasks = []
+        block = bisect_right(self._starts, start) - 1
+        handles = {}
+        try:
+            while start < end:
+                lines = self._read_block(block, handles)
+                first = self._starts[block]
+                tasks.extend(json.loads(line)
+                             for line in lines[start - first:end - first])
+                start = self._starts[block + 1]
+                block += 1
+        finally:
+            for handle in handles.values():
+                handle.close()
+        return tasks
+
+    def _read_block(self, block, handles):
+        """Return the NDJSON lines of one block, reusing open segment files."""
+        number = self._segments[block]
+        handle = handles.get(number)
+        if handle is None:
+            handle = handles[number] = open(self._segment_path(number, ".ndjson.gz"), "rb")
+        handle.seek(self._offsets[block])
+        data = zlib.decompress(handle.read(self._lengths[block]), 31)
+        return data.splitlines()
+
+    def iter_tasks(self):
+        """Stream every archived task, one block in memory at a time."""
+        self.refresh()
+        handles = {}
+        try:
+            for block in range(len(self._offsets)):
+                for line in self._read_block(block, handles):
+                    yield json.loads(line)
+        finally:
+            for handle in handles.values():
+                handle.close()
+
+    def append(self, tasks):
+        """
+        Archive tasks after the ones already archived, synced to disk.
+
+        Args:
+            tasks (list): Task dicts in the order to archive them
+        """
+        if not tasks:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.lock_path):
+            self.refresh()
+            if self._segments:
+                number = self._segments[-1]
+                end = self._offsets[-1] + self._lengths[-1]
+                if end >= SEGMENT_BYTES:
+                    number, end = number + 1, 0
+            else:
+                number, end = 1, 0
+            entries = []
+            with open(self._segment_path(number, ".ndjson.gz"), "a+b") as f:
+                # Drop a member whose index line never got written
+                f.truncate(end)
+                for i in range(0, len(tasks), BLOCK_TASKS):
+                    block = tasks[i:i + BLOCK_TASKS]
+                    data = gzip.compress("".join(
+                        json.dumps(task, ensure_ascii=False) + "\n" for task in block
+                    ).encode("utf-8"), compresslevel=6, mtime=0)
+                    f.write(data)
+                    entries.append(f"{end} {len(data)} {len(block)}\n")
+                    end += len(data)
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self._segment_path(number, ".idx"), "a+b") as f:
+                f.seek(0)
+                indexed = f.read()
+                # Likewise a torn index line
+                f.truncate(indexed.rfind(b"\n") + 1)
+                f.write("".join(entries).encode("ascii"))
+                f.flush()
+                os.fsync(f.fileno())
@@ -0,0 +1,60 @@
+"""
+Crash-safe file writes.
+"""
+
+import os
+import tempfile
+
+# mkstemp creates files readable by the owner only; new files get the mode
+# open() would have given them. Reading the umask means setting it, so it
+# is done once here rather than racing other threads on each write.
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+
+def atomic_write_bytes(path, data):
+    """
+    Write data to path so readers see either the old or the new file.
+
+    The bytes go to a temporary file in the same directory, which is
+    fsynced and then renamed over the destination. The destination keeps
+    its permissions.
+
+    Args:
+        path (str | Path): Destination file
+        data (bytes): File contents
+    """
+    path = os.fspath(path)
+    directory = os.path.dirname(path) or "."
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if hasattr(os, "fchmod"):
+                os.fchmod(f.fileno(), mode)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    # Persist the rename itself where the platform allows it
+    if hasattr(os, "O_DIRECTORY"):
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
@@ -0,0 +1,110 @@
+"""
+TaskStorage - Interface implemented by the task storage backends.
+"""
+
+
+class TaskStorage:
+    """
+    Base class for task storage backends.
+
+    Backends persist the journal records produced by the task model (see
+    storage.journal) in whatever form suits them. apply() is called from
+    the persistence thread; load() from the GUI thread before any writes.
+
+    Other processes may write to the same list. Backends that can tell
+    report the files to watch and what changed since the list was loaded
+    (watch_paths() and read_changes()).
+    """
+
+    #: Short backend name used in messages and on the command line
+    name = "base"
+
+    #: Name of the task list this storage holds
+    list_name = "default"
+
+    @property
+    def location(self):
+        """Return a human-readable description of where tasks are stored."""
+        raise NotImplementedError
+
+    @property
+    def bytes_written(self):
+        """Return the bytes written since the backend was opened, or 0 if unknown."""
+        return 0
+
+    def exists(self):
+        """Return True if there are stored tasks to load."""
+        raise NotImplementedError
+
+    def create(self):
+        """Make sure the list exists, even while it has no tasks."""
+        raise NotImplementedError
+
+    def load(self, only_open=False):
+        """
+        Load tasks in display order.
+
+        Args:
+            only_open (bool): Skip completed tasks
+
+        Returns:
+            list: Task dicts with "id", "text", "checked" and "created" keys
+        """
+        raise NotImplementedError
+
+    def iter_load(self, only_open=False):
+        """
+        Yield tasks in display order without loading them all up front.
+
+        Backends that can stream override this; the default loads everything.
+
+        Args:
+            only_open (bool): Skip completed tasks
+        """
+        yield from self.load(only_open)
+
+    def apply(self, records):
+        """
+        Persist a batch of journal records as one transaction.
+
+        Args:
+            records (list): Journal records in the order they happened
+        """
+        raise NotImplementedError
+
+    def watch_paths(self):
+        """
+        Return the files that change when any process writes to the list.
+
+        Returns:
+            list: File paths; empty if the backend cannot be watched
+        """
+        return []
+
+    def read_changes(self):
+        """
+        Return what other processes changed since the last load or read.
+
+        Returns:
+            list: Journal records to apply on top of the tasks loaded so
+                far, or None if the caller has to compare against load()
+        """
+        return None
+
+    def count(self, checked=None):
+        """
+        Count stored tasks.
+
+        Args:
+            checked (bool, optional): Only count tasks in this state
+
+        Returns:
+            int: Number of matching tasks
+        """
+        tasks = self.load()
+        if checked is None:
+            return len(tasks)
+        return sum(1 for task in tasks if task["checked"] == checked)
+
+    def close(self):
+        """Release any resources held by the backend."""
@@ -0,0 +1,300 @@
+"""
+Binary task file - Compact, versioned snapshot format read through mmap.
+
+The same tasks as the JSON snapshot, in a fraction of the bytes and with
+no parsing: fixed-width fields are read in place from the memory-mapped
+file, and task text is decoded from it in one go. All integers and
+floats are little-endian.
+
+    header   32 bytes
+             magic     4s  b"TSKB"
+             version   H   FORMAT_VERSION
+             header    H   header size, so later versions can grow it
+             count     I   number of tasks
+             strings   I   entries in the string table
+             table     Q   byte offset of the string table
+             reserved  Q
+    columns  one packed array per field, each starting 8-byte aligned
+             id        q * count
+             created   d * count   creation time, seconds since the epoch
+             order     d * count   sort key (version 2 on)
+             text      I * count   index into the string table
+             flags     B * count   bit 0: checked
+    strings  (version 3 on)
+             ends      I * strings   byte offset in the text where each
+                                     entry ends, 8-byte aligned
+             text      the entries in UTF-8, separated by NUL bytes
+             (versions 1 and 2)
+             per entry: I byte length, then that many bytes of UTF-8
+
+Identical texts share one string table entry. The NUL separators let the
+whole text be decoded and split in two calls; the end offsets stay the
+authority, for texts that contain NUL themselves. Readers refuse files
+with a newer version than they know, rather than misreading them;
+version 1 files, from before tasks had sort keys, get keys in file order
+on reading.
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+
+from storage.tasks import fit_order
+
+MAGIC = b"TSKB"
+
+FORMAT_VERSION = 3
+
+FLAG_CHECKED = 0x01
+
+_HEADER = struct.Struct("<4sHHIIQQ")
+_LENGTH = struct.Struct("<I")
+
+# Columns of each format version in file order: name, typecode, bytes per item
+_COLUMNS = {
+    1: (("id", "q", 8), ("created", "d", 8), ("text", "I", 4), ("flags", "B", 1)),
+    2: (("id", "q", 8), ("created", "d", 8), ("order", "d", 8), ("text", "I", 4),
+        ("flags", "B", 1)),
+}
+_COLUMNS[3] = _COLUMNS[2]
+
+# Tasks built per slice of the columns while iterating
+_ITER_CHUNK = 4096
+
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def _padded(size):
+    """Round a byte size up to the next multiple of 8."""
+    return (size + 7) & ~7
+
+
+def _column_bytes(typecode, values):
+    """Return a column as little-endian bytes."""
+    column = array(typecode, values)
+    if not _LITTLE_ENDIAN and column.itemsize > 1:
+        column.byteswap()
+    data = column.tobytes()
+    return data + b"\0" * (_padded(len(data)) - len(data))
+
+
+def encode_tasks(tasks):
+    """
+    Serialize tasks to the binary format.
+
+    Args:
+        tasks (list): Task dicts with "id", "text", "checked" and "created"
+            keys, in list order; tasks without an "order" key get one
+
+    Returns:
+        bytes: The complete file contents
+    """
+    strings = {}
+    text_refs = array("I")
+    orders = array("d")
+    order = None
+    for task in tasks:
+        text_refs.append(strings.setdefault(task["text"], len(strings)))
+        order = fit_order(task.get("order"), order, None)
+        orders.append(order)
+
+    columns = [_column_bytes("q", [task["id"] for task in tasks]),
+               _column_bytes("d", [task.get("created", 0.0) for task in tasks]),
+               _column_bytes("d", orders),
+               _column_bytes("I", text_refs),
+               _column_bytes("B", [FLAG_CHECKED if task["checked"] else 0 for task in tasks])]
+
+    table = []
+    ends = array("I")
+    end = -1
+    for text in strings:
+        data = text.encode("utf-8")
+        table.append(data)
+        end += len(data) + 1
+        ends.append(end)
+
+    table_offset = _HEADER.size + sum(len(column) for column in columns)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, _HEADER.size, len(tasks), len(strings),
+                          table_offset, 0)
+    return b"".join([header] + columns + [_column_bytes("I", ends), b"\0".join(table)])
+
+
+class TaskFileView:
+    """
+    Read-only view of a binary task file mapped into memory.
+
+    The columns are memoryviews cast over the mapping, so opening a file
+    copies nothing and reading a field touches only its own bytes. Close
+    the view (or use it as a context manager) to unmap the file; any
+    task dicts already built stay valid.
+
+    Args:
+        path (Path): Binary task file
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        ValueError: If it is not a binary task file, is truncated, or was
+            written by a newer version
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"{path} is empty, not a binary task file") from None
+        self._views = []
+        try:
+            self._parse(path)
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self, path):
+        """Check the header and set up the column views."""
+        size = len(self._map)
+        if size < _HEADER.size:
+            raise ValueError(f"{path} is not a binary task file")
+        magic, version, header_size, count, strings, table, _ = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a binary task file")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"{path} uses task file version {version}; "
+                             f"this version reads up to {FORMAT_VERSION}")
+
+        self.count = count
+        self.string_count = strings
+        self._version = version
+        self._table = table
+        self._order = None
+        buffer = self._view(memoryview(self._map))
+        offset = header_size
+        for name, typecode, itemsize in _COLUMNS[version]:
+            end = offset + count * itemsize
+            if end > size:
+                raise ValueError(f"{path} is truncated")
+            column = self._view(buffer[offset:end])
+            if itemsize > 1:
+                column = self._view(column.cast(typecode)) if _LITTLE_ENDIAN \
+                    else self._swapped(typecode, column)
+            setattr(self, "_" + name, column)
+            offset = _padded(end)
+        if table > size:
+            raise ValueError(f"{path} is truncated")
+        self._buffer = buffer
+        if self._order is None:
+            orders = array("d")
+            order = None
+            for _ in range(count):
+                order = fit_order(None, order, None)
+                orders.append(order)
+            self._order = orders
+
+    def _view(self, view):
+        """Remember a memoryview so close() can release it."""
+        self._views.append(view)
+        return view
+
+    @staticmethod
+    def _swapped(typecode, column):
+        """Copy a little-endian column into a native array (big-endian hosts)."""
+        values = array(typecode, column.tobytes())
+        values.byteswap()
+        return values
+
+    def __len__(self):
+        """Return the number of tasks."""
+        return self.count
+
+    def strings(self):
+        """
+        Decode the string table.
+
+        Returns:
+            list: Texts in table order
+        """
+        if self._version < 3:
+            return self._prefixed_strings()
+        if not self.string_count:
+            return []
+        buffer = self._buffer
+        start = self._table + _padded(4 * self.string_count)
+        if start > len(buffer):
+            raise ValueError("Binary task file is truncated")
+        ends = array("I")
+        ends.frombytes(buffer[self._table:self._table + 4 * self.string_count])
+        if not _LITTLE_ENDIAN:
+            ends.byteswap()
+        stop = start + ends[-1]
+        if stop > len(buffer):
+            raise ValueError("Binary task file is truncated")
+        texts = str(buffer[start:stop], "utf-8").split("\0")
+        if len(texts) == self.string_count:
+            return texts
+        # Some text holds a NUL itself; go by the end offsets
+        data = buffer[start:stop].tobytes()
+        ends = ends.tolist()
+        return [str(data[begin + 1:end], "utf-8") for begin, end in zip([-1] + ends, ends)]
+
+    def _prefixed_strings(self):
+        """Decode a version 1 or 2 string table of length-prefixed entries."""
+        buffer = self._buffer
+        unpack = _LENGTH.unpack_from
+        texts = []
+        append = texts.append
+        pos = self._table
+        try:
+            for _ in range(self.string_count):
+                length, = unpack(buffer, pos)
+                pos += 4
+                append(str(buffer[pos:pos + length], "utf-8"))
+                pos += length
+        except struct.error:
+            pos = len(buffer) + 1
+        if pos > len(buffer):
+            # Slices past the end come back short rather than failing
+            raise ValueError("Binary task file is truncated")
+        return texts
+
+    def __iter__(self):
+        """Yield the tasks as dicts, in file order."""
+        texts = self.strings()
+        for first in range(0, self.count, _ITER_CHUNK):
+            yield from self._build(texts, first, first + _ITER_CHUNK)
+
+    def _build(self, texts, first, last):
+        """Return the tasks in a range of rows, building the dicts column by column."""
+        ids = self._id[first:last].tolist()
+        refs = self._text[first:last].tolist()
+        flags = self._flags[first:last].tolist()
+        created = self._created[first:last].tolist()
+        return [{"id": task_id, "text": texts[ref], "checked": bool(flag & FLAG_CHECKED),
+                 "created": when, "order": order}
+                for task_id, ref, flag, when, order in zip(
+                    ids, refs, flags, created, self._order[first:last].tolist())]
+
+    def tasks(self):
+        """
+        Return every task.
+
+        Returns:
+            list: Task dicts in file order
+        """
+        return self._build(self.strings(), 0, self.count)
+
+    def close(self):
+        """Release the column views and unmap the file."""
+        for view in reversed(self._views):
+            if isinstance(view, memoryview):
+                view.release()
+        self._views = []
+        self._buffer = self._id = self._created = self._order = self._text = None
+        self._flags = None
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
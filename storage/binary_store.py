@@ -0,0 +1,88 @@
+"""
+BinaryTaskStorage - Tasks in a binary snapshot plus append-only journal.
+"""
+
+import logging
+
+from storage.binary_format import TaskFileView, encode_tasks
+from storage.journal import TaskJournal
+from storage.json_store import JsonTaskStorage
+from storage.locking import file_lock
+
+log = logging.getLogger(__name__)
+
+
+class BinaryTaskJournal(TaskJournal):
+    """
+    TaskJournal whose snapshot is a binary task file (storage.binary_format).
+
+    The journal itself stays NDJSON, so appends, compaction markers and
+    read_changes() work exactly as for the JSON snapshot.
+    """
+
+    # The format has every field of every task, keys included
+    snapshot_complete = True
+
+    def _read_snapshot_data(self):
+        """Map the snapshot into memory, or return None if there is none."""
+        try:
+            return TaskFileView(self.snapshot_path)
+        except FileNotFoundError:
+            return None
+
+    def _read_snapshot(self):
+        """Read the snapshot, or an empty list if there is none."""
+        view = self._read_snapshot_data()
+        if view is None:
+            return []
+        with view:
+            return view.tasks()
+
+    def _iter_snapshot(self, view):
+        """Yield the snapshot's tasks one by one, unmapping it when done."""
+        with view:
+            yield from view
+
+    def _encode_snapshot(self, tasks):
+        """Return the bytes of a binary snapshot holding tasks."""
+        return encode_tasks(tasks)
+
+
+class BinaryTaskStorage(JsonTaskStorage):
+    """
+    Stores tasks in a compact binary task file with a journal next to it.
+
+    A list that only exists as a JSON snapshot is migrated on opening: its
+    tasks are read once through the JSON journal and written as the binary
+    snapshot. The JSON files are left as they were, so the json backend
+    (and anything exporting from it) still sees the list as it was then.
+
+    Args:
+        path (Path): Binary snapshot file
+        json_path (Path, optional): JSON snapshot of the same list to migrate from
+        compact_threshold (int): Journal size in bytes that triggers compaction
+        list_name (str): Name of the task list stored in the file
+    """
+
+    name = "binary"
+
+    journal_class = BinaryTaskJournal
+
+    def __init__(self, path, json_path=None, compact_threshold=256 * 1024,
+                 list_name="default"):
+        super().__init__(path, compact_threshold=compact_threshold, list_name=list_name)
+        if json_path is not None:
+            self._migrate(TaskJournal(json_path))
+
+    def _migrate(self, source):
+        """Write the tasks of a JSON list as the binary snapshot, if there is none yet."""
+        if self.journal.exists() or not source.exists():
+            return
+        with file_lock(self.journal.lock_path):
+            if self.journal.exists():
+                # Another process migrated first
+                return
+            tasks = source.load()
+            self.journal._write_snapshot(tasks)
+        log.info("Migrated %d tasks from %s to %s", len(tasks), source.snapshot_path,
+                 self.location)
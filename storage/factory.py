@@ -0,0 +1,129 @@
+"""
+Default locations and backend selection for task storage.
+"""
+
+import os
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+from storage.archive import TaskArchive
+from storage.binary_store import BinaryTaskStorage
+from storage.json_store import JsonTaskStorage
+from storage.sqlite_store import SqliteTaskStorage
+
+ROOT_DIR = Path(__file__).parent.parent
+
+BACKENDS = ("json", "sqlite", "binary")
+
+# The list stored in the classic tasks.json; other JSON lists live in
+# data/lists, one file per list
+DEFAULT_LIST = "default"
+
+# Binary lists are migrated from the JSON lists of the same name, so they
+# carry on with the same archives
+_ARCHIVE_BACKENDS = {"binary": "json"}
+
+
+def data_dir():
+    """
+    Return the directory holding task data, creating it if needed.
+
+    Defaults to the data folder next to the application; the
+    TASKINATOR_DATA_DIR environment variable overrides it.
+    """
+    path = Path(os.environ.get("TASKINATOR_DATA_DIR") or ROOT_DIR / "data")
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _backend(backend):
+    """Resolve a backend name against TASKINATOR_STORAGE and the default."""
+    backend = backend or os.environ.get("TASKINATOR_STORAGE") or "json"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown storage backend: {backend}")
+    return backend
+
+
+def _json_path(list_name):
+    """Return the snapshot file of a JSON list."""
+    if list_name == DEFAULT_LIST:
+        return data_dir() / "tasks.json"
+    # Percent-encode so any name is a safe, reversible file name
+    return data_dir() / "lists" / (quote(list_name, safe=" ") + ".json")
+
+
+def _binary_path(list_name):
+    """Return the snapshot file of a binary list."""
+    return data_dir() / "binary" / (quote(list_name, safe=" ") + ".tsk")
+
+
+def _stems(directory, suffixes):
+    """Return the unquoted names of the files in a directory with these suffixes."""
+    files = directory.iterdir() if directory.is_dir() else ()
+    return {unquote(path.stem) for path in files if path.suffix in suffixes}
+
+
+def list_names(backend=None):
+    """
+    Return the names of the stored task lists.
+
+    Args:
+        backend (str, optional): As for open_storage()
+
+    Returns:
+        list: List names, the default list first, then alphabetical
+    """
+    backend = _backend(backend)
+    if backend in ("json", "binary"):
+        names = _stems(data_dir() / "lists", (".json", ".journal"))
+        if backend == "binary":
+            # JSON lists not opened yet are migrated when they are
+            names |= _stems(data_dir() / "binary", (".tsk", ".journal"))
+    else:
+        names = set(SqliteTaskStorage.list_names(data_dir() / "tasks.db"))
+    names.discard(DEFAULT_LIST)
+    return [DEFAULT_LIST] + sorted(names, key=str.lower)
+
+
+def open_storage(backend=None, list_name=DEFAULT_LIST):
+    """
+    Open the task storage backend for one task list.
+
+    Args:
+        backend (str, optional): "json", "sqlite" or "binary"; defaults to the
+            TASKINATOR_STORAGE environment variable, then "json"
+        list_name (str): Task list to open; it is created on first write
+
+    Returns:
+        TaskStorage: The opened backend
+    """
+    backend = _backend(backend)
+    if not list_name or not list_name.strip():
+        raise ValueError("List names cannot be blank")
+    if backend == "json":
+        path = _json_path(list_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return JsonTaskStorage(path, list_name=list_name)
+    if backend == "binary":
+        path = _binary_path(list_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return BinaryTaskStorage(path, json_path=_json_path(list_name), list_name=list_name)
+    return SqliteTaskStorage(data_dir() / "tasks.db", list_name=list_name)
+
+
+def open_archive(backend=None, list_name=DEFAULT_LIST):
+    """
+    Open the archive of completed tasks of one task list.
+
+    Args:
+        backend (str, optional): As for open_storage(); each backend's
+            lists have their own archives, but binary lists share the
+            archives of the JSON lists they were migrated from
+        list_name (str): Task list whose archive to open
+
+    Returns:
+        TaskArchive: The archive; its directory is created on first write
+    """
+    backend = _backend(backend)
+    backend = _ARCHIVE_BACKENDS.get(backend, backend)
+    return TaskArchive(data_dir() / "archive" / backend / quote(list_name, safe=" "))
@@ -0,0 +1,115 @@
+"""
+UndoHistory - Undo/redo stacks of journal records, capped by size.
+
+Each step is a pair of record lists: the records that revert a change and
+the records that make it again. Both are ordinary journal records (see
+storage.journal), so undoing or redoing replays one batch and is saved
+like any other change. Records only name what changed (IDs, and the text
+and positions of removed tasks), never the whole list.
+"""
+
+from collections import deque
+
+# Rough in-memory cost of a record and of each task or ID it carries,
+# on top of the task text
+_RECORD_BYTES = 200
+_TASK_BYTES = 150
+_ID_BYTES = 40
+
+
+def records_size(records):
+    """Estimate the memory held by journal records, in bytes."""
+    size = 0
+    for record in records:
+        size += _RECORD_BYTES + len(record.get("text", ""))
+        size += _ID_BYTES * len(record.get("ids", ()))
+        for task in record.get("tasks", ()):
+            size += _TASK_BYTES + len(task["text"])
+    return size
+
+
+class UndoHistory:
+    """
+    Undo and redo stacks whose combined size stays under a byte budget.
+
+    The oldest steps are dropped to make room. A single step bigger than
+    the whole budget cannot be kept, so it clears the history instead:
+    steps before it would no longer apply cleanly on their own.
+
+    Args:
+        budget (int): Bytes of records kept, per records_size()
+    """
+
+    def __init__(self, budget=4 * 1024 * 1024):
+        self.budget = budget
+        self._undo = deque()
+        self._redo = []
+        self._size = 0
+
+    def __len__(self):
+        """Return the number of steps that can be undone."""
+        return len(self._undo)
+
+    @property
+    def size(self):
+        """Return the estimated bytes held by both stacks."""
+        return self._size
+
+    def can_undo(self):
+        """Return True if there is a step to undo."""
+        return bool(self._undo)
+
+    def can_redo(self):
+        """Return True if there is an undone step to redo."""
+        return bool(self._redo)
+
+    def push(self, undo, redo):
+        """
+        Record a change and forget anything that could be redone.
+
+        Args:
+            undo (list): Journal records reverting the change
+            redo (list): Journal records making the change
+        """
+        size = records_size(undo) + records_size(redo)
+        self._size -= sum(step[2] for step in self._redo)
+        self._redo.clear()
+        if size > self.budget:
+            self.clear()
+            return
+        self._undo.append((undo, redo, size))
+        self._size += size
+        while self._size > self.budget:
+            self._size -= self._undo.popleft()[2]
+
+    def undo(self):
+        """
+        Take the most recent step off the undo stack.
+
+        Returns:
+            list: Records reverting it, or None if there is nothing to undo
+        """
+        if not self._undo:
+            return None
+        step = self._undo.pop()
+        self._redo.append(step)
+        return step[0]
+
+    def redo(self):
+        """
+        Take the most recently undone step off the redo stack.
+
+        Returns:
+            list: Records making the change again, or None
+        """
+        if not self._redo:
+            return None
+        step = self._redo.pop()
+        self._undo.append(step)
+        return step[1]
+
+    def clear(self):
+        """Forget every step."""
+        self._undo.clear()
+        self._redo.clear()
+        self._size = 0
@@ -0,0 +1,752 @@
+"""
+TaskJournal - Snapshot file plus append-only log of task mutations.
+
+The snapshot is the JSON array of tasks the app has always written (or a
+binary task file, see storage.binary_store). Every change since the last
+snapshot is appended to a journal next to it as one JSON line keyed by
+task ID:
+
+    {"op": "add", "id": 17, "text": "Call Bob", "checked": false,
+     "created": 1760000000.0, "order": 5120.0}
+    {"op": "check", "id": 17}
+    {"op": "uncheck", "id": 17}
+    {"op": "edit", "id": 17, "text": "Call Bob back"}
+    {"op": "remove", "id": 17}
+
+Bulk operations write one record for many tasks, and replacing the whole
+list starts with a clear:
+
+    {"op": "remove", "ids": [17, 18, 19]}
+    {"op": "check", "ids": [17, 18]}
+    {"op": "clear"}
+
+Undoing a removal puts tasks back where they were; "rows" are the rows
+the tasks end up at, in ascending order:
+
+    {"op": "insert", "rows": [0, 7], "tasks": [{"id": 17, "text": "Call Bob",
+     "checked": false, "created": 1760000000.0, "order": 5120.0}, {"id": 18, ...}]}
+
+Tasks are kept in ascending order of a sort key, "order" (see
+storage.tasks.fit_order). Moving a task gives it a key between its new
+neighbours', and when repeated moves into one spot leave no room between
+them, the keys around it are spread out again first, in the same order:
+
+    {"op": "rebalance", "ids": [18, 19], "orders": [2048.0, 3072.0]}
+    {"op": "move", "id": 17, "order": 2560.0}
+
+Tasks with equal keys, such as ones two processes added at the same
+time, are ordered by ID, so every reader agrees on the order however the
+records interleaved. Snapshots and records written before tasks had keys
+are given them in list order, ORDER_STEP apart.
+
+Replaying is idempotent, so a crash between writing a compacted snapshot
+and truncating the journal cannot duplicate or lose tasks.
+
+Several processes may share the files. Appends and compactions happen
+under an advisory lock (storage.locking), so concurrent writers merge by
+simply interleaving their records. Each TaskJournal remembers the snapshot
+it read and how far into the journal it got, so read_changes() returns
+just what other writers appended since. A compaction starts the new
+journal with a marker naming the journal length and snapshot it folded:
+
+    {"op": "compacted", "from": 262144, "base": [1234, 5120, 1760000000000000000]}
+
+so a reader that had seen all of it can carry on without re-reading the
+snapshot. Replaying ignores the marker.
+"""
+
+import json
+import os
+import re
+from collections import defaultdict
+from itertools import islice
+
+from storage.atomic import atomic_write_bytes
+from storage.locking import file_lock
+from storage.tasks import fit_order, new_task_id
+
+WHITESPACE = re.compile(r'[ \t\r\n]*')
+
+
+def add_record(task):
+    """Return the journal record adding a task."""
+    record = {"op": "add", "id": task["id"], "text": task["text"],
+              "checked": task["checked"], "created": task.get("created", 0.0)}
+    if task.get("order") is not None:
+        record["order"] = task["order"]
+    return record
+
+
+def remove_record(task_id):
+    """Return the journal record removing a task."""
+    return {"op": "remove", "id": task_id}
+
+
+def checked_record(task_id, checked):
+    """Return the journal record checking or unchecking a task."""
+    return {"op": "check" if checked else "uncheck", "id": task_id}
+
+
+def edit_record(task_id, text):
+    """Return the journal record changing a task's text."""
+    return {"op": "edit", "id": task_id, "text": text}
+
+
+def remove_many_record(task_ids):
+    """Return one journal record removing several tasks."""
+    return {"op": "remove", "ids": list(task_ids)}
+
+
+def checked_many_record(task_ids, checked):
+    """Return one journal record checking or unchecking several tasks."""
+    return {"op": "check" if checked else "uncheck", "ids": list(task_ids)}
+
+
+def clear_record():
+    """Return the journal record removing every task."""
+    return {"op": "clear"}
+
+
+def move_record(task_id, order):
+    """Return the journal record moving a task to where its new sort key sorts."""
+    return {"op": "move", "id": task_id, "order": order}
+
+
+def rebalance_record(task_ids, orders):
+    """
+    Return one journal record giving tasks new sort keys, without moving them.
+
+    Args:
+        task_ids (iterable): Tasks in list order
+        orders (iterable): Their new keys, ascending like the old ones
+    """
+    return {"op": "rebalance", "ids": list(task_ids), "orders": list(orders)}
+
+
+def insert_record(rows, tasks):
+    """
+    Return one journal record putting tasks back at given rows.
+
+    Args:
+        rows (iterable): Row each task ends up at, ascending
+        tasks (iterable): Task dicts, one per row
+    """
+    placed = []
+    for task in tasks:
+        copy = {"id": task["id"], "text": task["text"], "checked": task["checked"],
+                "created": task.get("created", 0.0)}
+        if task.get("order") is not None:
+            copy["order"] = task["order"]
+        placed.append(copy)
+    return {"op": "insert", "rows": list(rows), "tasks": placed}
+
+
+def merge_rows(items, rows, new_items):
+    """
+    Return items with new_items placed so each ends up at its row.
+
+    Args:
+        items (list): Existing items in order
+        rows (list): Final row of each new item, ascending
+        new_items (list): Items to place, one per row
+    """
+    merged = []
+    pos = 0
+    for row, item in zip(rows, new_items):
+        take = max(0, min(row - len(merged), len(items) - pos))
+        merged.extend(items[pos:pos + take])
+        pos += take
+        merged.append(item)
+    merged.extend(items[pos:])
+    return merged
+
+
+def insert_orders(orders, rows, new_orders):
+    """
+    Return sort keys for items put at rows that keep the list in order.
+
+    Args:
+        orders (list): Keys of the existing items, in order
+        rows (list): Final row of each new item, ascending (as for merge_rows)
+        new_orders (list): Keys the new items had, or None; kept where they fit
+
+    Returns:
+        list: One key per new item
+    """
+    fitted = []
+    pos = 0
+    length = 0
+    before = None
+    for row, order in zip(rows, new_orders):
+        take = max(0, min(row - length, len(orders) - pos))
+        if take:
+            before = orders[pos + take - 1]
+        pos += take
+        length += take + 1
+        before = fit_order(order, before, orders[pos] if pos < len(orders) else None)
+        fitted.append(before)
+    return fitted
+
+
+def fill_orders(tasks):
+    """
+    Give tasks read from an older file sort keys, in list order.
+
+    Args:
+        tasks (list): Task dicts; modified in place
+
+    Returns:
+        list: The same tasks
+    """
+    before = None
+    for task in tasks:
+        task["order"] = before = fit_order(task.get("order"), before, None)
+    return tasks
+
+
+def _plan_adds(records):
+    """
+    Work out where the tasks added in a journal go, for TaskJournal.iter_load().
+
+    Streaming only works while every added task goes after the snapshot's
+    tasks and the ones added before it. Tasks added without a key go one
+    ORDER_STEP past the last task alive at the time, which is the latest
+    added one still alive, or else the snapshot's last task as long as no
+    other task has been removed.
+
+    Args:
+        records (list): Journal records after the last clear
+
+    Returns:
+        tuple: (ops_by_id, added, lowest): the single-task records of each
+            task ID; (task_id, order, after) per add in journal order, with
+            either the recorded key or the ID of the task it goes one step
+            past (None for the snapshot's last task); and the lowest
+            recorded key, which no snapshot task may reach. None if the
+            records need a full replay instead.
+    """
+    ops_by_id = defaultdict(list)
+    added = []
+    # Tasks added in the journal and not removed since: ID -> position in
+    # added, and those positions in order (stale ones are skipped)
+    alive = {}
+    alive_order = []
+    removed_other = unkeyed = False
+    keyed = lowest = None
+    for record in (single for bulk in records for single in expand_record(bulk)):
+        op = record.get("op")
+        task_id = record.get("id")
+        if op in ("insert", "move", "rebalance"):
+            return None
+        ops_by_id[task_id].append(record)
+        if op == "remove":
+            if alive.pop(task_id, None) is None:
+                removed_other = True
+        elif op == "add":
+            if task_id in alive:
+                continue
+            while alive_order and alive.get(added[alive_order[-1]][0]) != alive_order[-1]:
+                alive_order.pop()
+            order = record.get("order")
+            if order is None:
+                if not alive_order and removed_other:
+                    return None
+                after = added[alive_order[-1]][0] if alive_order else None
+                unkeyed = True
+            else:
+                if unkeyed or (keyed is not None and (order, task_id) <= keyed):
+                    return None
+                keyed = (order, task_id)
+                if lowest is None:
+                    lowest = order
+                after = None
+            alive[task_id] = len(added)
+            alive_order.append(len(added))
+            added.append((task_id, order, after))
+    return ops_by_id, added, lowest
+
+
+def expand_record(record):
+    """Yield the single-task records making up a (possibly bulk) record."""
+    task_ids = record.get("ids")
+    if task_ids is None:
+        yield record
+        return
+    orders = record.get("orders")
+    if orders is not None:
+        for task_id, order in zip(task_ids, orders):
+            yield {"op": record["op"], "id": task_id, "order": order}
+        return
+    for task_id in task_ids:
+        yield {"op": record["op"], "id": task_id}
+
+
+def replay(tasks, records):
+    """
+    Apply journal records to a list of tasks.
+
+    Args:
+        tasks (list): Task dicts in key order, with keys if the records
+            move or insert tasks (see fill_orders()); modified in place
+        records (iterable): Journal records in the order they were written
+
+    Returns:
+        list: The updated task list
+    """
+    by_id = {task["id"]: task for task in tasks}
+    removed = False
+    # Keys changed since the list was last sorted by them
+    unsorted = False
+
+    def tidy():
+        """Drop removed tasks and put the rest back in key order."""
+        nonlocal removed, unsorted
+        if removed:
+            # By identity: a task removed and added again is a new dict
+            tasks[:] = [task for task in tasks if by_id.get(task["id"]) is task]
+            removed = False
+        if unsorted:
+            tasks.sort(key=_order_of)
+            unsorted = False
+
+    for record in (single for bulk in records for single in expand_record(bulk)):
+        op = record.get("op")
+        task_id = record.get("id")
+        if op == "clear":
+            by_id.clear()
+            tasks.clear()
+            removed = unsorted = False
+        elif op == "add":
+            if task_id in by_id:
+                continue
+            order = record.get("order")
+            if order is None:
+                # Written before tasks had keys: goes last
+                if unsorted:
+                    tidy()
+                while tasks and by_id.get(tasks[-1]["id"]) is not tasks[-1]:
+                    tasks.pop()
+                order = fit_order(None, tasks[-1].get("order") if tasks else None, None)
+            elif tasks and (order, task_id) < (tasks[-1].get("order", order), tasks[-1]["id"]):
+                unsorted = True
+            task = {"id": task_id, "text": record["text"],
+                    "checked": bool(record.get("checked", False)),
+                    "created": record.get("created", 0.0), "order": order}
+            by_id[task_id] = task
+            tasks.append(task)
+        elif op == "remove":
+            if by_id.pop(task_id, None) is not None:
+                removed = True
+        elif op in ("check", "uncheck"):
+            task = by_id.get(task_id)
+            if task is not None:
+                task["checked"] = op == "check"
+        elif op == "edit":
+            task = by_id.get(task_id)
+            if task is not None:
+                task["text"] = record["text"]
+        elif op in ("move", "rebalance"):
+            task = by_id.get(task_id)
+            if task is not None:
+                task["order"] = record["order"]
+                unsorted = True
+        elif op == "insert":
+            # Rows count live tasks only, in key order
+            tidy()
+            placed = [(row, dict(task, checked=bool(task.get("checked", False))))
+                      for row, task in zip(record["rows"], record["tasks"])
+                      if task["id"] not in by_id]
+            rows = [row for row, _ in placed]
+            orders = insert_orders([task["order"] for task in tasks], rows,
+                                   [task.get("order") for _, task in placed])
+            for (_, task), order in zip(placed, orders):
+                task["order"] = order
+                by_id[task["id"]] = task
+            tasks[:] = merge_rows(tasks, rows, [task for _, task in placed])
+
+    tidy()
+    return tasks
+
+
+def _order_of(task):
+    """Return what a task dict sorts by: its key, then its ID."""
+    return task["order"], task["id"]
+
+
+class TaskJournal:
+    """
+    Persists tasks as a snapshot plus an append-only journal.
+
+    Args:
+        snapshot_path (Path): JSON snapshot file (the classic tasks.json);
+            subclasses may store the snapshot in another format
+        compact_threshold (int): Journal size in bytes that triggers compaction
+    """
+
+    # True when every snapshot task comes back with an ID, a bool
+    # "checked", "created" and a key, in ascending key order, so loading
+    # need not go over them again
+    snapshot_complete = False
+
+    def __init__(self, snapshot_path, compact_threshold=256 * 1024):
+        self.snapshot_path = snapshot_path
+        self.journal_path = snapshot_path.with_suffix(".journal")
+        self.lock_path = snapshot_path.with_suffix(".lock")
+        self.compact_threshold = compact_threshold
+        self._journal_size = self._file_size(self.journal_path)
+        # Bytes written to the snapshot and journal since opening
+        self.bytes_written = 0
+        # What this journal has seen of the files: the snapshot it last
+        # read or wrote, and how far into the journal it has read. Only
+        # touched with the file lock held, which also serializes threads.
+        self._snapshot_signature = None
+        self._read_offset = 0
+        # Records folded into our own compaction before read_changes()
+        # returned them, and whether we appended since; those appends are
+        # then read past, so the stash no longer tells the whole story
+        self._unread = []
+        self._unread_stale = False
+
+    @staticmethod
+    def _file_size(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _signature(self):
+        """Return what identifies the current snapshot file, or None if there is none."""
+        try:
+            st = os.stat(self.snapshot_path)
+        except OSError:
+            return None
+        # A list, so it compares equal to its JSON round trip in markers
+        return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+    def _mark_read(self, signature, offset):
+        """Record that the files were read up to here."""
+        self._snapshot_signature = signature
+        self._read_offset = offset
+        self._unread = []
+        self._unread_stale = False
+
+    def _read_snapshot_data(self):
+        """Return the snapshot's contents for _iter_snapshot(), or None if there is none."""
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _read_snapshot(self):
+        """Read the snapshot, or an empty list if there is none."""
+        text = self._read_snapshot_data()
+        return [] if text is None else json.loads(text)
+
+    def _encode_snapshot(self, tasks):
+        """Return the bytes of a snapshot holding tasks."""
+        return json.dumps(tasks, indent=2, ensure_ascii=False).encode('utf-8')
+
+    def _read_journal(self, offset=0):
+        """
+        Read journal records from a byte offset, skipping torn lines.
+
+        Returns:
+            tuple: (records, offset just past the last line read)
+        """
+        try:
+            with open(self.journal_path, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], 0
+
+        records = []
+        lines = data.split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # Partial line from an interrupted append
+                continue
+        end = offset + len(data) - len(tail)
+        if tail.strip():
+            try:
+                records.append(json.loads(tail))
+                end += len(tail)
+            except ValueError:
+                # Unterminated and unparsable: read it again next time
+                pass
+        return records, end
+
+    def exists(self):
+        """Return True if there is anything on disk to load."""
+        return self.snapshot_path.exists() or self.journal_path.exists()
+
+    def load(self):
+        """
+        Load the snapshot and replay the journal on top of it.
+
+        Snapshots written before tasks had IDs are given IDs and rewritten
+        once, since journal records refer to tasks by ID.
+
+        Returns:
+            list: Task dicts with "id", "text", "checked", "created" and
+                "order" keys
+        """
+        with file_lock(self.lock_path):
+            signature = self._signature()
+            tasks = self._read_snapshot()
+            records, offset = self._read_journal()
+            migrated = False
+            if not self.snapshot_complete:
+                for task in tasks:
+                    if "id" not in task:
+                        task["id"] = new_task_id()
+                        migrated = True
+                    task["checked"] = bool(task.get("checked", False))
+                    task.setdefault("created", 0.0)
+                fill_orders(tasks)
+
+            replay(tasks, records)
+            if migrated:
+                self._write_snapshot(tasks)
+            else:
+                self._mark_read(signature, offset)
+        return tasks
+
+    def iter_load(self):
+        """
+        Yield tasks one at a time, parsing the snapshot incrementally.
+
+        The files are read under the lock up front; the journal is grouped
+        by task ID, so each snapshot task can be patched as it is parsed.
+        Tasks added in the journal follow the snapshot.
+        """
+        with file_lock(self.lock_path):
+            signature = self._signature()
+            data = self._read_snapshot_data()
+            records, offset = self._read_journal()
+            self._mark_read(signature, offset)
+
+        cleared = False
+        for i in range(len(records) - 1, -1, -1):
+            if records[i].get("op") == "clear":
+                # Nothing written before the last clear survives it
+                records = records[i + 1:]
+                cleared = True
+                break
+
+        plan = _plan_adds(records)
+        if plan is None:
+            # Restored or moved tasks, or added ones that sort among the
+            # others: replay everything instead (until the next compaction
+            # bakes them into the snapshot)
+            yield from self.load()
+            return
+        ops_by_id, added, lowest = plan
+
+        seen = set()
+        yielded = 0
+        # Key of the snapshot's last task, removed or not
+        last = None
+        snapshot = iter(()) if cleared or data is None else self._iter_snapshot(data)
+        complete = self.snapshot_complete
+        for task in snapshot:
+            if complete:
+                last = task["order"]
+            elif "id" not in task:
+                # Pre-ID snapshot: needs the one-off migration in load()
+                snapshot.close()
+                yield from self.load()
+                return
+            else:
+                task["checked"] = bool(task.get("checked", False))
+                task.setdefault("created", 0.0)
+                task["order"] = last = fit_order(task.get("order"), last, None)
+            if lowest is not None and last >= lowest:
+                # A task added in the journal goes before this one
+                snapshot.close()
+                yield from islice(self.load(), yielded, None)
+                return
+            ops = ops_by_id.get(task["id"])
+            if ops is None:
+                yielded += 1
+                yield task
+                continue
+            seen.add(task["id"])
+            for task in replay([task], ops):
+                yielded += 1
+                yield task
+
+        # Keys of the added tasks, in the order they were added
+        orders = {}
+        for task_id, order, after in added:
+            if order is None:
+                order = fit_order(None, last if after is None else orders[after], None)
+            orders[task_id] = order
+        for task_id, _, _ in added:
+            if task_id in seen:
+                continue
+            seen.add(task_id)
+            for task in replay([], ops_by_id[task_id]):
+                task["order"] = orders[task_id]
+                yield task
+
+    def _iter_snapshot(self, text):
+        """Yield the elements of the snapshot's JSON array one by one."""
+        decoder = json.JSONDecoder()
+        skip = WHITESPACE.match
+        size = len(text)
+        pos = skip(text, 0).end()
+        if pos >= size or text[pos] != "[":
+            raise ValueError(f"{self.snapshot_path} is not a JSON array")
+        pos = skip(text, pos + 1).end()
+        while pos < size and text[pos] != "]":
+            task, pos = decoder.raw_decode(text, pos)
+            yield task
+            pos = skip(text, pos).end()
+            if pos < size and text[pos] == ",":
+                pos = skip(text, pos + 1).end()
+
+    def read_changes(self):
+        """
+        Return the records other writers appended since this journal last
+        read the files.
+
+        Returns:
+            list: Journal records in the order they were written. They may
+                include this journal's own records, always together with
+                every own record after them, so replaying them in order ends
+                in the state this journal already has. None if the
+                snapshot was replaced in a way that needs a full load() to
+                catch up with, or if this journal appended after a
+                compaction stashed unread records.
+        """
+        with file_lock(self.lock_path):
+            if self._unread_stale:
+                # Our appends since were read past: the stash would replay
+                # our own older records without the ones undoing them
+                self._unread = []
+                self._unread_stale = False
+                return None
+            signature = self._signature()
+            if signature != self._snapshot_signature and not self._follow_compaction(signature):
+                return None
+            if self._file_size(self.journal_path) < self._read_offset:
+                # Truncated without a marker we could follow
+                return None
+            records, self._read_offset = self._read_journal(self._read_offset)
+            records = self._unread + records
+            self._unread = []
+            return records
+
+    def _follow_compaction(self, signature):
+        """
+        Catch up with a compaction by another writer if it only folded
+        records this journal had already read.
+
+        Returns:
+            bool: True if reading can carry on after the marker
+        """
+        try:
+            with open(self.journal_path, 'rb') as f:
+                line = f.readline()
+            marker = json.loads(line)
+        except (OSError, ValueError):
+            return False
+        if (not isinstance(marker, dict) or marker.get("op") != "compacted"
+                or marker.get("from") != self._read_offset
+                or marker.get("base") != self._snapshot_signature):
+            return False
+        self._snapshot_signature = signature
+        self._read_offset = len(line)
+        return True
+
+    def append(self, records):
+        """
+        Append records to the journal and sync them to disk.
+
+        Args:
+            records (list): Journal records
+        """
+        if not records:
+            return
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n"
+                       for record in records).encode('utf-8')
+        with file_lock(self.lock_path):
+            with open(self.journal_path, 'ab') as f:
+                start = f.tell()
+                if start not in (0, self._journal_size) and not self._ends_with_newline(start):
+                    # Never glue a record onto a torn line
+                    data = b"\n" + data
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+                self._journal_size = f.tell()
+            self.bytes_written += len(data)
+            if start == self._read_offset:
+                # Nobody else wrote since our last read; no need to read our own records
+                self._read_offset = self._journal_size
+                if self._unread:
+                    self._unread_stale = True
+
+    def _ends_with_newline(self, size):
+        """Return True if the journal's last byte is a newline."""
+        with open(self.journal_path, 'rb') as f:
+            f.seek(size - 1)
+            return f.read(1) == b"\n"
+
+    def needs_compaction(self):
+        """Return True once the journal has grown past the threshold."""
+        return self._journal_size >= self.compact_threshold
+
+    def compact(self):
+        """
+        Fold the journal into a new snapshot and start a journal holding
+        only the compaction marker.
+
+        Records this journal has not read yet (other writers', with any of
+        its own in between) are kept for the next read_changes().
+        """
+        with file_lock(self.lock_path):
+            base = self._signature()
+            records, size = self._read_journal()
+            tasks = self._read_snapshot()
+            if not self.snapshot_complete:
+                fill_orders(tasks)
+            tasks = replay(tasks, records)
+            up_to_date = base == self._snapshot_signature
+            if up_to_date:
+                unread = self._unread + self._read_journal(self._read_offset)[0]
+                stale = self._unread_stale
+            marker = {"op": "compacted", "from": size, "base": base}
+            self._write_snapshot(tasks, marker)
+            if up_to_date:
+                self._unread, self._unread_stale = unread, stale
+            else:
+                # The snapshot was replaced under us: read_changes() must
+                # keep asking for a full load
+                self._snapshot_signature = None
+
+    def write_snapshot(self, tasks):
+        """
+        Atomically replace the snapshot and truncate the journal.
+
+        Args:
+            tasks (list): Task dicts to write
+        """
+        with file_lock(self.lock_path):
+            self._write_snapshot(tasks)
+
+    def _write_snapshot(self, tasks, marker=None):
+        """write_snapshot() with the lock held, optionally starting the journal with a marker."""
+        data = self._encode_snapshot(tasks)
+        atomic_write_bytes(self.snapshot_path, data)
+        head = b"" if marker is None else (json.dumps(marker) + "\n").encode('utf-8')
+        with open(self.journal_path, 'wb') as f:
+            f.write(head)
+        self._journal_size = len(head)
+        self.bytes_written += len(data) + len(head)
+        self._mark_read(self._signature(), len(head))
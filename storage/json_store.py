@@ -0,0 +1,76 @@
+"""
+JsonTaskStorage - Tasks in a JSON snapshot plus append-only journal.
+"""
+
+from storage.base import TaskStorage
+from storage.journal import TaskJournal
+
+
+class JsonTaskStorage(TaskStorage):
+    """
+    Stores tasks in the classic tasks.json file with a journal next to it.
+
+    Args:
+        path (Path): JSON snapshot file
+        compact_threshold (int): Journal size in bytes that triggers compaction
+        list_name (str): Name of the task list stored in the file
+    """
+
+    name = "json"
+
+    #: TaskJournal class reading and writing the snapshot
+    journal_class = TaskJournal
+
+    def __init__(self, path, compact_threshold=256 * 1024, list_name="default"):
+        self.journal = self.journal_class(path, compact_threshold=compact_threshold)
+        self.list_name = list_name
+
+    @property
+    def location(self):
+        """Return the snapshot file path."""
+        return str(self.journal.snapshot_path)
+
+    @property
+    def bytes_written(self):
+        """Return the bytes written to the snapshot and journal."""
+        return self.journal.bytes_written
+
+    def exists(self):
+        """Return True if a snapshot or journal exists."""
+        return self.journal.exists()
+
+    def create(self):
+        """Write an empty snapshot if the list has no file yet."""
+        if not self.exists():
+            self.journal.write_snapshot([])
+
+    def load(self, only_open=False):
+        """Load the snapshot and replay the journal on top of it."""
+        tasks = self.journal.load()
+        if only_open:
+            tasks = [task for task in tasks if not task["checked"]]
+        return tasks
+
+    def iter_load(self, only_open=False):
+        """Stream tasks from the snapshot with journal changes applied."""
+        for task in self.journal.iter_load():
+            if not (only_open and task["checked"]):
+                yield task
+
+    def watch_paths(self):
+        """Return the snapshot and journal files."""
+        return [self.location, str(self.journal.journal_path)]
+
+    def read_changes(self):
+        """Return the journal records other processes appended since the last read."""
+        return self.journal.read_changes()
+
+    def apply(self, records):
+        """
+        Append records to the journal, first compacting it if it has grown
+        too large. Compacting before the append folds only records other
+        instances have had time to read, so they can skip the new snapshot.
+        """
+        if records and self.journal.needs_compaction():
+            self.journal.compact()
+        self.journal.append(records)
@@ -0,0 +1,45 @@
+"""
+Advisory file locks shared by every process writing a task list.
+
+Instances of the app (and well-behaved scripts) take the lock around
+journal appends and compactions, so records from several writers
+interleave whole and a compaction never drops a concurrent append.
+"""
+
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Hold an exclusive advisory lock for the duration of the block.
+
+    The lock is taken on a separate lock file, created if missing, so the
+    data files themselves can be replaced atomically while it is held.
+    Locks are per open file, so two threads of one process exclude each
+    other as well.
+
+    Args:
+        path (str | Path): Lock file
+    """
+    with open(os.fspath(path), "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
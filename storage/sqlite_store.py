@@ -0,0 +1,230 @@
+"""
+SqliteTaskStorage - Tasks as rows in an indexed SQLite database.
+"""
+
+import sqlite3
+import threading
+
+from storage.base import TaskStorage
+from storage.journal import insert_orders
+from storage.tasks import ORDER_STEP
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY,
+        list_name TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        text TEXT NOT NULL,
+        checked INTEGER NOT NULL DEFAULT 0,
+        created REAL NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS idx_tasks_list_position ON tasks (list_name, position);
+    CREATE INDEX IF NOT EXISTS idx_tasks_list_checked ON tasks (list_name, checked);
+    CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks (created);
+    CREATE TABLE IF NOT EXISTS lists (
+        name TEXT PRIMARY KEY
+    );
+"""
+
+
+class SqliteTaskStorage(TaskStorage):
+    """
+    Stores tasks as rows of a SQLite table, one row per task.
+
+    Every journal record becomes a single-row INSERT, UPDATE or DELETE, and
+    each batch is committed as one transaction. Several task lists can share
+    one database file; rows are keyed by list name. The position column
+    holds the tasks' sort keys (lists from before sort keys have positions
+    1, 2, 3 ..., which serve as keys as they are).
+
+    Args:
+        path (Path): Database file
+        list_name (str): Name of the task list this storage reads and writes
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path, list_name="default"):
+        self.path = path
+        self.list_name = list_name
+        # Opened on the GUI thread, written from the persistence thread;
+        # the lock keeps the two from using it at the same time.
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        # PRAGMA data_version when the list was last read; it only moves
+        # when another connection commits
+        self._data_version = None
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    @property
+    def location(self):
+        """Return the database path and list name."""
+        return f"{self.path} [{self.list_name}]"
+
+    @staticmethod
+    def list_names(path):
+        """
+        Return the names of the lists in a database file.
+
+        Args:
+            path (Path): Database file
+
+        Returns:
+            list: List names in alphabetical order
+        """
+        if not path.exists():
+            return []
+        conn = sqlite3.connect(str(path))
+        try:
+            conn.executescript(SCHEMA)
+            rows = conn.execute("SELECT name FROM lists UNION "
+                                "SELECT DISTINCT list_name FROM tasks ORDER BY 1")
+            return [name for name, in rows]
+        finally:
+            conn.close()
+
+    def exists(self):
+        """Return True if the list was created or has any rows."""
+        with self._lock:
+            row = self.conn.execute("SELECT 1 FROM lists WHERE name = ? UNION ALL "
+                                    "SELECT 1 FROM tasks WHERE list_name = ? LIMIT 1",
+                                    (self.list_name, self.list_name)).fetchone()
+        return row is not None
+
+    def create(self):
+        """Record the list so it is listed while it has no tasks."""
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO lists (name) VALUES (?)",
+                              (self.list_name,))
+
+    def _select_tasks(self, conn, only_open):
+        """Yield task dicts from a SELECT ordered by position."""
+        query = "SELECT id, text, checked, created, position FROM tasks WHERE list_name = ?"
+        if only_open:
+            query += " AND checked = 0"
+        query += " ORDER BY position, id"
+        for task_id, text, checked, created, order in conn.execute(query, (self.list_name,)):
+            yield {"id": task_id, "text": text, "checked": bool(checked), "created": created,
+                   "order": float(order)}
+
+    def _read_data_version(self):
+        """Return the connection's PRAGMA data_version; call with the lock held."""
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def load(self, only_open=False):
+        """Load tasks ordered by position, optionally only open ones."""
+        with self._lock:
+            self._data_version = self._read_data_version()
+            return list(self._select_tasks(self.conn, only_open))
+
+    def iter_load(self, only_open=False):
+        """
+        Stream tasks through a separate read connection, so the persistence
+        thread can keep writing while a progressive load is in flight.
+        """
+        with self._lock:
+            self._data_version = self._read_data_version()
+        conn = sqlite3.connect(str(self.path))
+        try:
+            yield from self._select_tasks(conn, only_open)
+        finally:
+            conn.close()
+
+    def watch_paths(self):
+        """Return the database file and its write-ahead log."""
+        return [str(self.path), f"{self.path}-wal"]
+
+    def read_changes(self):
+        """
+        Tell whether another connection committed since the list was read.
+
+        Rows carry no change history, so any outside commit (to any list in
+        the file) asks the caller to compare against load().
+        """
+        with self._lock:
+            if self._read_data_version() == self._data_version:
+                return []
+        return None
+
+    def count(self, checked=None):
+        """Count tasks using the list/checked index."""
+        if checked is None:
+            query, params = "SELECT COUNT(*) FROM tasks WHERE list_name = ?", (self.list_name,)
+        else:
+            query = "SELECT COUNT(*) FROM tasks WHERE list_name = ? AND checked = ?"
+            params = (self.list_name, int(checked))
+        with self._lock:
+            return self.conn.execute(query, params).fetchone()[0]
+
+    def apply(self, records):
+        """Apply journal records as row-level changes in one transaction."""
+        with self._lock, self.conn:
+            for record in records:
+                op = record["op"]
+                if op == "rebalance":
+                    self.conn.executemany("UPDATE tasks SET position = ? WHERE id = ?",
+                                          zip(record["orders"], record["ids"]))
+                elif "ids" in record:
+                    self._apply_many(op, record["ids"])
+                elif op == "clear":
+                    self.conn.execute("DELETE FROM tasks WHERE list_name = ?",
+                                      (self.list_name,))
+                elif op == "add":
+                    # The record's key, or one step past the last, as in TaskStore.append()
+                    order = record.get("order")
+                    self.conn.execute(
+                        "INSERT OR IGNORE INTO tasks (id, list_name, position, text, checked, created) "
+                        "VALUES (?, ?, (SELECT COALESCE(?, MAX(position) + ?, ?) FROM tasks "
+                        "WHERE list_name = ?), ?, ?, ?)",
+                        (record["id"], self.list_name, order, ORDER_STEP, ORDER_STEP,
+                         self.list_name, record["text"],
+                         int(record.get("checked", False)), record.get("created", 0.0)))
+                elif op == "remove":
+                    self.conn.execute("DELETE FROM tasks WHERE id = ?", (record["id"],))
+                elif op in ("check", "uncheck"):
+                    self.conn.execute("UPDATE tasks SET checked = ? WHERE id = ?",
+                                      (int(op == "check"), record["id"]))
+                elif op == "edit":
+                    self.conn.execute("UPDATE tasks SET text = ? WHERE id = ?",
+                                      (record["text"], record["id"]))
+                elif op == "move":
+                    self.conn.execute("UPDATE tasks SET position = ? WHERE id = ?",
+                                      (record["order"], record["id"]))
+                elif op == "insert":
+                    self._apply_insert(record["rows"], record["tasks"])
+
+    def _apply_many(self, op, task_ids):
+        """Apply a bulk remove/check/uncheck record with one executemany."""
+        params = [(task_id,) for task_id in task_ids]
+        if op == "remove":
+            self.conn.executemany("DELETE FROM tasks WHERE id = ?", params)
+        elif op in ("check", "uncheck"):
+            self.conn.executemany(f"UPDATE tasks SET checked = {int(op == 'check')} WHERE id = ?",
+                                  params)
+
+    def _apply_insert(self, rows, tasks):
+        """
+        Put tasks back at given rows, with sort keys between their new
+        neighbours' (see storage.journal.insert_orders); no other row changes.
+        """
+        orders = [order for order, in self.conn.execute(
+            "SELECT position FROM tasks WHERE list_name = ? ORDER BY position, id",
+            (self.list_name,))]
+        placed = [(row, task) for row, task in zip(rows, tasks)
+                  if self.conn.execute("SELECT 1 FROM tasks WHERE id = ?",
+                                       (task["id"],)).fetchone() is None]
+        if not placed:
+            return
+        fitted = insert_orders(orders, [row for row, _ in placed],
+                               [task.get("order") for _, task in placed])
+        self.conn.executemany(
+            "INSERT INTO tasks (id, list_name, position, text, checked, created) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(task["id"], self.list_name, order, task["text"], int(task.get("checked", False)),
+              task.get("created", 0.0)) for (_, task), order in zip(placed, fitted)])
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
@@ -0,0 +1,814 @@
+"""
+TaskStore - Compact in-memory store of tasks, independent of any widget.
+
+Task fields live in parallel column arrays indexed by slot, and IDs are
+found through an open-addressing hash table of slot numbers, so a task
+costs about 50 bytes plus its text instead of a dict or widget. Tasks are
+kept in ascending order of their sort keys (see storage.tasks.fit_order),
+so moving one only changes its own key. Removed tasks leave a tombstone
+slot that is skipped when mapping rows to slots, and tombstones are
+squeezed out once they pile up. A word index for filtering is built on
+demand, optionally in slices, and then kept in step with every write.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from itertools import compress
+
+from storage.journal import insert_orders
+from storage.tasks import MIN_ORDER_GAP, ORDER_STEP, fit_order
+from storage.text_index import TextIndex
+
+
+_EMPTY = -1
+_DELETED = -2
+
+# When a move finds no room between its neighbours' keys, the keys
+# around it are spread out until they are at least this far apart
+RESPREAD_GAP = ORDER_STEP / 16
+
+
+class _IdIndex:
+    """
+    Hash table from task ID to slot, stored as one array of slot numbers.
+
+    Keys are not stored: a table entry is a slot, and the key is read back
+    from the store's ID column.
+
+    Args:
+        ids (array): The store's ID column
+    """
+
+    def __init__(self, ids):
+        self._ids = ids
+        self._size = 0
+        self._used = 0
+        self._mask = 7
+        self._table = array("q", [_EMPTY]) * 8
+        for slot in range(len(ids)):
+            self.add(ids[slot], slot)
+
+    def __len__(self):
+        return self._size
+
+    def _start(self, task_id):
+        """Return the first table position and perturbation for an ID."""
+        return ((task_id * 0x9E3779B97F4A7C15) >> 16) & self._mask, task_id
+
+    def get(self, task_id):
+        """Return the slot of an ID, or None."""
+        table = self._table
+        ids = self._ids
+        mask = self._mask
+        pos, perturb = self._start(task_id)
+        while True:
+            slot = table[pos]
+            if slot == _EMPTY:
+                return None
+            if slot != _DELETED and ids[slot] == task_id:
+                return slot
+            perturb >>= 5
+            pos = (pos * 5 + perturb + 1) & mask
+
+    def add(self, task_id, slot):
+        """
+        Map a new ID to a slot.
+
+        Raises:
+            KeyError: If the ID is already in the table
+        """
+        if (self._used + 1) * 3 > len(self._table) * 2:
+            self._resize()
+        table = self._table
+        ids = self._ids
+        mask = self._mask
+        pos, perturb = self._start(task_id)
+        free = -1
+        while True:
+            entry = table[pos]
+            if entry == _EMPTY:
+                break
+            if entry == _DELETED:
+                if free < 0:
+                    free = pos
+            elif ids[entry] == task_id:
+                raise KeyError(f"Duplicate task ID {task_id}")
+            perturb >>= 5
+            pos = (pos * 5 + perturb + 1) & mask
+        if free >= 0:
+            pos = free
+        else:
+            self._used += 1
+        table[pos] = slot
+        self._size += 1
+
+    def find(self, task_id):
+        """Return the table position of an ID, or -1."""
+        table = self._table
+        ids = self._ids
+        mask = self._mask
+        pos, perturb = self._start(task_id)
+        while True:
+            slot = table[pos]
+            if slot == _EMPTY:
+                return -1
+            if slot != _DELETED and ids[slot] == task_id:
+                return pos
+            perturb >>= 5
+            pos = (pos * 5 + perturb + 1) & mask
+
+    def assign(self, position, slot):
+        """Point a table position returned by find() at another slot."""
+        self._table[position] = slot
+
+    def shift(self, first, last, delta):
+        """
+        Add delta to the slots first..last, for a block of tasks moving
+        together. Call it before the ID column itself changes.
+
+        A short block is looked up ID by ID; a long one costs one pass
+        over the table instead.
+        """
+        if (last - first + 1) * 16 < len(self._table):
+            positions = [self.find(self._ids[slot]) for slot in range(first, last + 1)]
+            table = self._table
+            for position in positions:
+                if position >= 0:
+                    table[position] += delta
+        else:
+            self._table = array("q", [slot + delta if first <= slot <= last else slot
+                                      for slot in self._table])
+
+    def pop(self, task_id):
+        """Remove an ID and return its slot, or None."""
+        table = self._table
+        ids = self._ids
+        mask = self._mask
+        pos, perturb = self._start(task_id)
+        while True:
+            slot = table[pos]
+            if slot == _EMPTY:
+                return None
+            if slot != _DELETED and ids[slot] == task_id:
+                table[pos] = _DELETED
+                self._size -= 1
+                return slot
+            perturb >>= 5
+            pos = (pos * 5 + perturb + 1) & mask
+
+    def _resize(self):
+        """Grow the table, dropping deleted markers."""
+        live = [slot for slot in self._table if slot >= 0]
+        capacity = 8
+        while capacity < max(len(live), 1) * 3:
+            capacity *= 2
+        self._mask = capacity - 1
+        self._table = array("q", [_EMPTY]) * capacity
+        self._size = 0
+        self._used = 0
+        for slot in live:
+            self.add(self._ids[slot], slot)
+
+
+class Task:
+    """
+    A single task, used to pass tasks in and out of the store.
+
+    Args:
+        id (int): Stable task ID
+        text (str): The task description text
+        checked (bool): Completion state
+        created (float): Creation time as a Unix timestamp
+        order (float, optional): Sort key; None until the task is placed in a store
+    """
+
+    __slots__ = ("id", "text", "checked", "created", "order")
+
+    def __init__(self, id, text, checked=False, created=0.0, order=None):
+        self.id = id
+        self.text = text
+        self.checked = checked
+        self.created = created
+        self.order = order
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a task from a storage dict."""
+        return cls(data["id"], data["text"], bool(data.get("checked", False)),
+                   data.get("created", 0.0), data.get("order"))
+
+    def to_dict(self):
+        """Return the task as a storage dict."""
+        return {"id": self.id, "text": self.text, "checked": self.checked,
+                "created": self.created, "order": self.order}
+
+    def __repr__(self):
+        return f"Task({self.id!r}, {self.text!r}, checked={self.checked!r})"
+
+
+class TaskStore:
+    """
+    Ordered collection of tasks with O(1) lookup and removal by ID.
+
+    Rows are the positions of live tasks in display order; slots are
+    positions in the column arrays, including tombstones. With no
+    tombstones the two are the same.
+    """
+
+    # Squeeze out tombstones once there are this many and they
+    # outnumber half the live tasks
+    COMPACT_MIN = 1024
+
+    def __init__(self, tasks=()):
+        self._ids = array("q")
+        self._checked = bytearray()
+        self._created = array("d")
+        self._order = array("d")
+        self._texts = []
+        self._slot_of = _IdIndex(self._ids)
+        self._dead = []
+        self._text_index = None
+        self._indexed = 0
+        self.extend(tasks)
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def __contains__(self, task_id):
+        return self._slot_of.get(task_id) is not None
+
+    def __iter__(self):
+        """Yield live tasks in display order."""
+        for slot in range(len(self._ids)):
+            if self._texts[slot] is not None:
+                yield self._task(slot)
+
+    # -- row/slot mapping -------------------------------------------------
+
+    def _slot(self, row):
+        """Return the slot holding the given row."""
+        if not self._dead:
+            return row
+        slot = row
+        while True:
+            target = row + bisect_right(self._dead, slot)
+            if target == slot:
+                return slot
+            slot = target
+
+    def _row(self, slot):
+        """Return the row of a live slot."""
+        if not self._dead:
+            return slot
+        return slot - bisect_left(self._dead, slot)
+
+    def _task(self, slot):
+        return Task(self._ids[slot], self._texts[slot], bool(self._checked[slot]),
+                    self._created[slot], self._order[slot])
+
+    # -- reads ------------------------------------------------------------
+
+    def row_of(self, task_id):
+        """Return the row of a task, or -1 if it is not in the store."""
+        slot = self._slot_of.get(task_id)
+        return -1 if slot is None else self._row(slot)
+
+    def get(self, task_id):
+        """Return the task with the given ID, or None."""
+        slot = self._slot_of.get(task_id)
+        return None if slot is None else self._task(slot)
+
+    def task_at(self, row):
+        """Return the task at a row."""
+        return self._task(self._slot(row))
+
+    def id_at(self, row):
+        """Return the ID of the task at a row."""
+        return self._ids[self._slot(row)]
+
+    def text_at(self, row):
+        """Return the text of the task at a row."""
+        return self._texts[self._slot(row)]
+
+    def checked_at(self, row):
+        """Return the completion state of the task at a row."""
+        return bool(self._checked[self._slot(row)])
+
+    def order_at(self, row):
+        """Return the sort key of the task at a row."""
+        return self._order[self._slot(row)]
+
+    def _last_order(self):
+        """Return the sort key of the last task, or None if the store is empty."""
+        return self.order_at(len(self) - 1) if len(self) else None
+
+    def ids(self):
+        """Return the IDs of all tasks in display order."""
+        texts, ids = self._texts, self._ids
+        return [ids[slot] for slot in range(len(ids)) if texts[slot] is not None]
+
+    def checked_ids(self, checked=True):
+        """Return the IDs of all tasks in the given completion state, in order."""
+        flag = 1 if checked else 0
+        texts, states, ids = self._texts, self._checked, self._ids
+        return [ids[slot] for slot in range(len(ids))
+                if states[slot] == flag and texts[slot] is not None]
+
+    def completed(self):
+        """Return (id, created) of every completed task, in order."""
+        texts, states, ids, created = self._texts, self._checked, self._ids, self._created
+        return [(ids[slot], created[slot]) for slot in range(len(ids))
+                if states[slot] and texts[slot] is not None]
+
+    def rows_of(self, task_ids, within=None):
+        """
+        Return the rows of the given tasks in display order.
+
+        Args:
+            task_ids (set): IDs to look for; unknown IDs are ignored
+            within (list, optional): Ascending rows to restrict the search to;
+                by default the whole store is scanned
+
+        Returns:
+            list: Ascending rows
+        """
+        if not task_ids:
+            return []
+        if len(task_ids) >= len(self):
+            # The IDs of every live task
+            return list(range(len(self)))
+        if len(task_ids) * 16 < len(self if within is None else within):
+            # Few matches: look each one up rather than scanning
+            rows = (self.row_of(task_id) for task_id in task_ids)
+            return sorted(row for row in rows if row >= 0)
+
+        contains = task_ids.__contains__
+        if within is not None:
+            id_at = self.id_at if self._dead else self._ids.__getitem__
+            return list(compress(within, map(contains, map(id_at, within))))
+        slots = compress(range(len(self._ids)), map(contains, self._ids))
+        if not self._dead:
+            return list(slots)
+        texts = self._texts
+        return [self._row(slot) for slot in slots if texts[slot] is not None]
+
+    def order_row(self, order, task_id=None):
+        """
+        Return the row a task with this sort key goes to.
+
+        Among tasks with an equal key it goes by ID, as in journal replay;
+        without an ID, after them.
+        """
+        if not self._dead:
+            row = bisect_left(self._order, order)
+        else:
+            row, hi = 0, len(self)
+            while row < hi:
+                mid = (row + hi) // 2
+                if self.order_at(mid) < order:
+                    row = mid + 1
+                else:
+                    hi = mid
+        while row < len(self) and self.order_at(row) == order and (
+                task_id is None or self.id_at(row) < task_id):
+            row += 1
+        return row
+
+    def order_for_move(self, task_id, row):
+        """
+        Return the sort key that moves a task to a row.
+
+        The key is the midpoint of the new neighbours' keys. When earlier
+        moves into the same spot have used up the room between them, the
+        keys of the tasks around it are spread out evenly first, over a
+        window that doubles until they are RESPREAD_GAP apart. That keeps
+        their order, and only ever rewrites the keys of one neighbourhood.
+
+        Args:
+            task_id (int): Task to move
+            row (int): Row it should end up at
+
+        Returns:
+            tuple: (order, task_ids, orders): the task's new key, and the
+                tasks whose keys set_orders() has to change first, with their
+                new keys; both lists are empty while there is room
+        """
+        self.compact()
+        slot = self._slot_of.get(task_id)
+        if slot is None:
+            raise KeyError(task_id)
+        order, ids = self._order, self._ids
+        # Rows of the other tasks, as if the moving one were taken out
+        others = len(order) - 1
+        row = max(0, min(row, others))
+
+        def other(i):
+            return i if i < slot else i + 1
+
+        width = 0
+        while True:
+            first, end = max(0, row - width), min(others, row + width)
+            before = order[other(first - 1)] if first else None
+            after = order[other(end)] if end < others else None
+            # The window's tasks plus the moving one, evenly spaced
+            count = end - first + 1
+            room = ORDER_STEP * (count + 1)
+            if before is None:
+                low, high = (0.0, room) if after is None else (after - room, after)
+            else:
+                low, high = before, (before + room if after is None else after)
+            step = (high - low) / (count + 1)
+            if width == 0:
+                moved = low + step
+                if high - low >= MIN_ORDER_GAP and low < moved < high:
+                    return moved, [], []
+            elif step >= RESPREAD_GAP or (before is None and after is None):
+                break
+            width = width * 2 or 1
+
+        task_ids, orders = [], []
+        for i in range(first, end):
+            task_ids.append(ids[other(i)])
+            orders.append(low + step * (i - first + (2 if i >= row else 1)))
+        return low + step * (row - first + 1), task_ids, orders
+
+    def set_orders(self, task_ids, orders):
+        """
+        Give tasks new sort keys without moving them.
+
+        The caller keeps the keys in row order (see order_for_move()).
+        Unknown IDs are ignored.
+        """
+        for task_id, order in zip(task_ids, orders):
+            slot = self._slot_of.get(task_id)
+            if slot is not None:
+                self._order[slot] = order
+
+    def move_row(self, task_id, order):
+        """
+        Return the row a task would end up at with a new sort key.
+
+        Args:
+            task_id (int): Task to move; it must be in the store
+            order (float): Its new sort key
+        """
+        self.compact()
+        slot = self._slot_of.get(task_id)
+        keys = self._order
+        if slot + 1 < len(keys) and order >= keys[slot + 1]:
+            return bisect_right(keys, order, slot + 1) - 1
+        if slot and order < keys[slot - 1]:
+            return bisect_right(keys, order, 0, slot)
+        return slot
+
+    def text_index(self):
+        """
+        Return the word index over task text, finishing building it if needed.
+
+        Once built it is kept up to date by every write.
+        """
+        self.build_text_index()
+        return self._text_index
+
+    def build_text_index(self, limit=None):
+        """
+        Index task text, resuming where an earlier call stopped.
+
+        Slots before the build position are kept up to date by writes;
+        later ones are picked up when the build reaches them.
+
+        Args:
+            limit (int, optional): Index at most this many slots in this call
+
+        Returns:
+            bool: True once every task is indexed
+        """
+        if self._text_index is None:
+            self._text_index = TextIndex()
+            self._indexed = 0
+        start = self._indexed
+        end = len(self._ids) if limit is None else min(len(self._ids), start + limit)
+        index, ids, texts = self._text_index, self._ids, self._texts
+        for slot in range(start, end):
+            if texts[slot] is not None:
+                index.add(ids[slot], texts[slot])
+        self._indexed = end
+        return end == len(ids)
+
+    def _is_indexed(self, slot):
+        """Return True if the text index covers a slot."""
+        return self._text_index is not None and slot < self._indexed
+
+    def to_dicts(self):
+        """Return all tasks as storage dicts in display order."""
+        return [task.to_dict() for task in self]
+
+    # -- writes -----------------------------------------------------------
+
+    def append(self, task):
+        """
+        Add a task at the end, or where its sort key (then its ID, for
+        equal keys) sorts if that is earlier.
+
+        Args:
+            task (Task | dict): Task to add; its ID must not be in the store.
+                Without a sort key it gets one ORDER_STEP past the last.
+
+        Returns:
+            int: Row of the new task
+        """
+        if isinstance(task, dict):
+            task_id, text = task["id"], task["text"]
+            checked, created = task.get("checked", False), task.get("created", 0.0)
+            order = task.get("order")
+        else:
+            task_id, text, checked, created = task.id, task.text, task.checked, task.created
+            order = task.order
+        last = self._last_order()
+        if order is not None and last is not None and (
+                order < last or order == last and task_id < self.id_at(len(self) - 1)):
+            row = self.order_row(order, task_id)
+            self.insert(row, [Task(task_id, text, checked, created, order)])
+            return row
+        slot = len(self._ids)
+        self._slot_of.add(task_id, slot)
+        self._ids.append(task_id)
+        self._checked.append(1 if checked else 0)
+        self._created.append(created)
+        self._order.append(fit_order(order, last, None))
+        self._texts.append(text)
+        if self._text_index is not None and self._indexed == slot:
+            self._text_index.add(task_id, text)
+            self._indexed += 1
+        return len(self._slot_of) - 1
+
+    def extend(self, tasks):
+        """Add several tasks at the end."""
+        for task in tasks:
+            self.append(task)
+
+    def insert(self, row, tasks, loaded=False):
+        """
+        Insert tasks before a row.
+
+        Costs O(len(tasks)) plus re-indexing the tasks after the insertion
+        point, so inserting near the end (as the loader does when tasks are
+        added while it runs) stays cheap.
+
+        Args:
+            row (int): Row to insert before
+            tasks (iterable): Tasks or storage dicts
+            loaded (bool): The tasks were read from storage, in order: keep
+                their sort keys even where tasks added since sort lower.
+                Otherwise keys that do not fit between the neighbours are
+                replaced by ones that do.
+        """
+        if row >= len(self):
+            self.extend(tasks)
+            return
+        tasks = [Task.from_dict(t) if isinstance(t, dict) else t for t in tasks]
+        for task in tasks:
+            if task.id in self:
+                raise KeyError(f"Duplicate task ID {task.id}")
+
+        slot = self._slot(row)
+        count = len(tasks)
+        tail = [s for s in range(slot, len(self._ids)) if self._texts[s] is not None]
+        for s in tail:
+            self._slot_of.pop(self._ids[s])
+
+        before = self.order_at(row - 1) if row else None
+        after = self._order[slot]
+        orders = array("d")
+        for task in tasks:
+            before = fit_order(task.order, before, None if loaded else after)
+            orders.append(before)
+
+        self._ids[slot:slot] = array("q", (t.id for t in tasks))
+        self._checked[slot:slot] = bytes(1 if t.checked else 0 for t in tasks)
+        self._created[slot:slot] = array("d", (t.created for t in tasks))
+        self._order[slot:slot] = orders
+        self._texts[slot:slot] = [t.text for t in tasks]
+
+        first_dead = bisect_left(self._dead, slot)
+        self._dead[first_dead:] = [s + count for s in self._dead[first_dead:]]
+        for s in range(slot, slot + count):
+            self._slot_of.add(self._ids[s], s)
+        for s in tail:
+            self._slot_of.add(self._ids[s + count], s + count)
+        if self._is_indexed(slot):
+            for task in tasks:
+                self._text_index.add(task.id, task.text)
+            self._indexed += count
+
+    def insert_rows(self, rows, tasks):
+        """
+        Insert tasks so each ends up at its row, in one pass over the store.
+
+        Puts back tasks removed from all over the list (undo); a single
+        contiguous run goes through insert().
+
+        Args:
+            rows (list): Final row of each task, ascending
+            tasks (list): Tasks or storage dicts, one per row
+        """
+        tasks = [Task.from_dict(t) if isinstance(t, dict) else t for t in tasks]
+        if not tasks:
+            return
+        if rows[-1] - rows[0] == len(tasks) - 1:
+            self.insert(rows[0], tasks)
+            return
+        for task in tasks:
+            if task.id in self:
+                raise KeyError(f"Duplicate task ID {task.id}")
+
+        self.compact()
+        indexed = self._text_index is not None and self._indexed == len(self._ids)
+        ids, checked, created, order, texts = (
+            self._ids, self._checked, self._created, self._order, self._texts)
+        orders = insert_orders(order, rows, [task.order for task in tasks])
+        new_ids, new_checked, new_created, new_order, new_texts = (
+            array("q"), bytearray(), array("d"), array("d"), [])
+        pos = 0
+        for row, task, task_order in zip(rows, tasks, orders):
+            take = max(0, min(row - len(new_texts), len(texts) - pos))
+            new_ids.extend(ids[pos:pos + take])
+            new_checked += checked[pos:pos + take]
+            new_created.extend(created[pos:pos + take])
+            new_order.extend(order[pos:pos + take])
+            new_texts.extend(texts[pos:pos + take])
+            pos += take
+            new_ids.append(task.id)
+            new_checked.append(1 if task.checked else 0)
+            new_created.append(task.created)
+            new_order.append(task_order)
+            new_texts.append(task.text)
+        new_ids.extend(ids[pos:])
+        new_checked += checked[pos:]
+        new_created.extend(created[pos:])
+        new_order.extend(order[pos:])
+        new_texts.extend(texts[pos:])
+
+        self._ids, self._checked, self._created, self._order, self._texts = (
+            new_ids, new_checked, new_created, new_order, new_texts)
+        self._slot_of = _IdIndex(self._ids)
+        if indexed:
+            for task in tasks:
+                self._text_index.add(task.id, task.text)
+            self._indexed = len(self._ids)
+        elif self._text_index is not None:
+            # Partly built: start over rather than track the shifted slots
+            self._text_index = None
+            self._indexed = 0
+
+    def remove(self, task_id):
+        """
+        Remove a task, leaving a tombstone in its slot.
+
+        Args:
+            task_id (int): ID of the task to remove
+
+        Returns:
+            int: Row the task occupied, or -1 if it was not in the store
+        """
+        slot = self._slot_of.pop(task_id)
+        if slot is None:
+            return -1
+        row = self._row(slot)
+        if self._is_indexed(slot):
+            self._text_index.remove(task_id, self._texts[slot])
+        self._texts[slot] = None
+        insort(self._dead, slot)
+        if len(self._dead) >= self.COMPACT_MIN and len(self._dead) * 2 > len(self._slot_of):
+            self.compact()
+        return row
+
+    def remove_many(self, task_ids):
+        """
+        Remove several tasks, merging their tombstones in one pass.
+
+        Args:
+            task_ids (iterable): IDs of the tasks to remove
+
+        Returns:
+            list: IDs that were actually removed
+        """
+        removed = []
+        slots = []
+        for task_id in task_ids:
+            slot = self._slot_of.pop(task_id)
+            if slot is None:
+                continue
+            if self._is_indexed(slot):
+                self._text_index.remove(task_id, self._texts[slot])
+            self._texts[slot] = None
+            slots.append(slot)
+            removed.append(task_id)
+        if slots:
+            self._dead = sorted(self._dead + slots)
+            if not self._slot_of:
+                self.clear()
+            elif len(self._dead) >= self.COMPACT_MIN and len(self._dead) * 2 > len(self._slot_of):
+                self.compact()
+        return removed
+
+    def move(self, task_id, order):
+        """
+        Give a task a new sort key and move it to where the key sorts,
+        after any equal keys.
+
+        Shifts only the tasks between its old and new rows, so short moves
+        stay cheap in any size of list.
+
+        Args:
+            task_id (int): ID of the task to move
+            order (float): New sort key
+
+        Returns:
+            tuple: (old row, new row), or (-1, -1) if the task is not in the store
+        """
+        if task_id not in self:
+            return -1, -1
+        new = self.move_row(task_id, order)
+        old = self._slot_of.get(task_id)
+        self._order[old] = order
+        if new == old:
+            return old, new
+        first, last = min(old, new), max(old, new)
+        if self._text_index is not None and first < self._indexed <= last:
+            # Partly built across the moved range: start over
+            self._text_index = None
+            self._indexed = 0
+        position = self._slot_of.find(task_id)
+        if new < old:
+            self._slot_of.shift(new, old - 1, 1)
+        else:
+            self._slot_of.shift(old + 1, new, -1)
+        self._slot_of.assign(position, new)
+        for column in (self._ids, self._checked, self._created, self._order, self._texts):
+            values = column[first:last + 1]
+            column[first:last + 1] = (values[-1:] + values[:-1] if new < old
+                                      else values[1:] + values[:1])
+        return old, new
+
+    def set_checked_many(self, task_ids, checked):
+        """
+        Set the completion state of several tasks.
+
+        Returns:
+            list: IDs whose state actually changed
+        """
+        flag = 1 if checked else 0
+        changed = []
+        for task_id in task_ids:
+            slot = self._slot_of.get(task_id)
+            if slot is not None and self._checked[slot] != flag:
+                self._checked[slot] = flag
+                changed.append(task_id)
+        return changed
+
+    def set_checked(self, task_id, checked):
+        """
+        Set a task's completion state.
+
+        Returns:
+            int: Row of the task, or -1 if it is not in the store
+        """
+        slot = self._slot_of.get(task_id)
+        if slot is None:
+            return -1
+        self._checked[slot] = 1 if checked else 0
+        return self._row(slot)
+
+    def set_text(self, task_id, text):
+        """
+        Set a task's text.
+
+        Returns:
+            int: Row of the task, or -1 if it is not in the store
+        """
+        slot = self._slot_of.get(task_id)
+        if slot is None:
+            return -1
+        if self._is_indexed(slot):
+            self._text_index.replace(task_id, self._texts[slot], text)
+        self._texts[slot] = text
+        return self._row(slot)
+
+    def clear(self):
+        """Remove all tasks."""
+        self.__init__()
+
+    def compact(self):
+        """Squeeze out tombstones so rows and slots line up again."""
+        if not self._dead:
+            return
+        self._indexed -= bisect_left(self._dead, self._indexed)
+        live = [slot for slot in range(len(self._ids)) if self._texts[slot] is not None]
+        self._ids = array("q", (self._ids[slot] for slot in live))
+        self._checked = bytearray(self._checked[slot] for slot in live)
+        self._created = array("d", (self._created[slot] for slot in live))
+        self._order = array("d", (self._order[slot] for slot in live))
+        self._texts = [self._texts[slot] for slot in live]
+        self._slot_of = _IdIndex(self._ids)
+        self._dead = []
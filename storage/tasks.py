@@ -0,0 +1,67 @@
+"""
+Task record helpers shared by the storage backends.
+"""
+
+import os
+import time
+
+# Spacing of the sort keys given to tasks added at the end of a list;
+# a move takes the midpoint of its new neighbours' keys
+ORDER_STEP = 1024.0
+
+# Neighbouring keys closer than this leave no room for a midpoint
+MIN_ORDER_GAP = ORDER_STEP * 2 ** -32
+
+
+def new_task_id():
+    """
+    Return a new random task ID.
+
+    IDs are 53-bit so they survive a round trip through JSON numbers, and
+    random so separate processes can create tasks without coordinating.
+    """
+    while True:
+        task_id = int.from_bytes(os.urandom(7), "big") >> 3
+        if task_id:
+            return task_id
+
+
+def new_task(text, checked=False):
+    """
+    Build a task record with a fresh ID.
+
+    Args:
+        text (str): The task description text
+        checked (bool): Initial completion state
+
+    Returns:
+        dict: Task with "id", "text", "checked" and "created" keys
+    """
+    return {"id": new_task_id(), "text": text, "checked": bool(checked),
+            "created": time.time()}
+
+
+def fit_order(order, before, after):
+    """
+    Return a sort key for a task placed between two others.
+
+    Args:
+        order (float): The task's own key, kept if it sorts between the
+            neighbours (or ties with one); None to pick one
+        before (float): Key of the task before it, or None at the start
+        after (float): Key of the task after it, or None at the end
+
+    Returns:
+        float: order, or the midpoint of the neighbours' keys (ORDER_STEP
+            beyond the last or before the first). With no room between
+            them, the key before; ties keep their positions.
+    """
+    if order is not None and (before is None or order >= before) \
+            and (after is None or order <= after):
+        return order
+    if before is None:
+        return ORDER_STEP if after is None else after - ORDER_STEP
+    if after is None:
+        return before + ORDER_STEP
+    middle = (before + after) / 2
+    return middle if before < middle < after else before
@@ -0,0 +1,169 @@
+"""
+TextIndex - Incremental inverted index over task text, for live filtering.
+
+Task text is split into lowercase word tokens. Each token maps to the set
+of IDs of the tasks containing it, and a sorted list of the distinct tokens
+turns a search prefix into a contiguous run of tokens. Adding, editing or
+removing a task only touches that task's own tokens.
+"""
+
+import re
+from bisect import bisect_left, insort
+
+
+_TOKEN = re.compile(r"\w+")
+
+# Prefix unions kept between keystrokes; cleared on any write
+_PREFIX_CACHE_SIZE = 32
+
+
+def tokenize(text):
+    """Return the distinct lowercase word tokens of a text."""
+    return set(_TOKEN.findall(text.lower()))
+
+
+def query_terms(query):
+    """
+    Split a search query into terms.
+
+    Returns:
+        tuple: Distinct lowercase terms in query order; empty for a blank query
+    """
+    return tuple(dict.fromkeys(_TOKEN.findall((query or "").lower())))
+
+
+def refines(terms, previous):
+    """
+    Return True if every task matching terms also matches previous.
+
+    That holds when each previous term is a prefix of some new term, as
+    when typing more characters or words.
+    """
+    return bool(previous) and all(any(term.startswith(old) for term in terms)
+                                  for old in previous)
+
+
+def matches(text, terms):
+    """Return True if every term is a prefix of some word in the text."""
+    tokens = tokenize(text)
+    return all(any(token.startswith(term) for token in tokens) for term in terms)
+
+
+def match_spans(text, terms):
+    """
+    Find the parts of a text matched by search terms, for highlighting.
+
+    Args:
+        text (str): Task text
+        terms (tuple): Terms from query_terms()
+
+    Returns:
+        list: (start, length) of each word prefix matched by a term
+    """
+    spans = []
+    for word in _TOKEN.finditer(text):
+        lowered = word.group().lower()
+        length = max((len(term) for term in terms if lowered.startswith(term)), default=0)
+        if length:
+            spans.append((word.start(), min(length, len(word.group()))))
+    return spans
+
+
+class TextIndex:
+    """
+    Maps word tokens to the IDs of the tasks containing them.
+
+    Searches match tasks containing, for every query term, a word starting
+    with that term.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._vocabulary = []
+        self._prefix_cache = {}
+
+    def __len__(self):
+        """Return the number of distinct tokens."""
+        return len(self._postings)
+
+    def add(self, task_id, text):
+        """Index a task's text."""
+        self._prefix_cache.clear()
+        postings = self._postings
+        for token in tokenize(text):
+            ids = postings.get(token)
+            if ids is None:
+                postings[token] = ids = set()
+                insort(self._vocabulary, token)
+            ids.add(task_id)
+
+    def remove(self, task_id, text):
+        """Drop a task's text from the index."""
+        self._prefix_cache.clear()
+        postings = self._postings
+        for token in tokenize(text):
+            ids = postings.get(token)
+            if ids is None:
+                continue
+            ids.discard(task_id)
+            if not ids:
+                del postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def replace(self, task_id, old_text, new_text):
+        """Re-index a task whose text changed."""
+        self.remove(task_id, old_text)
+        self.add(task_id, new_text)
+
+    def _prefix_range(self, prefix):
+        """Return the slice of the vocabulary holding the tokens starting with prefix."""
+        vocabulary = self._vocabulary
+        start = bisect_left(vocabulary, prefix)
+        # Every token starting with prefix sorts before prefix + U+10FFFF
+        return start, bisect_left(vocabulary, prefix + "\U0010ffff", start)
+
+    def _prefix_ids(self, prefix):
+        """Return the IDs of tasks with a word starting with prefix."""
+        ids = self._prefix_cache.get(prefix)
+        if ids is not None:
+            return ids
+        start, end = self._prefix_range(prefix)
+        postings = self._postings
+        if end - start == 1:
+            ids = postings[self._vocabulary[start]]
+        else:
+            ids = set().union(*(postings[token] for token in self._vocabulary[start:end]))
+        if len(self._prefix_cache) >= _PREFIX_CACHE_SIZE:
+            self._prefix_cache.clear()
+        self._prefix_cache[prefix] = ids
+        return ids
+
+    def _narrow(self, ids, prefix):
+        """Return the IDs in ids with a word starting with prefix."""
+        cached = self._prefix_cache.get(prefix)
+        if cached is not None:
+            return ids & cached
+        # Intersecting token by token only touches the smaller side of each
+        # posting, which beats building the prefix's full set when ids is small
+        start, end = self._prefix_range(prefix)
+        postings = self._postings
+        return set().union(*(ids & postings[token] for token in self._vocabulary[start:end]))
+
+    def search(self, terms):
+        """
+        Find the tasks matching every term.
+
+        Args:
+            terms (tuple): Terms from query_terms(); must not be empty
+
+        Returns:
+            set: Matching task IDs (do not modify)
+        """
+        # Longer terms tend to match fewer tasks, so start from those
+        terms = sorted(terms, key=len, reverse=True)
+        ids = self._prefix_ids(terms[0])
+        for term in terms[1:]:
+            if not ids:
+                break
+            ids = self._narrow(ids, term)
+        return ids
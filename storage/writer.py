@@ -0,0 +1,100 @@
+"""
+PersistenceWorker - Debounced background writer.
+"""
+
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+class PersistenceWorker(threading.Thread):
+    """
+    Background thread that coalesces bursts of changes into one write.
+
+    Each call to schedule() adds records to the pending batch and restarts
+    the quiet window; write_fn runs on this thread with the whole batch once
+    no new records have arrived for `delay` seconds.
+
+    Args:
+        write_fn (callable): Called with a list of records to persist them
+        delay (float): Quiet window in seconds before writing
+    """
+
+    def __init__(self, write_fn, delay=0.25):
+        super().__init__(name="PersistenceWorker", daemon=True)
+        self.write_fn = write_fn
+        self.delay = delay
+        self._cond = threading.Condition()
+        self._pending = []
+        self._deadline = 0.0
+        self._writing = False
+        self._stopping = False
+
+    def schedule(self, records):
+        """
+        Queue records to be written after the quiet window.
+
+        Args:
+            records (list): Records appended to the pending batch
+        """
+        with self._cond:
+            self._pending.extend(records)
+            self._deadline = time.monotonic() + self.delay
+            self._cond.notify_all()
+
+    def flush(self):
+        """Write any pending records now and wait until they are on disk."""
+        with self._cond:
+            self._deadline = 0.0
+            self._cond.notify_all()
+            while (self._pending or self._writing) and self.is_alive():
+                self._cond.wait()
+        # Not started (or already stopped): write on the caller's thread
+        if self._pending:
+            self._write_pending()
+
+    def stop(self):
+        """Flush pending work and end the thread."""
+        self.flush()
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self.is_alive():
+            self.join()
+
+    def run(self):
+        """Wait for records and write each batch once its quiet window has passed."""
+        with self._cond:
+            while True:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if self._stopping and not self._pending:
+                    return
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0 and not self._stopping:
+                    self._cond.wait(remaining)
+                    continue
+                self._cond.release()
+                try:
+                    self._write_pending()
+                finally:
+                    self._cond.acquire()
+
+    def _write_pending(self):
+        """Take the pending batch and hand it to write_fn."""
+        with self._cond:
+            if not self._pending:
+                return
+            batch = self._pending
+            self._pending = []
+            self._writing = True
+        try:
+            self.write_fn(batch)
+        except Exception:
+            log.exception("Error saving tasks")
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
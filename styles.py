@@ -9,134 +9,89 @@ iOS-style glassmorphism with refined blur and transparency.
 class Styles:
     """Container for all application stylesheets."""
     
-    # Task Item Stylesheet
-    TASK_ITEM = """
-        #taskItem {
-            border-radius: 10px;
-            background-color: #f0f0f0;
-            padding: 8px;
-            margin: 3px;
-            border: none;
+    # Icon Label Stylesheet
+    ICON_LABEL = """
+        QLabel {
+            font-size: 32px;
+            color: #444444;
+            background-color: transparent;
         }
     """
     
-    # Task Item Hover Stylesheet - Neumorphic raised effect
-    TASK_ITEM_HOVER = """
-        #taskItem {
-            border-radius: 10px;
-            background-color: #efefef;
+    # Title Label Stylesheet
+    TITLE_LABEL = """
+        QLabel {
+            color: #333333;
+            font-size: 18px;
+            font-weight: 600;
             padding: 8px;
-            margin: 3px;
-            border: none;
-        }
-    """
-    
-    # Checkbox Stylesheet
-    CHECKBOX = """
-        QCheckBox {
-            color: #444444;
+            padding-left: 12px;
             background-color: transparent;
-            spacing: 8px;
-            font-size: 13px;
-        }
-        
-        QCheckBox::indicator {
-            width: 18px;
-            height: 18px;
-            border-radius: 5px;
-            background-color: #f0f0f0;
-            border: 1px solid #d0d0d0;
-        }
-        
-        QCheckBox::indicator:checked {
-            background-color: #68b99a;
-            border: 1px solid #5aaa8a;
+            border: none;
         }
     """
-    
-    # Checkbox Hover Stylesheet
-    CHECKBOX_HOVER = """
-        QCheckBox {
+
+    # List Selector Button Stylesheet (the title, with a menu of lists)
+    LIST_BUTTON = """
+        QPushButton {
             color: #333333;
+            font-size: 18px;
+            font-weight: 600;
+            padding: 6px 8px;
+            margin-left: 8px;
             background-color: transparent;
-            spacing: 8px;
-            font-size: 13px;
+            border: none;
+            border-radius: 8px;
         }
-        
-        QCheckBox::indicator {
-            width: 18px;
-            height: 18px;
-            border-radius: 5px;
+        QPushButton:hover {
             background-color: #e8e8e8;
-            border: 1px solid #c0c0c0;
         }
-        
-        QCheckBox::indicator:checked {
-            background-color: #5aaa8a;
-            border: 1px solid #4a9a7a;
+        QPushButton::menu-indicator {
+            image: none;
+            width: 0px;
         }
-        
     """
-    ITEM_LABEL = """
+
+    # Task Count Label Stylesheet
+    COUNT_LABEL = """
         QLabel {
-            color: #444444;
+            color: #999999;
+            font-size: 11px;
             background-color: transparent;
-            font-size: 13px;
+            border: none;
         }
     """
 
-    # Delete Button Stylesheet
-    DELETE_BUTTON = """
+    # Close Button Stylesheet
+    CLOSE_BUTTON = """
         QPushButton {
             background-color: transparent;
-            color: #bbbbbb;
+            color: #aaaaaa;
             border: none;
-            font-size: 18px;
-            min-width: 26px;
-            max-width: 26px;
-            min-height: 26px;
-            max-height: 26px;
+            font-size: 14px;
+            min-width: 24px;
+            max-width: 24px;
+            min-height: 24px;
+            max-height: 24px;
             padding: 0px;
-            margin: 0px;
-            border-radius: 13px;
+            border-radius: 12px;
         }
-        
         QPushButton:hover {
             background-color: #e0e0e0;
             color: #cc5555;
-            border-radius: 13px;
         }
-    """
-    
-    # Icon Label Stylesheet
-    ICON_LABEL = """
-        QLabel {
-            font-size: 32px;
-            color: #444444;
-            background-color: transparent;
+        QPushButton:pressed {
+            background-color: #d8d8d8;
         }
     """
     
-    # Title Label Stylesheet
-    TITLE_LABEL = """
-        QLabel {
-            color: #333333;
-            font-size: 18px;
-            font-weight: 600;
-            padding: 8px;
-            padding-left: 12px;
-            background-color: transparent;
-            border: none;
-        }
-    """
-
-    # Close Button Stylesheet
-    CLOSE_BUTTON = """
+    # Bulk Actions Menu Button Stylesheet
+    MENU_BUTTON = """
         QPushButton {
             background-color: transparent;
             color: #aaaaaa;
             border: none;
-            font-size: 14px;
+            font-size: 16px;
             min-width: 24px;
             max-width: 24px;
             min-height: 24px;
@@ -146,10 +101,32 @@ class Styles:
         }
         QPushButton:hover {
             background-color: #e0e0e0;
-            color: #cc5555;
+            color: #555555;
         }
-        QPushButton:pressed {
-            background-color: #d8d8d8;
+    """
+
+    # Bulk Actions Menu Stylesheet
+    MENU = """
+        QMenu {
+            background-color: #f5f5f5;
+            border: 1px solid #d8d8d8;
+            border-radius: 8px;
+            padding: 4px;
+            color: #444444;
+            font-size: 12px;
+        }
+        QMenu::item {
+            padding: 5px 14px;
+            border-radius: 5px;
+        }
+        QMenu::item:selected {
+            background-color: #e4efe9;
+            color: #333333;
+        }
+        QMenu::separator {
+            height: 1px;
+            background: #dddddd;
+            margin: 3px 6px;
         }
     """
     
@@ -183,6 +160,67 @@ class Styles:
         }
     """
     
+    # Task List View Stylesheet
+    TASK_LIST = """
+        QListView {
+            border: none;
+            background-color: transparent;
+            outline: none;
+        }
+        
+        QScrollBar:vertical {
+            border: none;
+            background: #e8e8e8;
+            width: 6px;
+            border-radius: 3px;
+            margin: 2px;
+        }
+        
+        QScrollBar::handle:vertical {
+            background: #c8c8c8;
+            border-radius: 3px;
+            min-height: 20px;
+        }
+        
+        QScrollBar::handle:vertical:hover {
+            background: #aaaaaa;
+        }
+        
+        QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
+            height: 0px;
+        }
+    """
+    
+    # Inline Task Editor Stylesheet
+    TASK_EDITOR = """
+        QLineEdit {
+            background-color: #f5f5f5;
+            border: 1px solid #d0d0d0;
+            border-radius: 6px;
+            padding: 2px 3px;
+            color: #333333;
+            selection-background-color: rgba(104, 185, 154, 0.4);
+        }
+    """
+    
+    # Filter Field Stylesheet
+    FILTER_INPUT = """
+        QLineEdit {
+            background-color: #f0f0f0;
+            border: 1px solid #e2e2e2;
+            border-radius: 8px;
+            padding: 4px 10px;
+            color: #444444;
+            font-size: 12px;
+            selection-background-color: rgba(104, 185, 154, 0.4);
+        }
+
+        QLineEdit:focus {
+            border: 1px solid #d0d0d0;
+            background-color: #f5f5f5;
+        }
+    """
+
     # Input Container Stylesheet
     INPUT_CONTAINER = """
         QWidget {
@@ -241,13 +279,3 @@ class Styles:
     
     # Transparent Background
     TRANSPARENT = "background-color: transparent;"
-    
-    @classmethod
-    def get_combined_task_item(cls):
-        """Returns combined stylesheet for task item (normal state)."""
-        return cls.TASK_ITEM + cls.CHECKBOX + cls.ITEM_LABEL
-    
-    @classmethod
-    def get_combined_task_item_hover(cls):
-        """Returns combined stylesheet for task item (hover state)."""
-        return cls.TASK_ITEM_HOVER + cls.CHECKBOX_HOVER + cls.ITEM_LABEL
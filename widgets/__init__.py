@@ -3,7 +3,9 @@ Widgets package for Glass Task Manager.
 Contains custom widget implementations.
 """
 
-from .task_item import TaskItem
+from .task_model import TaskListModel
+from .task_delegate import TaskDelegate
+from .task_input import TaskInput
 from .glass_task_list import GlassTaskList
 
-__all__ = ['TaskItem', 'GlassTaskList']
+__all__ = ['TaskListModel', 'TaskDelegate', 'TaskInput', 'GlassTaskList']
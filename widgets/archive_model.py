@@ -0,0 +1,94 @@
+"""
+ArchiveModel - Read-only list model paging through a task archive.
+"""
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from widgets.task_model import TaskListModel
+
+
+class ArchiveModel(QAbstractListModel):
+    """
+    Presents archived tasks newest first, fetched a page at a time as the
+    view scrolls (canFetchMore/fetchMore), so only the pages seen so far
+    are ever read from the archive and held in memory.
+
+    Args:
+        archive (TaskArchive): Archive to browse
+        parent (QObject, optional): Parent object
+    """
+
+    CheckedRole = TaskListModel.CheckedRole
+    IdRole = TaskListModel.IdRole
+
+    # Tasks read from the archive per fetch
+    PAGE_SIZE = 200
+
+    def __init__(self, archive, parent=None):
+        super().__init__(parent)
+        self.archive = archive
+        self._total = archive.count()
+        self._texts = []
+        self._ids = []
+
+    def total(self):
+        """Return the number of archived tasks, fetched or not."""
+        return self._total
+
+    def rowCount(self, parent=QModelIndex()):
+        """Return the number of tasks fetched so far."""
+        if parent.isValid():
+            return 0
+        return len(self._texts)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        """Return True while older archived tasks are left to fetch."""
+        return not parent.isValid() and len(self._texts) < self._total
+
+    def fetchMore(self, parent=QModelIndex()):
+        """Read the next page of older tasks from the archive."""
+        if parent.isValid():
+            return
+        fetched = len(self._texts)
+        end = self._total - fetched
+        start = max(0, end - self.PAGE_SIZE)
+        tasks = self.archive.read(start, end - start)
+        if not tasks:
+            return
+        tasks.reverse()
+        self.beginInsertRows(QModelIndex(), fetched, fetched + len(tasks) - 1)
+        self._texts.extend(task["text"] for task in tasks)
+        self._ids.extend(task["id"] for task in tasks)
+        self.endInsertRows()
+
+    def refresh(self):
+        """Start over from the newest task, picking up tasks archived since."""
+        self.beginResetModel()
+        self._total = self.archive.count()
+        self._texts = []
+        self._ids = []
+        self.endResetModel()
+
+    def data(self, index, role=Qt.DisplayRole):
+        """Return data for the given index and role."""
+        if not index.isValid() or not 0 <= index.row() < len(self._texts):
+            return None
+        row = index.row()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self._texts[row]
+        if role in (self.CheckedRole, Qt.CheckStateRole):
+            return True if role == self.CheckedRole else Qt.Checked
+        if role == self.IdRole:
+            return self._ids[row]
+        return None
+
+    def flags(self, index):
+        """Archived tasks can be selected but not edited."""
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
@@ -0,0 +1,100 @@
+"""
+Disk cache of pre-scaled image assets.
+
+Decoding the full-size icon.png only to shrink it to a few dozen pixels
+is a noticeable part of startup. The scaled result is kept on disk per
+pixel size, keyed by the source file, so later launches load a tiny PNG.
+"""
+
+from PyQt5.QtCore import QSize, QStandardPaths
+from PyQt5.QtGui import QImage, QImageReader, QPixmap
+
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+
+def cache_dir():
+    """Return the per-user directory holding cached assets."""
+    base = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+    path = Path(base or Path.home() / ".cache" / "taskinator") / "assets"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _source_key(source):
+    """
+    Return a key that changes whenever the source file does.
+
+    PyInstaller unpacks bundled files afresh on every launch, so their
+    mtime says nothing; frozen builds hash the contents instead.
+    """
+    if getattr(sys, "frozen", False):
+        with open(source, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()[:16]
+    stat = os.stat(source)
+    return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+def scaled_pixmap(source, width, height, dpr=1.0):
+    """
+    Return source scaled to width x height logical pixels at the given
+    device pixel ratio, from the disk cache when possible.
+
+    On a miss the image is decoded once, scaled, written to the cache, and
+    the full-size image is dropped straight away.
+
+    Args:
+        source (Path): Source image file
+        width (int): Logical width
+        height (int): Logical height
+        dpr (float): Device pixel ratio of the target screen
+
+    Returns:
+        QPixmap: Scaled pixmap with its device pixel ratio set
+    """
+    source = Path(source)
+    px_width, px_height = round(width * dpr), round(height * dpr)
+    try:
+        key = _source_key(source)
+    except OSError:
+        return QPixmap()
+
+    prefix = f"{source.stem}-{px_width}x{px_height}-"
+    cached = None
+    try:
+        directory = cache_dir()
+        cached = directory / f"{prefix}{key}.png"
+    except OSError:
+        directory = None
+
+    image = QImage()
+    if cached is not None and cached.exists():
+        image = QImage(str(cached))
+
+    if image.isNull():
+        reader = QImageReader(str(source))
+        reader.setScaledSize(QSize(px_width, px_height))
+        image = reader.read()
+        if image.isNull():
+            return QPixmap()
+        if directory is not None:
+            _store(directory, prefix, cached, image)
+
+    pixmap = QPixmap.fromImage(image)
+    pixmap.setDevicePixelRatio(dpr)
+    return pixmap
+
+
+def _store(directory, prefix, path, image):
+    """Write a scaled image into the cache and drop stale versions of it."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        if image.save(str(tmp_path), "PNG"):
+            os.replace(tmp_path, path)
+        for stale in directory.glob(f"{prefix}*.png"):
+            if stale != path:
+                stale.unlink()
+    except OSError:
+        pass
@@ -0,0 +1,77 @@
+"""
+CommandServer - Local socket server of the running instance.
+
+Accepts the line-based JSON commands described in ipc.py from later
+invocations of the app and hands each to a handler on the GUI thread.
+"""
+
+from PyQt5.QtCore import QObject
+from PyQt5.QtNetwork import QLocalServer
+
+import logging
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ipc
+
+log = logging.getLogger(__name__)
+
+
+class CommandServer(QObject):
+    """
+    Listens on ipc.server_name() and answers commands.
+
+    Args:
+        handler (callable): Takes a command dict, returns the reply dict
+        parent (QObject, optional): Parent object
+    """
+
+    # Longest command line accepted from a client, in bytes
+    MAX_LINE = 64 * 1024
+
+    def __init__(self, handler, parent=None):
+        super().__init__(parent)
+        self.handler = handler
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self._accept)
+
+    def listen(self):
+        """
+        Start listening, replacing a socket left behind by a crashed instance.
+
+        Only call this after ipc.send_command() found no running instance.
+
+        Returns:
+            bool: True if the server is listening
+        """
+        name = ipc.server_name()
+        QLocalServer.removeServer(name)
+        if not self.server.listen(name):
+            log.warning("Could not listen on %s: %s", name, self.server.errorString())
+            return False
+        return True
+
+    def close(self):
+        """Stop listening and remove the socket."""
+        self.server.close()
+
+    def _accept(self):
+        """Take every pending connection."""
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            connection.readyRead.connect(lambda c=connection: self._read(c))
+            connection.disconnected.connect(connection.deleteLater)
+
+    def _read(self, connection):
+        """Answer each complete command line received on a connection."""
+        while connection.canReadLine():
+            line = bytes(connection.readLine())
+            try:
+                reply = self.handler(ipc.decode(line))
+            except ValueError as e:
+                reply = {"ok": False, "error": f"bad command: {e}"}
+            connection.write(ipc.encode(reply))
+        if connection.bytesAvailable() > self.MAX_LINE:
+            connection.abort()
@@ -3,17 +3,21 @@ GlassTaskList widget - Main application window with glass morphism effect.
 """
 
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, 
-                             QPushButton, QLineEdit, QScrollArea, QLabel,
-                             QGraphicsDropShadowEffect)
-from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, QPoint, QSize
+                             QPushButton, QListView, QLabel, QMenu, QShortcut,
+                             QAbstractItemView, QLineEdit, QInputDialog)
+from PyQt5.QtCore import Qt, QVariantAnimation, QEasingCurve, QPoint, QSize
 from PyQt5.QtGui import (QPainter, QColor, QPainterPath, QLinearGradient,
                          QRadialGradient, QPen, QBrush)
-from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, QPoint, QSize, QParallelAnimationGroup
-from PyQt5.QtGui import QPixmap
+from PyQt5.QtCore import QTimer, QRect, QRectF, QPointF, QSettings, QFileSystemWatcher, pyqtSignal
+from PyQt5.QtGui import QKeySequence, QPixmap
 
+import logging
+import statistics
 import sys
-import json
 import os
+import time
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).parent.parent
@@ -23,7 +27,19 @@ icon_path = ROOT_DIR / "icon.png"
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from styles import Styles
-from widgets.task_item import TaskItem
+from storage import DEFAULT_LIST, list_names, open_storage
+from storage.archive import KEEP_COMPLETED, select_completed
+from storage.tasks import fit_order
+from widgets.task_lists import OpenTaskList, OpenTaskLists
+from widgets.archive_model import ArchiveModel
+from widgets.task_delegate import TaskDelegate
+from widgets.task_input import TaskInput
+from widgets.painting import draw_shadow
+from widgets.assets import scaled_pixmap
+import metrics
+import profiling
+
+log = logging.getLogger(__name__)
 
 
 class GlassTaskList(QWidget):
@@ -31,14 +47,73 @@ class GlassTaskList(QWidget):
     Main application widget with glass morphism design.
     Features expandable/collapsible interface with task management.
     """
+
+    # Emitted once the stored tasks have all been streamed into the model
+    loading_finished = pyqtSignal()
+
+    # Time budget per event-loop tick while streaming tasks in
+    LOAD_SLICE_MS = 8
+    LOAD_CHUNK = 64
+
+    # Tasks indexed for filtering per step, within LOAD_SLICE_MS per tick
+    INDEX_CHUNK = 256
+
+    # Idle time after startup before the expanded UI is built in advance
+    PREBUILD_DELAY_MS = 2000
+
+    # Task lists kept in memory, including the active one
+    OPEN_LISTS = 3
+
+    # Longest list title shown in the header, in pixels
+    LIST_TITLE_WIDTH = 140
+
+    # Quiet time after the list's files change before they are re-read,
+    # and the longest a stream of changes can put that off
+    RELOAD_DELAY_MS = 200
+    RELOAD_MAX_WAIT_MS = 800
+
+    # Completed tasks are moved to the archive this long after a list has
+    # loaded, and again at this interval
+    ARCHIVE_DELAY_MS = 5000
+    ARCHIVE_INTERVAL_MS = 15 * 60 * 1000
+
+    # Expand/collapse duration, and the fraction of it used at each
+    # degradation level: full, shortened, skipped
+    ANIMATION_MS = 350
+    ANIMATION_SCALES = (1.0, 0.5, 0.0)
+
+    # Median frame interval of a run that degrades the next one a level,
+    # and below which a degraded animation recovers a level
+    SLOW_FRAME_MS = 40
+    FAST_FRAME_MS = 20
+
+    # With animations skipped, one runs at the previous level this long
+    # after the last try, to see whether frames have got fast enough again
+    ANIMATION_PROBE_MS = 60 * 1000
     
-    def __init__(self):
+    def __init__(self, save_delay_ms=250, storage=None, backend=None, list_name=None):
+        """
+        Args:
+            save_delay_ms (int): Quiet window before changes are written to disk
+            storage (TaskStorage, optional): Backend of the list to show first;
+                by default the list last opened is opened with backend
+            backend (str, optional): Storage backend for opening lists,
+                as for storage.open_storage(); ignored if storage is given
+            list_name (str, optional): List to show first instead of the
+                last opened one; ignored if storage is given
+        """
         super().__init__()
         self.dragging = False
         self.drag_start_pos = None
         self.offset = QPoint()
         self.expanded = False
-        self.task_items = []
+        if storage is None:
+            storage = open_storage(backend, list_name or self._last_list_name(backend))
+        self.backend = storage.name
+        self._save_delay = save_delay_ms / 1000.0
+        self._open_lists = OpenTaskLists(self.OPEN_LISTS)
+        self._active_list = None
+        self._setup_persistence()
         self.animation_progress = 0.0 
         # Size configurations
         self.collapsed_size = QSize(70, 70)
@@ -49,7 +124,12 @@ class GlassTaskList(QWidget):
         self._setup_animation()
         self._setup_effects()
         self._position_window()
-        self.load_tasks()
+        self._setup_loader()
+        self._setup_watcher()
+        self._setup_archiving()
+        self._activate_list(self._add_open_list(storage))
+        QTimer.singleShot(self.PREBUILD_DELAY_MS, self._ensure_list_container)
+
     def _setup_window(self):
         """Configure window properties."""
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
@@ -62,29 +142,42 @@ class GlassTaskList(QWidget):
         main_layout.setContentsMargins(7, 15, 7, 15)
         
         # Icon label (collapsed state)
-        self.icon_label = self._create_icon_label()
+        with profiling.phase("icon"):
+            self.icon_label = self._create_icon_label()
         main_layout.addWidget(self.icon_label, alignment=Qt.AlignCenter)
         
-        # Task list container (expanded state)
+        # Task list container (expanded state) is built on first expand,
+        # or when the app goes idle, so startup only pays for the bubble
+        self.list_container = None
+        self.task_view = None
+        self.task_input = None
+        self.filter_input = None
+        self.count_label = None
+        self.list_button = None
+        self.input_container = None
+        # Read-only view of the archive, built when History is first shown
+        self.history_view = None
+
+    def _ensure_list_container(self):
+        """Build the expanded-state UI if it does not exist yet."""
+        if self.list_container is not None:
+            return
         self.list_container = self._create_list_container()
-        main_layout.addWidget(self.list_container)
+        self.layout().addWidget(self.list_container)
+        self._update_list_button()
+        self._update_count_label()
+        self._start_indexing()
         
     def _create_icon_label(self):
         """Create the icon label for collapsed state."""
         label = QLabel()
         label.setAlignment(Qt.AlignCenter)
         
-        # Load image icon
-        pixmap = QPixmap(str(icon_path))  # Replace with your image path
-        
-        # Scale the image to fit the collapsed size (with some padding)
-        scaled_pixmap = pixmap.scaled(
-            40, 40,  # Icon size (adjust as needed)
-            Qt.IgnoreAspectRatio,
-            Qt.SmoothTransformation
-        )
-        
-        label.setPixmap(scaled_pixmap)
+        # Load the icon pre-scaled to fit the collapsed size (with some
+        # padding), at the screen's pixel ratio, from the asset cache
+        screen = QApplication.primaryScreen()
+        dpr = screen.devicePixelRatio() if screen is not None else 1.0
+        label.setPixmap(scaled_pixmap(icon_path, 40, 40, dpr))
         label.setStyleSheet("background-color: transparent;")
         
         return label
@@ -106,9 +199,14 @@ class GlassTaskList(QWidget):
         title_row_layout = QHBoxLayout(title_row)
         title_row_layout.setContentsMargins(0, 0, 4, 0)
 
-        title = QLabel("My Tasks")
-        title.setStyleSheet(Styles.TITLE_LABEL)
-        title_row_layout.addWidget(title)
+        self.list_button = self._create_list_button()
+        title_row_layout.addWidget(self.list_button)
+
+        self.count_label = QLabel()
+        self.count_label.setStyleSheet(Styles.COUNT_LABEL)
+        title_row_layout.addWidget(self.count_label)
+
+        title_row_layout.addWidget(self._create_menu_button())
 
         close_btn = QPushButton("✕")
         close_btn.setStyleSheet(Styles.CLOSE_BUTTON)
@@ -116,32 +214,134 @@ class GlassTaskList(QWidget):
         title_row_layout.addWidget(close_btn)
 
         list_layout.addWidget(title_row)
+
+        # Filter field
+        self.filter_input = self._create_filter_input()
+        list_layout.addWidget(self.filter_input)
         
-        # Scroll area
-        scroll = self._create_scroll_area()
-        list_layout.addWidget(scroll)
+        # Task list view
+        self.task_view = self._create_task_view()
+        list_layout.addWidget(self.task_view)
         
         # Input container
-        input_container = self._create_input_container()
-        list_layout.addWidget(input_container)
+        self.input_container = self._create_input_container()
+        list_layout.addWidget(self.input_container)
         
         return container
         
-    def _create_scroll_area(self):
-        """Create the scrollable task area."""
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setStyleSheet(Styles.SCROLL_AREA)
-        
-        self.task_widget = QWidget()
-        self.task_widget.setStyleSheet(Styles.TRANSPARENT)
-        self.task_layout = QVBoxLayout(self.task_widget)
-        self.task_layout.setAlignment(Qt.AlignTop)
-        self.task_layout.setSpacing(3)
-        self.task_layout.setContentsMargins(2, 2, 2, 2)
+    def _create_task_view(self):
+        """Create the virtualized task list view."""
+        view = QListView()
+        view.setStyleSheet(Styles.TASK_LIST)
+        view.setModel(self.task_model)
+        view.setMouseTracking(True)
+        view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        view.setEditTriggers(QAbstractItemView.DoubleClicked)
+        # Drag rows to reorder them; the model turns drops into moves
+        view.setDragDropMode(QAbstractItemView.InternalMove)
+        view.setDefaultDropAction(Qt.MoveAction)
+        view.setFocusPolicy(Qt.ClickFocus)
+        view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        view.setResizeMode(QListView.Adjust)
+        view.setLayoutMode(QListView.Batched)
+        view.setBatchSize(200)
+        view.setContentsMargins(2, 2, 2, 2)
         
-        scroll.setWidget(self.task_widget)
-        return scroll
+        delegate = TaskDelegate(view)
+        delegate.delete_requested.connect(self.remove_task)
+        view.setItemDelegate(delegate)
+
+        delete_shortcut = QShortcut(QKeySequence.Delete, view)
+        delete_shortcut.setContext(Qt.WidgetShortcut)
+        delete_shortcut.activated.connect(self.remove_selected)
+
+        # Window-wide; the text fields keep Ctrl+Z for their own text
+        QShortcut(QKeySequence.Undo, self).activated.connect(self.undo)
+        QShortcut(QKeySequence.Redo, self).activated.connect(self.redo)
+        return view
+
+    def _create_list_button(self):
+        """Create the title button whose menu switches between task lists."""
+        menu = QMenu(self)
+        menu.setStyleSheet(Styles.MENU)
+        menu.aboutToShow.connect(lambda: self._fill_list_menu(menu))
+
+        button = QPushButton()
+        button.setStyleSheet(Styles.LIST_BUTTON)
+        button.setMenu(menu)
+        return button
+
+    def _fill_list_menu(self, menu):
+        """Fill the list menu with the stored lists and a New list... action."""
+        menu.clear()
+        for name in list_names(self.backend):
+            action = menu.addAction(self._list_title(name))
+            action.setCheckable(True)
+            action.setChecked(name == self.storage.list_name)
+            action.triggered.connect(lambda checked, name=name: self.open_list(name))
+        menu.addSeparator()
+        menu.addAction("New list...", self._prompt_new_list)
+
+    def _prompt_new_list(self):
+        """Ask for a name and open a new, empty list."""
+        name, ok = QInputDialog.getText(self, "New list", "List name:")
+        if ok and name.strip():
+            self.open_list(name.strip(), create=True)
+
+    @staticmethod
+    def _list_title(name):
+        """Return the title shown for a list."""
+        return "My Tasks" if name == DEFAULT_LIST else name
+
+    def _update_list_button(self):
+        """Show the active list's name on the title button."""
+        if self.list_button is None:
+            return
+        metrics = self.list_button.fontMetrics()
+        title = metrics.elidedText(self._list_title(self.storage.list_name),
+                                   Qt.ElideRight, self.LIST_TITLE_WIDTH)
+        self.list_button.setText(f"{title} ▾")
+
+    def _create_filter_input(self):
+        """Create the field that filters the list as you type."""
+        field = QLineEdit()
+        field.setPlaceholderText("Filter tasks...")
+        field.setStyleSheet(Styles.FILTER_INPUT)
+        field.setClearButtonEnabled(True)
+        field.textChanged.connect(self.set_filter)
+
+        clear_shortcut = QShortcut(QKeySequence(Qt.Key_Escape), field)
+        clear_shortcut.setContext(Qt.WidgetShortcut)
+        clear_shortcut.activated.connect(field.clear)
+        return field
+
+    def _create_menu_button(self):
+        """Create the ⋯ button holding the bulk actions."""
+        menu = QMenu(self)
+        menu.setStyleSheet(Styles.MENU)
+        menu.addAction("Check all", lambda: self.set_all_checked(True))
+        menu.addAction("Uncheck all", lambda: self.set_all_checked(False))
+        menu.addSeparator()
+        menu.addAction("Clear completed", self.clear_completed)
+        menu.addAction("Delete selected", self.remove_selected)
+        menu.addSeparator()
+        undo_action = menu.addAction("Undo", self.undo)
+        redo_action = menu.addAction("Redo", self.redo)
+        menu.addSeparator()
+        history_action = menu.addAction("History")
+        history_action.setCheckable(True)
+        history_action.toggled.connect(self.show_history)
+        menu.aboutToShow.connect(lambda: (
+            undo_action.setEnabled(self.task_model.history.can_undo()),
+            redo_action.setEnabled(self.task_model.history.can_redo()),
+            history_action.setChecked(self.history_shown())))
+
+        menu_btn = QPushButton("⋯")
+        menu_btn.setStyleSheet(Styles.MENU_BUTTON)
+        menu_btn.clicked.connect(
+            lambda: menu.exec_(menu_btn.mapToGlobal(menu_btn.rect().bottomLeft())))
+        return menu_btn
         
     def _create_input_container(self):
         """Create the input field and add button container."""
@@ -152,10 +352,11 @@ class GlassTaskList(QWidget):
         input_layout.setSpacing(8)
         
         # Task input field
-        self.task_input = QLineEdit()
+        self.task_input = TaskInput()
         self.task_input.setPlaceholderText("Add new task...")
         self.task_input.setStyleSheet(Styles.TASK_INPUT)
         self.task_input.returnPressed.connect(self.add_task)
+        self.task_input.lines_pasted.connect(self.add_tasks)
         
         # Add button
         add_btn = QPushButton("+")
@@ -181,124 +382,693 @@ class GlassTaskList(QWidget):
         screen = QApplication.primaryScreen().geometry()
         self.move(screen.width() - 120, screen.height() - 120)
             
-    def _get_data_file_path(self):
-        """Get the path to the tasks data file."""
-        # Save in data folder in parent directory
-        home = Path(__file__).parent.parent
-        app_data_dir = home / "data"
-        
-        # Create directory if it doesn't exist
-        app_data_dir.mkdir(exist_ok=True)
-        
-        return app_data_dir / "tasks.json"
+    def _setup_persistence(self):
+        """Flush every open list's writer when the app quits."""
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self._shutdown_persistence)
+
+    def _shutdown_persistence(self):
+        """Flush pending changes and close the storage backends."""
+        self._open_lists.close_all()
+
+    @staticmethod
+    def _settings():
+        """Return the application settings."""
+        return QSettings("GlassApps", "Glass Task Manager")
+
+    @classmethod
+    def _last_list_name(cls, backend):
+        """Return the list opened last, if it still exists, else the default list."""
+        name = cls._settings().value("lastList", DEFAULT_LIST)
+        return name if name in list_names(backend) else DEFAULT_LIST
+
+    def _add_open_list(self, storage):
+        """Materialize a list and add it to the open lists."""
+        open_list = OpenTaskList(storage, self._save_delay, self)
+        self._open_lists.add(open_list)
+        return open_list
+
+    def open_list(self, name, create=False):
+        """
+        Switch to a task list, loading it unless it is still open.
+
+        Args:
+            name (str): List name
+            create (bool): Create the list if it does not exist
+        """
+        if name == self.storage.list_name:
+            return
+        open_list = self._open_lists.get(name)
+        if open_list is None:
+            storage = open_storage(self.backend, name)
+            created = create and not storage.exists()
+            if created:
+                storage.create()
+            open_list = self._add_open_list(storage)
+            # A list created just now has nothing to load
+            open_list.loaded = created
+        self._activate_list(open_list)
+        self._settings().setValue("lastList", name)
+
+    def _activate_list(self, open_list):
+        """Show an open list, wiring its model to the view and the loader."""
+        previous = self._active_list
+        if previous is not None:
+            self._load_timer.stop()
+            self._index_timer.stop()
+            self._load_iter = None
+            self._disconnect_model(previous.model)
+            if self.task_view is not None:
+                previous.scroll_value = self.task_view.verticalScrollBar().value()
+
+        self._active_list = open_list
+        self.storage = open_list.storage
+        self.task_store = open_list.store
+        self.task_model = open_list.model
+        self._persistence = open_list.persistence
+        self._connect_model(open_list.model)
+
+        if self.task_view is not None:
+            self.task_view.setModel(open_list.model)
+        if self.history_shown():
+            self.show_history(False)
+        if self.filter_input is not None:
+            open_list.model.set_filter(self.filter_input.text())
+        self._update_list_button()
+        self._watch_storage()
+
+        if open_list.loaded:
+            self._update_count_label()
+            self._start_indexing()
+            # Catch up with anything written while the list was in the background
+            self._schedule_reload()
+            if self.task_view is not None:
+                QTimer.singleShot(0, lambda: self.task_view.verticalScrollBar().setValue(
+                    open_list.scroll_value))
+        else:
+            self.load_tasks()
+
+        if previous is not None and not previous.loaded:
+            # Half-loaded lists are not worth keeping; reopening reloads them
+            self._open_lists.discard(previous.name)
+
+    def _connect_model(self, model):
+        """Route a model's changes to persistence and the count label."""
+        model.tasks_changed.connect(self._queue_changes)
+        model.rowsInserted.connect(self._update_count_label)
+        model.rowsRemoved.connect(self._update_count_label)
+        model.modelReset.connect(self._update_count_label)
+
+    def _disconnect_model(self, model):
+        """Undo _connect_model()."""
+        model.tasks_changed.disconnect(self._queue_changes)
+        model.rowsInserted.disconnect(self._update_count_label)
+        model.rowsRemoved.disconnect(self._update_count_label)
+        model.modelReset.disconnect(self._update_count_label)
+
+    def _queue_changes(self, records):
+        """Queue journal records to be saved in the background."""
+        if self.is_loading():
+            # Tasks added while loading stay after the loaded ones: their
+            # keys are only known once those are in (see _place_added())
+            for record in records:
+                if record.get("op") == "add":
+                    self._added_while_loading.append(record["id"])
+                    record.pop("order", None)
+        self._persistence.schedule(records)
 
     def save_tasks(self):
-        """Save all tasks and their checked states to a JSON file."""
-        tasks_data = []
+        """Write any queued task changes of every open list to disk immediately."""
+        for open_list in self._open_lists:
+            open_list.persistence.flush()
+
+    def _setup_loader(self):
+        """Create the timer that streams tasks into the model."""
+        self._load_iter = None
+        self._added_while_loading = []
+        self._load_count = 0
+        self._load_started = 0.0
+        self._load_timer = QTimer(self)
+        self._load_timer.setInterval(0)
+        self._load_timer.timeout.connect(self._load_next_batch)
+
+        self._index_timer = QTimer(self)
+        self._index_timer.setInterval(0)
+        self._index_timer.timeout.connect(self._index_next_batch)
+        self.loading_finished.connect(self._start_indexing)
+
+    def load_tasks(self, blocking=False):
+        """
+        Load tasks from the storage backend.
+
+        By default tasks are streamed in from the event loop in slices of
+        LOAD_SLICE_MS, in display order, so the window paints immediately
+        and the rows in the viewport arrive first.
         
-        for task_item in self.task_items:
-            task_data = {
-                "text": task_item.label.text(),
-                "checked": task_item.checkbox.isChecked()
-            }
-            tasks_data.append(task_data)
+        Args:
+            blocking (bool): Load everything before returning
+        """
+        self._load_timer.stop()
+        self._load_iter = None
+
+        # Check if there is anything stored
+        if not self.storage.exists():
+            log.info("No saved tasks found in %s", self.storage.location)
+            self._active_list.loaded = True
+            self._update_count_label()
+            self.loading_finished.emit()
+            return
         
-        # Save to file
+        self.task_model.set_tasks([])
+        self._load_iter = self.storage.iter_load()
+        # Moves need every task's key in place
+        self.task_model.moves_enabled = False
+        self._added_while_loading = []
+        self._load_count = 0
+        self._load_started = time.perf_counter()
+        if blocking:
+            self._load_next_batch(budget_ms=None)
+        else:
+            self._load_timer.start()
+
+    def is_loading(self):
+        """Return True while tasks are still being streamed in."""
+        return self._load_iter is not None
+
+    def _load_next_batch(self, budget_ms=LOAD_SLICE_MS):
+        """Move tasks from the storage stream into the model until the budget is spent."""
+        deadline = None if budget_ms is None else time.perf_counter() + budget_ms / 1000.0
+        batch = []
+        done = False
         try:
-            file_path = self._get_data_file_path()
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(tasks_data, f, indent=2, ensure_ascii=False)
-            print(f"Tasks saved to {file_path}")
-        except Exception as e:
-            print(f"Error saving tasks: {e}")
+            while True:
+                chunk = list(islice(self._load_iter, self.LOAD_CHUNK))
+                batch.extend(chunk)
+                if len(chunk) < self.LOAD_CHUNK:
+                    done = True
+                    break
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+        except Exception:
+            log.exception("Error loading tasks from %s", self.storage.location)
+            done = True
 
-    def load_tasks(self):
-        """Load tasks and their checked states from JSON file."""
-        file_path = self._get_data_file_path()
-        
-        # Check if file exists
-        if not file_path.exists():
-            print("No saved tasks found.")
+        self.task_model.insert_tasks(self._load_insert_row(), batch)
+        self._load_count += len(batch)
+
+        if done:
+            self._load_timer.stop()
+            self._load_iter = None
+            self._place_added()
+            self.task_model.moves_enabled = True
+            self._active_list.loaded = True
+            self._update_count_label()
+            elapsed = time.perf_counter() - self._load_started
+            metrics.observe("load.seconds", elapsed)
+            metrics.count("load.tasks", self._load_count)
+            log.info("Loaded %d tasks from %s in %.0f ms",
+                     self._load_count, self.storage.location, elapsed * 1000)
+            self.loading_finished.emit()
+
+    def _setup_watcher(self):
+        """Watch the active list's files for writes by other processes."""
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._schedule_reload)
+        self._watcher.directoryChanged.connect(self._schedule_reload)
+        self._reload_timer = QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.setInterval(self.RELOAD_DELAY_MS)
+        self._reload_timer.timeout.connect(self.reload_changes)
+        self._reload_requested = 0.0
+        # Changes made while loading are only picked up afterwards
+        self.loading_finished.connect(self._schedule_reload)
+
+    def _watch_storage(self):
+        """
+        Point the watcher at the active list's files.
+
+        Their directories are watched too, since files replaced atomically
+        or created later drop out of (or never enter) a file watch.
+        """
+        paths = [path for path in self.storage.watch_paths() if os.path.exists(path)]
+        paths += sorted({os.path.dirname(os.path.abspath(path))
+                         for path in self.storage.watch_paths()} - {""})
+        watched = set(self._watcher.files() + self._watcher.directories())
+        stale = list(watched.difference(paths))
+        if stale:
+            self._watcher.removePaths(stale)
+        new = [path for path in paths if path not in watched]
+        if new:
+            self._watcher.addPaths(new)
+
+    def _schedule_reload(self, *args):
+        """Debounce file change notifications into one reload_changes()."""
+        now = time.perf_counter()
+        if not self._reload_timer.isActive():
+            self._reload_requested = now
+        elif (now - self._reload_requested) * 1000 > self.RELOAD_MAX_WAIT_MS:
+            # Files changing nonstop: let the pending reload run
             return
-        
+        self._reload_timer.start()
+
+    def reload_changes(self):
+        """
+        Patch in what other processes wrote to the active list.
+
+        Journal records they appended are applied as they are; otherwise
+        the stored tasks are re-read and only the differences are patched
+        into the model, so the view keeps its scroll position and
+        selection. Nothing is written back.
+        """
+        self._watch_storage()
+        if self.is_loading() or not self._active_list.loaded:
+            # Picked up once loading finishes
+            return
+        # Our own pending changes go to disk first, so the files are the
+        # merge of every writer
+        self._persistence.flush()
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                tasks_data = json.load(f)
-            
-            # Clear existing tasks
-            for task_item in self.task_items[:]:
-                self.remove_task(task_item)
-            
-            # Load saved tasks
-            for task_data in tasks_data:
-                task = TaskItem(task_data["text"])
-                task.checkbox.setChecked(task_data["checked"])
-                task.delete_btn.clicked.connect(lambda checked, t=task: self.remove_task(t))
-                task.state_changed.connect(self.save_tasks)
-                self.task_layout.addWidget(task)
-                self.task_items.append(task)
-            
-            print(f"Loaded {len(tasks_data)} tasks from {file_path}")
+            records = self.storage.read_changes()
+            if records is None:
+                tasks = self.storage.load()
+                with self._bulk_update():
+                    self.task_model.sync_tasks(tasks)
+            elif records:
+                with self._bulk_update():
+                    self.task_model.apply_records(records)
         except Exception as e:
-            print(f"Error loading tasks: {e}")
+            # Typically a file caught mid-write; its next change retries
+            log.warning("Error reloading tasks: %s", e)
+
+    def _setup_archiving(self):
+        """Move completed tasks to the archive after loading, then periodically."""
+        self._archive_timer = QTimer(self)
+        self._archive_timer.setSingleShot(True)
+        self._archive_timer.timeout.connect(self.archive_completed)
+        self.loading_finished.connect(
+            lambda: self._archive_timer.start(self.ARCHIVE_DELAY_MS))
+        self._archive_interval = QTimer(self)
+        self._archive_interval.setInterval(self.ARCHIVE_INTERVAL_MS)
+        self._archive_interval.timeout.connect(self.archive_completed)
+        self._archive_interval.start()
+
+    def _archive_policy(self):
+        """
+        Return (keep, max_age_days) from the settings "archive/keepCompleted"
+        (negative: no limit) and "archive/maxAgeDays" (0: off).
+        """
+        settings = self._settings()
+        keep = settings.value("archive/keepCompleted", KEEP_COMPLETED, type=int)
+        max_age_days = settings.value("archive/maxAgeDays", 0.0, type=float)
+        return (keep if keep >= 0 else None), (max_age_days or None)
+
+    def archive_completed(self, keep=None, max_age_days=None):
+        """
+        Move completed tasks of the shown list to its archive.
+
+        The tasks are synced to the archive before they leave the list, so
+        a crash in between can at worst archive a task twice. Not undoable.
+
+        Args:
+            keep (int, optional): Completed tasks to keep in the list;
+                the configured policy when neither argument is given
+            max_age_days (float, optional): Also archive completed tasks
+                created longer ago than this
+
+        Returns:
+            int: Number of tasks archived
+        """
+        if self.is_loading():
+            return 0
+        if keep is None and max_age_days is None:
+            keep, max_age_days = self._archive_policy()
+        task_ids = select_completed(self.task_store.completed(), keep, max_age_days,
+                                    time.time())
+        if not task_ids:
+            return 0
+        tasks = [self.task_store.get(task_id).to_dict() for task_id in task_ids]
+        try:
+            with metrics.timed("archive.seconds"):
+                self._active_list.archive.append(tasks)
+        except OSError:
+            log.exception("Error archiving tasks of %s", self.storage.location)
+            return 0
+        with self._bulk_update():
+            self.task_model.archive_ids(task_ids)
+        metrics.count("archive.tasks", len(tasks))
+        log.info("Archived %d completed tasks of %s", len(tasks), self.storage.location)
+        if self.history_shown():
+            self.history_view.model().refresh()
+            self._update_count_label()
+        return len(tasks)
+
+    def _start_indexing(self):
+        """
+        Build the filter's word index in the background once the tasks are
+        loaded and the expanded UI exists, so the first keystroke is fast.
+        """
+        if self.list_container is not None and not self.is_loading():
+            self._index_timer.start()
+
+    def _index_next_batch(self):
+        """Index task text for filtering until the time slice is spent."""
+        deadline = time.perf_counter() + self.LOAD_SLICE_MS / 1000.0
+        while time.perf_counter() < deadline:
+            if self.task_store.build_text_index(self.INDEX_CHUNK):
+                self._index_timer.stop()
+                return
+
+    def _load_insert_row(self):
+        """Return the store row loaded tasks go in: before any added while loading."""
+        store = self.task_store
+        while self._added_while_loading:
+            row = store.row_of(self._added_while_loading[0])
+            if row >= 0:
+                return row
+            # Removed again since; the next one marks the boundary
+            self._added_while_loading.pop(0)
+        return len(store)
+
+    def _place_added(self):
+        """
+        Give tasks added while loading sort keys after the loaded tasks.
+
+        Their add records were saved without keys, so storage puts them
+        after everything before them, just as here.
+        """
+        store = self.task_store
+        row = self._load_insert_row()
+        order = store.order_at(row - 1) if row else None
+        task_ids, orders = [], []
+        for added in range(row, len(store)):
+            order = fit_order(None, order, None)
+            task_ids.append(store.id_at(added))
+            orders.append(order)
+        store.set_orders(task_ids, orders)
+        self._added_while_loading = []
+
+    def _update_count_label(self, *args):
+        """Show the task count, or loading progress while streaming."""
+        count = len(self.task_store)
+        metrics.set_gauge("tasks", count)
+        if self.count_label is None:
+            return
+        if self.history_shown():
+            total = self.history_view.model().total()
+            self.count_label.setText(f"{total:,} archived")
+        elif self.is_loading():
+            self.count_label.setText(f"Loading… {count:,}")
+        elif self.task_model.is_filtered():
+            self.count_label.setText(f"{self.task_model.rowCount():,} of {count:,}")
+        else:
+            self.count_label.setText(f"{count:,} task{'s' if count != 1 else ''}")
 
     def add_task(self):
         """Add a new task to the list."""
         text = self.task_input.text().strip()
         if text:
-            task = TaskItem(text)
-            task.delete_btn.clicked.connect(lambda: self.remove_task(task))
-            task.state_changed.connect(self.save_tasks)
-            self.task_layout.addWidget(task)
-            self.task_items.append(task)
+            # Model emits tasks_changed, which auto-saves
+            row = self.task_model.add_task(text)
             self.task_input.clear()
-            
-            # Auto-save after adding task
-            self.save_tasks()
+            self.task_view.scrollTo(self.task_model.index(row))
 
-    def remove_task(self, task):
+    def remove_task(self, row):
         """
         Remove a task from the list.
         
         Args:
-            task (TaskItem): The task widget to remove
+            row (int): Row of the task to remove
         """
-        self.task_layout.removeWidget(task)
-        self.task_items.remove(task)
-        task.deleteLater()
+        # Model emits tasks_changed, which auto-saves
+        self.task_model.remove_row(row)
+
+    @contextmanager
+    def _bulk_update(self):
+        """Suspend repaints of the list so a bulk change relayouts once."""
+        if self.task_view is None:
+            yield
+            return
+        self.task_view.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            self.task_view.setUpdatesEnabled(True)
+
+    def add_tasks(self, texts):
+        """
+        Add one task per line of pasted text.
         
-        # Auto-save after removing task
-        self.save_tasks()
+        Args:
+            texts (list): Task texts; blank entries are skipped
+        """
+        with self._bulk_update():
+            count = self.task_model.add_tasks(texts)
+        if count and self.task_view is not None:
+            self.task_input.clear()
+            self.task_view.scrollToBottom()
+
+    def remove_selected(self):
+        """Remove every selected task."""
+        if self.task_view is None:
+            return
+        rows = [index.row() for index in self.task_view.selectionModel().selectedRows()]
+        with self._bulk_update():
+            self.task_model.remove_rows(rows)
+
+    def clear_completed(self):
+        """Remove every completed task."""
+        with self._bulk_update():
+            self.task_model.clear_completed()
+
+    def undo(self):
+        """Revert the last change to the shown list, as one batch."""
+        if self.is_loading():
+            return
+        with self._bulk_update():
+            self.task_model.undo()
+
+    def redo(self):
+        """Make the last undone change to the shown list again."""
+        if self.is_loading():
+            return
+        with self._bulk_update():
+            self.task_model.redo()
+
+    def history_shown(self):
+        """Return True while the archive is shown instead of the list."""
+        return self.history_view is not None and not self.history_view.isHidden()
+
+    def show_history(self, shown=True):
+        """
+        Show the shown list's archived tasks, newest first and read-only,
+        in place of the list, or go back to the list.
+
+        Args:
+            shown (bool): Show the archive rather than the list
+        """
+        if shown == self.history_shown():
+            return
+        self._ensure_list_container()
+        if shown:
+            if self.history_view is None:
+                self.history_view = self._create_history_view()
+                layout = self.list_container.layout()
+                layout.insertWidget(layout.indexOf(self.task_view) + 1, self.history_view)
+            previous = self.history_view.model()
+            self.history_view.setModel(ArchiveModel(self._active_list.archive,
+                                                    self.history_view))
+            if previous is not None:
+                previous.deleteLater()
+        self.history_view.setVisible(shown)
+        for widget in (self.task_view, self.filter_input, self.input_container):
+            widget.setVisible(not shown)
+        self._update_count_label()
+
+    def _create_history_view(self):
+        """Create the read-only view of archived tasks."""
+        view = QListView()
+        view.setStyleSheet(Styles.TASK_LIST)
+        view.setMouseTracking(True)
+        view.setSelectionMode(QAbstractItemView.NoSelection)
+        view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        view.setFocusPolicy(Qt.ClickFocus)
+        view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        view.setResizeMode(QListView.Adjust)
+        view.setItemDelegate(TaskDelegate(view, read_only=True))
+        view.hide()
+
+        back_shortcut = QShortcut(QKeySequence(Qt.Key_Escape), view)
+        back_shortcut.setContext(Qt.WidgetShortcut)
+        back_shortcut.activated.connect(lambda: self.show_history(False))
+        return view
+
+    def set_filter(self, query):
+        """
+        Show only the tasks matching a filter query.
+
+        Args:
+            query (str): Words to match as prefixes; blank shows every task
+        """
+        with self._bulk_update():
+            self.task_model.set_filter(query)
+
+    def handle_command(self, command):
+        """
+        Apply a command sent by another process (see ipc.py) to the
+        shown list.
+
+        Args:
+            command (dict): Command with a "cmd" key
+
+        Returns:
+            dict: Reply for the sender
+        """
+        action = command.get("cmd")
+        list_name = self.storage.list_name
+        if action == "status":
+            return {"ok": True, "list": list_name, "storage": self.backend}
+        if action == "show":
+            self.show()
+            self.raise_()
+            self.activateWindow()
+            return {"ok": True}
+        if command.get("list", list_name) != list_name:
+            return {"ok": False, "error": f"list {command['list']!r} is not shown"}
+
+        if action == "add":
+            text = str(command.get("text") or "").strip()
+            if not text:
+                return {"ok": False, "error": "empty task text"}
+            self.task_model.add_task(text)
+            # New tasks go at the end of the store
+            return {"ok": True, "id": self.task_store.id_at(len(self.task_store) - 1),
+                    "list": list_name}
+        if action in ("done", "rm"):
+            task_ids = command["ids"] if "ids" in command else [command.get("id")]
+            if not all(isinstance(task_id, int) for task_id in task_ids):
+                return {"ok": False, "error": "task IDs must be integers"}
+            missing = [task_id for task_id in task_ids if task_id not in self.task_store]
+            if action == "done":
+                for task_id in task_ids:
+                    self.task_model.set_checked_id(task_id, True)
+            else:
+                with self._bulk_update():
+                    self.task_model.remove_ids(task_ids)
+            if missing and "ids" not in command:
+                return {"ok": False, "error": f"no task {missing[0]} in list {list_name!r}"}
+            return {"ok": True, "missing": missing}
+        if action == "archive":
+            keep, max_age_days = command.get("keep"), command.get("older_than")
+            if not all(value is None or isinstance(value, (int, float))
+                       for value in (keep, max_age_days)):
+                return {"ok": False, "error": "keep and older_than must be numbers"}
+            return {"ok": True, "archived": self.archive_completed(keep, max_age_days)}
+        return {"ok": False, "error": f"unknown command {action!r}"}
+
+    def set_all_checked(self, checked):
+        """
+        Check or uncheck every task.
+        
+        Args:
+            checked (bool): Completion state to apply
+        """
+        with self._bulk_update():
+            self.task_model.set_all_checked(checked)
+
+    def replace_tasks(self, tasks):
+        """
+        Replace the whole list.
+        
+        Args:
+            tasks (list): Task dicts with "text" and optional "checked"/"id"
+        """
+        self._load_timer.stop()
+        self._load_iter = None
+        self._active_list.loaded = True
+        self.task_model.moves_enabled = True
+        with self._bulk_update():
+            self.task_model.replace_tasks(tasks)
 
         
     def paintEvent(self, event):
-        """Custom paint for neumorphic effect."""
+        """Paint the window chrome: one cached blit, except mid-animation."""
+        started = time.perf_counter()
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
+        if self._snapshot is None:
+            painter.drawPixmap(0, 0, self._chrome_pixmap())
+        else:
+            # The shape changes every frame; nothing worth caching
+            painter.setRenderHint(QPainter.Antialiasing)
+            self._paint_chrome(painter, self._body_rect(), self._snapshot)
+        painter.end()
+        metrics.observe("paint.window.seconds", time.perf_counter() - started)
+
+    def _chrome_pixmap(self):
+        """
+        Return the window's shadow, fill and border at rest, rendered once
+        per window size, shape, border state and device pixel ratio.
+        """
+        dpr = self.devicePixelRatioF()
+        key = (self.width(), self.height(), self.animation_progress < 0.2,
+               self.animation_progress < 0.15, dpr)
+        if self._chrome is None or self._chrome[0] != key:
+            pixmap = QPixmap(max(1, round(self.width() * dpr)),
+                             max(1, round(self.height() * dpr)))
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            self._paint_chrome(painter, self._body_rect())
+            painter.end()
+            self._chrome = (key, pixmap)
+            metrics.count("paint.chrome_renders")
+        return self._chrome[1]
+
+    def _paint_chrome(self, painter, body, content=None):
+        """
+        Paint the drop shadow, fill and border of the window's shape.
+
+        Args:
+            painter (QPainter): Antialiased painter on the window or a pixmap
+            body (QRect): Rect of the shape
+            content (QPixmap, optional): List snapshot shown clipped to the
+                shape, under the border
+        """
+        # Cached drop shadow under the shape
+        draw_shadow(painter, body.translated(self.shadow_offset),
+                    ellipse=self.animation_progress < 0.2, radius=20,
+                    blur=self.shadow_blur, color=self.shadow_color)
 
         path = QPainterPath()
         if self.animation_progress < 0.2:
-            path.addEllipse(8, 8, self.width() - 16, self.height() - 16)
+            path.addEllipse(QRectF(body))
         else:
-            path.addRoundedRect(8, 8, self.width() - 16, self.height() - 16, 20, 20)
+            path.addRoundedRect(QRectF(body), 20, 20)
 
         # Fill with neumorphic base color
         painter.fillPath(path, QColor("#f0f0f0"))
 
+        # Mid-animation, the list as it will look, revealed by the shape
+        if content is not None:
+            painter.save()
+            painter.setClipPath(path)
+            painter.drawPixmap(self._snapshot_pos, content)
+            painter.restore()
+
         # Neumorphic border gradient
-        self._paint_neumorphic_border(painter, path)
+        self._paint_neumorphic_border(painter, path, body)
 
-    def _paint_neumorphic_border(self, painter, path):
+    def _paint_neumorphic_border(self, painter, path, body):
         """Paint neumorphic border: inset when collapsed, raised when expanding/expanded."""
-        w, h = self.width(), self.height()
+        grad = QLinearGradient(QPointF(body.topLeft()), QPointF(body.bottomRight()))
         if self.animation_progress < 0.15:
             # Inset (collapsed): dark top-left, light bottom-right
-            grad = QLinearGradient(0, 0, w, h)
             grad.setColorAt(0, QColor("#bbbbbb"))
             grad.setColorAt(1, QColor("#fafafa"))
         else:
             # Raised (expanding/expanded): light top-left, dark bottom-right
-            grad = QLinearGradient(0, 0, w, h)
             grad.setColorAt(0, QColor("#ffffff"))
             grad.setColorAt(1, QColor("#cacaca"))
 
@@ -307,12 +1077,17 @@ class GlassTaskList(QWidget):
         painter.drawPath(path)
 
     def _setup_effects(self):
-        """Setup neumorphic drop shadow."""
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(20)
-        shadow.setColor(QColor(180, 180, 180, 130))
-        shadow.setOffset(6, 6)
-        self.setGraphicsEffect(shadow)
+        """Setup neumorphic drop shadow.
+
+        The shadow is painted from a pre-blurred pixmap in paintEvent rather
+        than with a QGraphicsDropShadowEffect, which would re-render and blur
+        the whole window on every repaint.
+        """
+        self.shadow_blur = 20
+        self.shadow_color = QColor(180, 180, 180, 130)
+        self.shadow_offset = QPoint(6, 6)
+        # (key, pixmap) of the chrome last rendered by _chrome_pixmap()
+        self._chrome = None
 
     def mousePressEvent(self, event):
         """Handle mouse press for dragging."""
@@ -342,118 +1117,193 @@ class GlassTaskList(QWidget):
             
 
     def _setup_animation(self):
-        """Setup expand/collapse animations for both size and position."""
-        # Size animation
-        self.size_anim = QPropertyAnimation(self, b"size")
-        self.size_anim.setDuration(350)
-        self.size_anim.setEasingCurve(QEasingCurve.InOutQuad)
-        
-        # Position animation
-        self.pos_anim = QPropertyAnimation(self, b"pos")
-        self.pos_anim.setDuration(350)
-        self.pos_anim.setEasingCurve(QEasingCurve.InOutQuad)
-        
-        # Animation group
-        from PyQt5.QtCore import QParallelAnimationGroup
-        self.anim_group = QParallelAnimationGroup()
-        self.anim_group.addAnimation(self.size_anim)
-        self.anim_group.addAnimation(self.pos_anim)
-        
-        # Connect to track animation progress
-        self.size_anim.valueChanged.connect(self._on_animation_progress)
+        """
+        Set up the expand/collapse animation.
+
+        The window is resized once per animation, not per frame: expanding
+        grows it to full size up front, collapsing shrinks it at the end.
+        In between only animation_progress moves; paintEvent grows or
+        shrinks the shape from the top-right corner and shows a snapshot
+        of the list container clipped to it, so frames cost a repaint and
+        never a relayout.
+        """
+        self.expand_anim = QVariantAnimation(self)
+        self.expand_anim.setEasingCurve(QEasingCurve.InOutQuad)
+        self.expand_anim.valueChanged.connect(self._on_animation_progress)
+        self.expand_anim.finished.connect(self.finish_animation)
+
+        # Rendered list container shown while animating, and where it goes
+        self._snapshot = None
+        self._snapshot_pos = QPoint()
+
+        # Index into ANIMATION_SCALES, raised when frames come too slowly,
+        # and the screen (name, pixel ratio) it was last raised on
+        self._animation_level = 0
+        self._degraded_screen = None
+        # When animations were skipped or last tried again, and whether
+        # the running animation is such a try
+        self._probe_after = 0.0
+        self._probing = False
+        self._frame_intervals = []
+        self._last_frame = 0.0
 
     def _on_animation_progress(self, value):
-        """Update animation progress and trigger repaint."""
-        # Calculate progress based on current size
+        """Record the frame interval and repaint at the new progress."""
+        now = time.perf_counter()
+        if self._last_frame:
+            interval = now - self._last_frame
+            self._frame_intervals.append(interval)
+            metrics.observe("animation.frame_interval.seconds", interval)
+        self._last_frame = now
+
+        self.animation_progress = max(0.0, min(1.0, value))
+        self.update()
+
+    def _body_rect(self):
+        """
+        Return the rect the window's shape is drawn in: the whole window
+        inset by the shadow margin, or while animating, a rect between
+        the bubble and that, anchored at the top-right corner.
+        """
+        full = QRect(8, 8, self.width() - 16, self.height() - 16)
+        if self._snapshot is None:
+            return full
+        progress = self.animation_progress
+        width = round(self.collapsed_size.width() - 16
+                      + (full.width() - self.collapsed_size.width() + 16) * progress)
+        height = round(self.collapsed_size.height() - 16
+                       + (full.height() - self.collapsed_size.height() + 16) * progress)
+        return QRect(full.right() + 1 - width, full.top(), width, height)
+
+    def _anchored_geometry(self, size):
+        """Return the window geometry of the given size with the top-right corner kept."""
+        geometry = self.geometry()
+        return QRect(geometry.right() + 1 - size.width(), geometry.top(),
+                     size.width(), size.height())
+
+    def _take_snapshot(self):
+        """Render the list container, laid out at full size, and hide it."""
+        container = self.list_container
+        container.show()
+        self.layout().activate()
+        self._snapshot = container.grab()
+        self._snapshot_pos = container.pos()
+        container.hide()
+
+    def _screen_key(self):
+        """Return what identifies the screen the window is on: name and pixel ratio."""
+        screen = self.screen() if hasattr(self, "screen") else None
+        return (screen.name() if screen is not None else "", self.devicePixelRatioF())
+
+    def _animation_scale(self):
+        """
+        Return the fraction of ANIMATION_MS the next animation runs for;
+        0 to skip it.
+
+        Shortened, or skipped, once earlier runs showed slow frames. Moving
+        to another screen starts over at full length, and while animations
+        are skipped one runs shortened every ANIMATION_PROBE_MS as a test,
+        snapshot and all, so it times the frames it is testing.
+        """
+        level = self._animation_level
+        if level and self._screen_key() != self._degraded_screen:
+            level = self._animation_level = 0
+            log.info("Screen changed; animating at full length again")
+        self._probing = (level == len(self.ANIMATION_SCALES) - 1
+                         and time.perf_counter() >= self._probe_after)
+        if self._probing:
+            level -= 1
+        return self.ANIMATION_SCALES[level]
+
+    def _animate_to(self, target, scale):
+        """
+        Run the animation from the current progress to target (0 or 1).
+
+        Args:
+            target (float): Progress to end at
+            scale (float): Fraction of ANIMATION_MS, from _animation_scale()
+        """
+        self.expand_anim.stop()
+        duration = round(self.ANIMATION_MS * scale * abs(target - self.animation_progress))
+        if duration <= 0:
+            self.finish_animation()
+            return
+        self._frame_intervals = []
+        self._last_frame = 0.0
+        self.expand_anim.setDuration(duration)
+        self.expand_anim.setStartValue(float(self.animation_progress))
+        self.expand_anim.setEndValue(float(target))
+        self.expand_anim.start()
+
+    def finish_animation(self):
+        """Jump to the end of the running animation and lay out the final state."""
+        self.expand_anim.stop()
+        self._rate_frames()
+        self._snapshot = None
         if self.expanded:
-            # Expanding: progress from 0 to 1
-            width_progress = (value.width() - self.collapsed_size.width()) / \
-                            (self.expanded_size.width() - self.collapsed_size.width())
-            self.animation_progress = max(0.0, min(1.0, width_progress))
+            self.animation_progress = 1.0
+            self.list_container.show()
         else:
-            # Collapsing: progress from 1 to 0
-            width_progress = (value.width() - self.collapsed_size.width()) / \
-                            (self.expanded_size.width() - self.collapsed_size.width())
-            self.animation_progress = max(0.0, min(1.0, width_progress))
-        
-        self.update()  # Trigger repaint
+            self.animation_progress = 0.0
+            self.list_container.hide()
+            # Drop the expanded layout's minimum size before shrinking
+            self.layout().activate()
+            self.setGeometry(self._anchored_geometry(self.collapsed_size))
+            self.icon_label.show()
+        self.update()
+
+    def _rate_frames(self):
+        """
+        Shorten later animations if this one's frames came too slowly, or
+        lengthen them again if they came fast (for a test run while
+        animations are skipped: fast enough for its level).
+        """
+        intervals, self._frame_intervals = self._frame_intervals, []
+        probing, self._probing = self._probing, False
+        if probing:
+            self._probe_after = time.perf_counter() + self.ANIMATION_PROBE_MS / 1000.0
+        if len(intervals) < 3:
+            return
+        median = statistics.median(intervals) * 1000
+        level = self._animation_level
+        if probing:
+            if median <= self.SLOW_FRAME_MS:
+                self._animation_level = level - 1
+                log.info("Animation frames took %.0f ms; animating again", median)
+        elif median > self.SLOW_FRAME_MS and level < len(self.ANIMATION_SCALES) - 1:
+            self._animation_level = level + 1
+            self._degraded_screen = self._screen_key()
+            if self._animation_level == len(self.ANIMATION_SCALES) - 1:
+                self._probe_after = time.perf_counter() + self.ANIMATION_PROBE_MS / 1000.0
+            metrics.count("animation.degraded")
+            log.info("Animation frames took %.0f ms; %s", median,
+                     "skipping animations" if self.ANIMATION_SCALES[level + 1] == 0
+                     else "shortening animations")
+        elif median < self.FAST_FRAME_MS and level > 0:
+            self._animation_level = level - 1
 
     def expand(self):
         """Expand the widget leftward and downward, with top-right anchored."""
-        # Set expanded flag first
+        if self.expanded and self._snapshot is None:
+            return
         self.expanded = True
-        
-        # Get current position
-        current_pos = self.pos()
-        current_size = self.size()
-        
-        # Calculate the top-right corner position
-        top_right_x = current_pos.x() + current_size.width()
-        top_y = current_pos.y()
-        
-        # Calculate target position (move left as we expand)
-        target_x = top_right_x - self.expanded_size.width()
-        target_y = top_y
-        
-        # Hide icon but DON'T show list_container yet
-        self.icon_label.hide()
-        # Keep list_container hidden during animation
-        self.list_container.hide()
-        
-        # Setup animations
-        self.size_anim.setStartValue(current_size)
-        self.size_anim.setEndValue(self.expanded_size)
-        
-        self.pos_anim.setStartValue(current_pos)
-        self.pos_anim.setEndValue(QPoint(target_x, target_y))
-        
-        # Disconnect previous connections to avoid multiple triggers
-        try:
-            self.anim_group.finished.disconnect()
-        except:
-            pass
-        
-        # Show list container ONLY AFTER animation completes
-        self.anim_group.finished.connect(lambda: self.list_container.show())
-        
-        # Start both animations together
-        self.anim_group.start()
-
+        scale = self._animation_scale()
+        if self._snapshot is None:
+            # From the bubble: go full size now, grow the shape inside
+            self._ensure_list_container()
+            self.icon_label.hide()
+            self.setGeometry(self._anchored_geometry(self.expanded_size))
+            if scale > 0:
+                self._take_snapshot()
+        # Otherwise a collapse is under way; turn it around
+        self._animate_to(1.0, scale)
 
     def collapse(self):
         """Collapse the widget rightward and upward, with top-right anchored."""
-        # Get current position BEFORE changing expanded flag
-        current_pos = self.pos()
-        current_size = self.size()
-        
-        # Calculate the top-right corner position
-        top_right_x = current_pos.x() + current_size.width()
-        top_y = current_pos.y()
-        
-        # Calculate target position (move right as we collapse)
-        target_x = top_right_x - self.collapsed_size.width()
-        target_y = top_y
-        
-        # Hide list container and show icon IMMEDIATELY (before animation)
-        self.list_container.hide()
-        self.icon_label.show()
-        
-        # Set collapsed flag AFTER hiding content
+        if not self.expanded:
+            return
         self.expanded = False
-        
-        # Setup animations
-        self.size_anim.setStartValue(current_size)
-        self.size_anim.setEndValue(self.collapsed_size)
-        
-        self.pos_anim.setStartValue(current_pos)
-        self.pos_anim.setEndValue(QPoint(target_x, target_y))
-        
-        # Disconnect previous connections
-        try:
-            self.anim_group.finished.disconnect()
-        except:
-            pass
-        
-        # Start both animations together
-        self.anim_group.start()
-
+        scale = self._animation_scale()
+        if self._snapshot is None and scale > 0:
+            self._take_snapshot()
+        self._animate_to(0.0, scale)
@@ -0,0 +1,139 @@
+"""
+Cached painting helpers shared by the task widgets.
+
+Decorations that depend only on their size are rendered once into a
+QPixmap and kept in QPixmapCache, so repaints become a single blit.
+"""
+
+from PyQt5.QtWidgets import (QGraphicsScene, QGraphicsPixmapItem, QGraphicsBlurEffect,
+                             qDrawBorderPixmap)
+from PyQt5.QtCore import Qt, QRect, QRectF, QMargins
+from PyQt5.QtGui import (QPixmap, QPixmapCache, QPainter, QPainterPath, QImage,
+                         QLinearGradient, QColor, QPen)
+
+
+def _new_pixmap(width, height, dpr):
+    """Return a transparent pixmap of the given logical size and pixel ratio."""
+    pixmap = QPixmap(max(1, round(width * dpr)), max(1, round(height * dpr)))
+    pixmap.setDevicePixelRatio(dpr)
+    pixmap.fill(Qt.transparent)
+    return pixmap
+
+
+def glass_overlay(width, height, dpr=1.0):
+    """
+    Return the glassy shine overlay and glow border drawn over a hovered row.
+
+    Args:
+        width (int): Row width in logical pixels
+        height (int): Row height in logical pixels
+        dpr (float): Device pixel ratio of the target
+
+    Returns:
+        QPixmap: Overlay to draw at the row's top-left corner
+    """
+    key = f"glass-overlay:{width}x{height}@{dpr}"
+    pixmap = QPixmapCache.find(key)
+    if pixmap is not None and not pixmap.isNull():
+        return pixmap
+
+    pixmap = _new_pixmap(width, height, dpr)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.Antialiasing)
+
+    path = QPainterPath()
+    path.addRoundedRect(QRectF(2, 2, width - 4, height - 4), 8, 8)
+
+    # Glassy shine overlay
+    shine_gradient = QLinearGradient(0, 0, 0, height)
+    shine_gradient.setColorAt(0, QColor(255, 255, 255, 45))
+    shine_gradient.setColorAt(0.5, QColor(255, 255, 255, 25))
+    shine_gradient.setColorAt(1, QColor(255, 255, 255, 5))
+    painter.fillPath(path, shine_gradient)
+
+    # Glow border
+    pen = QPen(QColor(255, 255, 255, 80))
+    pen.setWidth(2)
+    painter.setPen(pen)
+    painter.drawPath(path)
+    painter.end()
+
+    QPixmapCache.insert(key, pixmap)
+    return pixmap
+
+
+def _blurred_shape(width, height, ellipse, radius, blur, color):
+    """
+    Render a shape filled with color and blurred by blur pixels.
+
+    The shape sits `blur` pixels in from every edge of the returned pixmap,
+    leaving room for the blur to spread.
+    """
+    image = QImage(width + 2 * blur, height + 2 * blur, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    path = QPainterPath()
+    if ellipse:
+        path.addEllipse(QRectF(blur, blur, width, height))
+    else:
+        path.addRoundedRect(QRectF(blur, blur, width, height), radius, radius)
+    painter.fillPath(path, color)
+    painter.end()
+
+    # Run the shape through Qt's own blur once, the same one
+    # QGraphicsDropShadowEffect applies to the whole window every frame
+    scene = QGraphicsScene()
+    item = QGraphicsPixmapItem(QPixmap.fromImage(image))
+    effect = QGraphicsBlurEffect()
+    effect.setBlurRadius(blur)
+    item.setGraphicsEffect(effect)
+    scene.addItem(item)
+
+    result = QImage(image.size(), QImage.Format_ARGB32_Premultiplied)
+    result.fill(Qt.transparent)
+    painter = QPainter(result)
+    scene.render(painter, QRectF(result.rect()), QRectF(image.rect()))
+    painter.end()
+    return QPixmap.fromImage(result)
+
+
+def draw_shadow(painter, rect, ellipse=False, radius=20, blur=20,
+                color=QColor(180, 180, 180, 130)):
+    """
+    Draw a soft drop shadow for a rounded rect or ellipse.
+
+    Rounded-rect shadows are rendered once per radius/blur/color as a small
+    9-slice pixmap and stretched to any size; ellipse shadows are cached per
+    size.
+
+    Args:
+        painter (QPainter): Painter to draw with
+        rect (QRect): Shape rect the shadow belongs to (already offset)
+        ellipse (bool): Shadow an ellipse instead of a rounded rect
+        radius (int): Corner radius of the rounded rect
+        blur (int): Blur radius
+        color (QColor): Shadow color
+    """
+    target = QRect(rect).adjusted(-blur, -blur, blur, blur)
+    color_key = color.rgba()
+    core = 2 * (radius + blur) + 1
+    nine_slice = not ellipse and rect.width() >= core and rect.height() >= core
+
+    if nine_slice:
+        key = f"shadow-9:{radius}:{blur}:{color_key:x}"
+        size = (core, core)
+    else:
+        key = f"shadow:{int(ellipse)}:{rect.width()}x{rect.height()}:{radius}:{blur}:{color_key:x}"
+        size = (rect.width(), rect.height())
+
+    pixmap = QPixmapCache.find(key)
+    if pixmap is None or pixmap.isNull():
+        pixmap = _blurred_shape(size[0], size[1], ellipse, radius, blur, color)
+        QPixmapCache.insert(key, pixmap)
+
+    if nine_slice:
+        margin = radius + 2 * blur
+        qDrawBorderPixmap(painter, target, QMargins(margin, margin, margin, margin), pixmap)
+    else:
+        painter.drawPixmap(target, pixmap)
@@ -0,0 +1,346 @@
+"""
+TaskDelegate - Paints task rows in the task list view.
+
+Draws the checkbox, word-wrapped text and delete button of each row
+directly, with no widgets per task. Wrapped text is measured and laid
+out once per (text, width, font) and kept in LRU caches, so relayouts
+and repaints reuse it.
+"""
+
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle, QLineEdit
+from PyQt5.QtCore import Qt, QRect, QRectF, QSize, QPointF, QEvent, pyqtSignal
+from PyQt5.QtGui import (QColor, QPainter, QPainterPath, QPen, QFont, QFontMetrics,
+                         QCursor, QTextLayout, QTextOption, QTextCharFormat, QStaticText,
+                         QTransform)
+
+import sys
+import os
+import time
+from collections import OrderedDict
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import metrics
+from styles import Styles
+from widgets.task_model import TaskListModel
+from widgets.painting import glass_overlay
+from storage.text_index import match_spans
+
+
+class TextLayoutCache:
+    """
+    Word-wrapped text measured and laid out once per (text, width, font).
+
+    Heights are cheap to keep, so many are: the view asks for every row's
+    height on each relayout (a reset, a filter, a resize). Laid-out text
+    (QStaticText, glyphs already positioned) is only kept for about as many
+    rows as get painted. Both are least-recently-used caches; text that is
+    edited or rewrapped to a new width simply stops being asked for.
+
+    Args:
+        height_capacity (int): Row heights kept
+        layout_capacity (int): Laid-out texts kept
+    """
+
+    def __init__(self, height_capacity=16384, layout_capacity=512):
+        self.height_capacity = height_capacity
+        self.layout_capacity = layout_capacity
+        self._heights = OrderedDict()
+        self._layouts = OrderedDict()
+        # QFont.key() of each font seen, so keys share one string per font
+        self._font_keys = {}
+
+    def _key(self, text, width, font):
+        """Return the cache key of text wrapped to width in a font."""
+        font_key = font.key()
+        return text, width, self._font_keys.setdefault(font_key, font_key)
+
+    @staticmethod
+    def _remember(cache, key, value, capacity):
+        """Add an entry as the most recently used, evicting the oldest beyond capacity."""
+        cache[key] = value
+        if len(cache) > capacity:
+            cache.popitem(last=False)
+
+    def height(self, text, width, font):
+        """
+        Return the height of text word-wrapped to a width.
+
+        Args:
+            text (str): Plain text
+            width (int): Wrap width in pixels
+            font (QFont): Font to measure with
+
+        Returns:
+            int: Height in pixels of the wrapped lines
+        """
+        key = self._key(text, width, font)
+        height = self._heights.get(key)
+        if height is not None:
+            self._heights.move_to_end(key)
+            return height
+        bounds = QFontMetrics(font).boundingRect(QRect(0, 0, width, 100000),
+                                                 Qt.TextWordWrap | Qt.AlignLeft, text)
+        height = bounds.height()
+        metrics.count("paint.text_measures")
+        self._remember(self._heights, key, height, self.height_capacity)
+        return height
+
+    def layout(self, text, width, font):
+        """
+        Return text word-wrapped to a width and laid out for drawing.
+
+        Args:
+            text (str): Plain text
+            width (int): Wrap width in pixels
+            font (QFont): Font to lay out with
+
+        Returns:
+            QStaticText: Prepared text; draw it with QPainter.drawStaticText()
+        """
+        key = self._key(text, width, font)
+        static = self._layouts.get(key)
+        if static is not None:
+            self._layouts.move_to_end(key)
+            return static
+        option = QTextOption(Qt.AlignLeft)
+        option.setWrapMode(QTextOption.WordWrap)
+        static = QStaticText(text)
+        static.setTextFormat(Qt.PlainText)
+        static.setTextOption(option)
+        static.setTextWidth(width)
+        static.prepare(QTransform(), font)
+        metrics.count("paint.text_layouts")
+        self._remember(self._layouts, key, static, self.layout_capacity)
+        return static
+
+    def clear(self):
+        """Forget every height and layout."""
+        self._heights.clear()
+        self._layouts.clear()
+
+
+class TaskDelegate(QStyledItemDelegate):
+    """
+    Item delegate painting a task row with checkbox, text and × button.
+    Handles clicks on the checkbox and delete button by hit-testing.
+
+    Args:
+        view (QListView): The view this delegate paints for
+        read_only (bool): Paint rows without the × button and ignore
+            clicks, as for archived tasks
+    """
+
+    delete_requested = pyqtSignal(int)
+
+    # Row geometry
+    ROW_MARGIN = 3
+    PADDING = 8
+    SPACING = 8
+    CHECK_SIZE = 18
+    BUTTON_SIZE = 26
+    MIN_HEIGHT = 40
+    FONT_PIXEL_SIZE = 13
+    DELETE_GLYPH_PIXEL_SIZE = 18
+    HIGHLIGHT_COLOR = "#cde8db"
+
+    def __init__(self, view, read_only=False):
+        super().__init__(view)
+        self.view = view
+        self.read_only = read_only
+        self._button_hover_row = -1
+        self.text_layouts = TextLayoutCache()
+
+    def _font(self, option):
+        """Return the task text font."""
+        font = QFont(option.font)
+        font.setPixelSize(self.FONT_PIXEL_SIZE)
+        return font
+
+    def _row_rect(self, rect):
+        """Return the rounded background rect inside the row."""
+        return rect.adjusted(self.ROW_MARGIN, self.ROW_MARGIN,
+                             -self.ROW_MARGIN, -self.ROW_MARGIN)
+
+    def _check_rect(self, rect):
+        """Return the checkbox indicator rect for a row."""
+        row = self._row_rect(rect)
+        top = row.top() + (row.height() - self.CHECK_SIZE) // 2
+        return QRect(row.left() + self.PADDING, top,
+                     self.CHECK_SIZE, self.CHECK_SIZE)
+
+    def _button_rect(self, rect):
+        """Return the delete button rect for a row."""
+        row = self._row_rect(rect)
+        top = row.top() + (row.height() - self.BUTTON_SIZE) // 2
+        return QRect(row.right() - self.PADDING - self.BUTTON_SIZE + 1, top,
+                     self.BUTTON_SIZE, self.BUTTON_SIZE)
+
+    def _text_width(self, width):
+        """Return the available width for task text in a row of given width."""
+        return max(1, width - 2 * self.ROW_MARGIN - 2 * self.PADDING
+                   - self.CHECK_SIZE - self.BUTTON_SIZE - 2 * self.SPACING)
+
+    def _text_rect(self, rect):
+        """Return the text rect for a row."""
+        row = self._row_rect(rect)
+        left = row.left() + self.PADDING + self.CHECK_SIZE + self.SPACING
+        return QRect(left, row.top(), self._text_width(rect.width()), row.height())
+
+    def sizeHint(self, option, index):
+        """Return the row size, growing with wrapped text height."""
+        width = self.view.viewport().width()
+        text = index.data(Qt.DisplayRole) or ""
+        height = self.text_layouts.height(text, self._text_width(width), self._font(option))
+        height += 2 * (self.ROW_MARGIN + self.PADDING)
+        return QSize(width, max(self.MIN_HEIGHT, height))
+
+    def paint(self, painter, option, index):
+        """Paint the row background, hover glass, checkbox, text and button."""
+        started = time.perf_counter()
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        hovering = bool(option.state & QStyle.State_MouseOver)
+        selected = bool(option.state & QStyle.State_Selected)
+        checked = index.data(TaskListModel.CheckedRole)
+        rect = option.rect
+
+        # Row background
+        row = QRectF(self._row_rect(rect))
+        bg_path = QPainterPath()
+        bg_path.addRoundedRect(row, 10, 10)
+        if selected:
+            background = "#e4efe9"
+        else:
+            background = "#efefef" if hovering else "#f0f0f0"
+        painter.fillPath(bg_path, QColor(background))
+
+        if hovering:
+            painter.drawPixmap(rect.topLeft(), glass_overlay(
+                rect.width(), rect.height(), self.view.devicePixelRatioF()))
+
+        self._paint_checkbox(painter, self._check_rect(rect), checked, hovering)
+
+        # Task text, with words matching the filter highlighted
+        text = index.data(Qt.DisplayRole) or ""
+        terms = getattr(index.model(), "filter_terms", ())
+        spans = match_spans(text, terms) if terms else None
+        font = self._font(option)
+        text_rect = self._text_rect(rect)
+        painter.setFont(font)
+        painter.setPen(QColor("#444444"))
+        if spans:
+            self._paint_highlighted_text(painter, text_rect, text, spans, font)
+        elif text:
+            static = self.text_layouts.layout(text, text_rect.width(), font)
+            top = text_rect.top() + (text_rect.height() - static.size().height()) / 2
+            painter.drawStaticText(QPointF(text_rect.left(), top), static)
+
+        if not self.read_only:
+            button_hover = hovering and self._button_rect(rect).contains(
+                self.view.viewport().mapFromGlobal(QCursor.pos()))
+            self._paint_delete_button(painter, self._button_rect(rect), option, button_hover)
+
+        painter.restore()
+        metrics.observe("paint.row.seconds", time.perf_counter() - started)
+
+    def _paint_highlighted_text(self, painter, rect, text, spans, font):
+        """Paint word-wrapped text with a background behind the given spans."""
+        highlight = QTextCharFormat()
+        highlight.setBackground(QColor(self.HIGHLIGHT_COLOR))
+        formats = []
+        for start, length in spans:
+            span = QTextLayout.FormatRange()
+            span.start, span.length, span.format = start, length, highlight
+            formats.append(span)
+
+        option = QTextOption(Qt.AlignLeft)
+        option.setWrapMode(QTextOption.WordWrap)
+        layout = QTextLayout(text, font)
+        layout.setTextOption(option)
+        layout.setFormats(formats)
+
+        height = 0.0
+        layout.beginLayout()
+        while True:
+            line = layout.createLine()
+            if not line.isValid():
+                break
+            line.setLineWidth(rect.width())
+            line.setPosition(QPointF(0, height))
+            height += line.height()
+        layout.endLayout()
+
+        layout.draw(painter, QPointF(rect.left(), rect.top() + (rect.height() - height) / 2))
+
+    def _paint_checkbox(self, painter, rect, checked, hovering):
+        """Paint the checkbox indicator."""
+        if checked:
+            fill, border = ("#5aaa8a", "#4a9a7a") if hovering else ("#68b99a", "#5aaa8a")
+        else:
+            fill, border = ("#e8e8e8", "#c0c0c0") if hovering else ("#f0f0f0", "#d0d0d0")
+
+        path = QPainterPath()
+        path.addRoundedRect(QRectF(rect).adjusted(0.5, 0.5, -0.5, -0.5), 5, 5)
+        painter.fillPath(path, QColor(fill))
+        painter.setPen(QPen(QColor(border), 1))
+        painter.drawPath(path)
+
+    def _paint_delete_button(self, painter, rect, option, hovering):
+        """Paint the × delete button, highlighted when the cursor is over it."""
+        if hovering:
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor("#e0e0e0"))
+            painter.drawEllipse(QRectF(rect))
+
+        font = QFont(option.font)
+        font.setPixelSize(self.DELETE_GLYPH_PIXEL_SIZE)
+        painter.setFont(font)
+        painter.setPen(QColor("#cc5555" if hovering else "#bbbbbb"))
+        painter.drawText(rect, Qt.AlignCenter, "×")
+
+    def createEditor(self, parent, option, index):
+        """Create the inline line edit used to change a task's text."""
+        editor = QLineEdit(parent)
+        editor.setStyleSheet(Styles.TASK_EDITOR)
+        editor.setFont(self._font(option))
+        return editor
+
+    def updateEditorGeometry(self, editor, option, index):
+        """Place the editor over the task text."""
+        text_rect = self._text_rect(option.rect)
+        height = editor.sizeHint().height()
+        top = text_rect.top() + (text_rect.height() - height) // 2
+        editor.setGeometry(text_rect.left() - 4, top, text_rect.width() + 8, height)
+
+    def editorEvent(self, event, model, option, index):
+        """Hit-test clicks on the checkbox and delete button."""
+        if self.read_only:
+            return False
+        event_type = event.type()
+
+        if event_type == QEvent.MouseMove:
+            row = index.row() if self._button_rect(option.rect).contains(event.pos()) else -1
+            if row != self._button_hover_row:
+                self._button_hover_row = row
+                self.view.viewport().update(option.rect)
+            return False
+
+        if event_type not in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease,
+                              QEvent.MouseButtonDblClick):
+            return False
+        if event.button() != Qt.LeftButton:
+            return False
+
+        on_check = self._check_rect(option.rect).contains(event.pos())
+        on_button = self._button_rect(option.rect).contains(event.pos())
+        if not (on_check or on_button):
+            return False
+
+        if event_type == QEvent.MouseButtonRelease:
+            if on_check:
+                model.toggle_row(index.row())
+            else:
+                self.delete_requested.emit(index.row())
+        return True
@@ -0,0 +1,39 @@
+"""
+TaskInput widget - Line edit for new tasks that accepts multi-line pastes.
+"""
+
+from PyQt5.QtWidgets import QLineEdit, QApplication
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtGui import QKeySequence
+
+
+class TaskInput(QLineEdit):
+    """
+    Task entry field. Pasting text with several lines emits lines_pasted
+    instead of squashing the block into one task.
+
+    Args:
+        parent (QWidget, optional): Parent widget
+    """
+
+    lines_pasted = pyqtSignal(list)
+
+    def keyPressEvent(self, event):
+        """Intercept paste shortcuts carrying multi-line text."""
+        if event.matches(QKeySequence.Paste) and self._paste_lines():
+            return
+        super().keyPressEvent(event)
+
+    def paste(self):
+        """Paste from the clipboard, splitting multi-line text into tasks."""
+        if not self._paste_lines():
+            super().paste()
+
+    def _paste_lines(self):
+        """Emit lines_pasted if the clipboard holds several lines."""
+        lines = [line.strip() for line in QApplication.clipboard().text().splitlines()]
+        lines = [line for line in lines if line]
+        if len(lines) < 2:
+            return False
+        self.lines_pasted.emit(lines)
+        return True
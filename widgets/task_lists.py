@@ -0,0 +1,137 @@
+"""
+Open task lists - In-memory state of the task lists the window has opened.
+
+Each open list has its own storage backend, TaskStore, model and
+background writer. Only the most recently used lists stay open; the rest
+are flushed, closed and dropped, so memory follows the lists in use rather
+than every stored list.
+"""
+
+from collections import OrderedDict
+
+import logging
+import sys
+import os
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import metrics
+from storage import PersistenceWorker, TaskStore, open_archive
+from widgets.task_model import TaskListModel
+
+log = logging.getLogger(__name__)
+
+
+class OpenTaskList:
+    """
+    A task list materialized in memory.
+
+    Args:
+        storage (TaskStorage): Backend holding the list
+        save_delay (float): Quiet window in seconds before changes are written
+        parent (QObject, optional): Parent of the list's model
+    """
+
+    def __init__(self, storage, save_delay=0.25, parent=None):
+        self.storage = storage
+        self.store = TaskStore()
+        self.model = TaskListModel(self.store, parent)
+        self.persistence = PersistenceWorker(self._save, delay=save_delay)
+        self.persistence.start()
+        # Set once every stored task has been loaded into the model
+        self.loaded = False
+        # Vertical scroll offset of the view while the list is in the background
+        self.scroll_value = 0
+        self._archive = None
+
+    @property
+    def name(self):
+        """Return the list name."""
+        return self.storage.list_name
+
+    @property
+    def archive(self):
+        """Return the list's archive of completed tasks, opened on first use."""
+        if self._archive is None:
+            self._archive = open_archive(self.storage.name, self.storage.list_name)
+        return self._archive
+
+    def _save(self, records):
+        """Apply a batch of records to storage, recording its cost (writer thread)."""
+        written = self.storage.bytes_written
+        started = time.perf_counter()
+        self.storage.apply(records)
+        elapsed = time.perf_counter() - started
+        written = self.storage.bytes_written - written
+        metrics.observe("save.seconds", elapsed)
+        metrics.count("save.batches")
+        metrics.count("save.records", len(records))
+        metrics.count("save.bytes", written)
+        log.debug("Saved %d records (%d bytes) to %s in %.1f ms",
+                  len(records), written, self.storage.location, elapsed * 1000)
+
+    def close(self):
+        """Write pending changes and release the storage backend."""
+        self.persistence.stop()
+        self.storage.close()
+        self.model.deleteLater()
+
+
+class OpenTaskLists:
+    """
+    Least-recently-used set of open task lists.
+
+    Args:
+        capacity (int): Number of lists kept open, including the active one
+    """
+
+    def __init__(self, capacity=3):
+        self.capacity = capacity
+        self._lists = OrderedDict()
+
+    def __len__(self):
+        return len(self._lists)
+
+    def __contains__(self, name):
+        return name in self._lists
+
+    def __iter__(self):
+        """Yield open lists, least recently used first."""
+        return iter(list(self._lists.values()))
+
+    def get(self, name):
+        """Return an open list and mark it most recently used, or None."""
+        open_list = self._lists.get(name)
+        if open_list is not None:
+            self._lists.move_to_end(name)
+        return open_list
+
+    def add(self, open_list):
+        """
+        Add a list as the most recently used, closing the least recently
+        used ones beyond capacity.
+
+        Returns:
+            list: Names of the lists that were closed
+        """
+        self._lists[open_list.name] = open_list
+        self._lists.move_to_end(open_list.name)
+        evicted = []
+        while len(self._lists) > self.capacity:
+            name, oldest = self._lists.popitem(last=False)
+            oldest.close()
+            evicted.append(name)
+        return evicted
+
+    def discard(self, name):
+        """Close and drop a list if it is open."""
+        open_list = self._lists.pop(name, None)
+        if open_list is not None:
+            open_list.close()
+
+    def close_all(self):
+        """Close every open list."""
+        for open_list in self:
+            open_list.close()
+        self._lists.clear()
@@ -0,0 +1,662 @@
+"""
+TaskListModel - Item model exposing a TaskStore to the task list view.
+"""
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, pyqtSignal
+
+from bisect import bisect_left
+
+from storage.tasks import new_task
+from storage.task_store import TaskStore
+from storage.history import UndoHistory
+from storage.text_index import query_terms, refines, matches
+from storage.journal import (add_record, remove_record, checked_record, edit_record,
+                             remove_many_record, checked_many_record, clear_record,
+                             insert_record, expand_record, move_record, rebalance_record)
+
+
+class TaskListModel(QAbstractListModel):
+    """
+    List model presenting the tasks of a TaskStore. The store is the single
+    source of truth; the model only translates rows and emits change
+    notifications. Only the rows visible in the attached view are ever
+    painted, so the cost of a task is a few column entries in the store.
+
+    While a filter is set, model rows are the matching tasks only and are
+    mapped to store rows through a list of visible store rows. Tasks added
+    while filtering are shown until the filter changes.
+
+    Every change made through the model is recorded in an undo history as
+    the journal records reverting it; undo() and redo() replay those.
+
+    Rows can be dragged to a new place while no filter is set and
+    moves_enabled is True. The order lives in the tasks' sort keys, so a
+    move changes one key and writes one journal record, whatever the size
+    of the list.
+
+    Args:
+        store (TaskStore, optional): Store to present; a new one by default
+        parent (QObject, optional): Parent object
+        history (UndoHistory, optional): Undo history; a new one by default
+    """
+
+    CheckedRole = Qt.UserRole + 1
+    IdRole = Qt.UserRole + 2
+
+    # Emitted after any change that should be persisted, with the
+    # journal records describing it
+    tasks_changed = pyqtSignal(object)
+
+    # Changes from other processes touching more tasks than this are
+    # applied under one model reset instead of row by row
+    PATCH_LIMIT = 256
+
+    def __init__(self, store=None, parent=None, history=None):
+        super().__init__(parent)
+        self.store = store if store is not None else TaskStore()
+        self.history = history if history is not None else UndoHistory()
+        self.filter_terms = ()
+        self._visible = None
+        self.moves_enabled = True
+
+    def rowCount(self, parent=QModelIndex()):
+        """Return the number of shown tasks (the model is flat)."""
+        if parent.isValid():
+            return 0
+        if self._visible is not None:
+            return len(self._visible)
+        return len(self.store)
+
+    def _store_row(self, row):
+        """Map a model row to a store row."""
+        return row if self._visible is None else self._visible[row]
+
+    def is_filtered(self):
+        """Return True while a filter hides some tasks."""
+        return self._visible is not None
+
+    def _movable(self):
+        """Return True if rows can be moved right now."""
+        return self.moves_enabled and self._visible is None
+
+    def set_filter(self, query):
+        """
+        Show only tasks with a word starting with each word of the query.
+
+        Uses the store's word index, so a keystroke costs a set lookup per
+        query word; a query that narrows the previous one only re-checks
+        the rows already shown.
+
+        Args:
+            query (str): Filter text; blank shows every task
+        """
+        terms = query_terms(query)
+        if terms == self.filter_terms:
+            return
+        self.beginResetModel()
+        if not terms:
+            self._visible = None
+        else:
+            ids = self.store.text_index().search(terms)
+            within = self._visible if refines(terms, self.filter_terms) else None
+            self._visible = self.store.rows_of(ids, within)
+        self.filter_terms = terms
+        self.endResetModel()
+
+    def _refilter(self, keep_ids=None):
+        """
+        Recompute the visible rows after the store changed under a reset.
+
+        Args:
+            keep_ids (set, optional): Show exactly these tasks instead of
+                searching the index again
+        """
+        if self._visible is None:
+            return
+        if keep_ids is None:
+            keep_ids = self.store.text_index().search(self.filter_terms)
+        self._visible = self.store.rows_of(keep_ids)
+
+    def _model_row(self, store_row):
+        """Map a store row to a model row, or -1 if the task is filtered out."""
+        if self._visible is None:
+            return store_row
+        pos = bisect_left(self._visible, store_row)
+        if pos < len(self._visible) and self._visible[pos] == store_row:
+            return pos
+        return -1
+
+    def _visible_ids(self):
+        """Return the IDs of the shown tasks."""
+        return set(map(self.store.id_at, self._visible))
+
+    def _changed(self, records, undo):
+        """Record a change in the history and have it persisted."""
+        self.history.push(undo, records)
+        self.tasks_changed.emit(records)
+
+    def data(self, index, role=Qt.DisplayRole):
+        """Return task text, checked state or ID for the given role."""
+        if not index.isValid():
+            return None
+        row = self._store_row(index.row())
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self.store.text_at(row)
+        if role == self.CheckedRole:
+            return self.store.checked_at(row)
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if self.store.checked_at(row) else Qt.Unchecked
+        if role == self.IdRole:
+            return self.store.id_at(row)
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        """Update the text or checked state of a task."""
+        if not index.isValid():
+            return False
+        if role == Qt.EditRole:
+            return self.edit_row(index.row(), value)
+        if role == Qt.CheckStateRole:
+            value = value == Qt.Checked
+            role = self.CheckedRole
+        if role != self.CheckedRole:
+            return False
+
+        row = self._store_row(index.row())
+        if self.store.checked_at(row) == bool(value):
+            return True
+        task_id = self.store.id_at(row)
+        self.store.set_checked(task_id, bool(value))
+        self.dataChanged.emit(index, index, [self.CheckedRole, Qt.CheckStateRole])
+        self._changed([checked_record(task_id, bool(value))],
+                      [checked_record(task_id, not value)])
+        return True
+
+    def flags(self, index):
+        """Rows are selectable, checkable and editable, and draggable while movable."""
+        if not index.isValid():
+            # Drops land between rows
+            return Qt.ItemIsDropEnabled if self._movable() else Qt.NoItemFlags
+        flags = (Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+                 | Qt.ItemIsEditable)
+        if self._movable():
+            flags |= Qt.ItemIsDragEnabled
+        return flags
+
+    def supportedDropActions(self):
+        """Rows are only ever moved within the list."""
+        return Qt.MoveAction
+
+    def add_task(self, text, checked=False):
+        """
+        Append a task to the end of the list.
+
+        Args:
+            text (str): The task description text
+            checked (bool): Initial completion state
+
+        Returns:
+            int: Row of the new task
+        """
+        task = new_task(text, checked)
+        row = self.rowCount()
+        self.beginInsertRows(QModelIndex(), row, row)
+        store_row = self.store.append(task)
+        task["order"] = self.store.order_at(store_row)
+        if self._visible is not None:
+            self._visible.append(store_row)
+        self.endInsertRows()
+        self._changed([add_record(task)], [remove_record(task["id"])])
+        return row
+
+    def remove_row(self, row):
+        """
+        Remove the task at the given row.
+
+        Args:
+            row (int): Row to remove
+        """
+        if not 0 <= row < self.rowCount():
+            return
+        store_row = self._store_row(row)
+        task = self.store.task_at(store_row).to_dict()
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.store.remove(task["id"])
+        if self._visible is not None:
+            del self._visible[row]
+            self._visible[row:] = [r - 1 for r in self._visible[row:]]
+        self.endRemoveRows()
+        self._changed([remove_record(task["id"])], [insert_record([store_row], [task])])
+
+    def edit_row(self, row, text):
+        """
+        Change the text of the task at the given row.
+
+        Args:
+            row (int): Row to edit
+            text (str): New task text; blank text is ignored
+
+        Returns:
+            bool: True if the row holds the given text afterwards
+        """
+        text = (text or "").strip()
+        if not text or not 0 <= row < self.rowCount():
+            return False
+        store_row = self._store_row(row)
+        if self.store.text_at(store_row) == text:
+            return True
+        task_id = self.store.id_at(store_row)
+        old_text = self.store.text_at(store_row)
+        self.store.set_text(task_id, text)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        self._changed([edit_record(task_id, text)], [edit_record(task_id, old_text)])
+        return True
+
+    def move_row(self, row, to):
+        """
+        Move the task at a row so it ends up at another row.
+
+        Only the moved task's sort key changes, unless earlier moves used up
+        the room between its new neighbours: then theirs are spread out
+        too, in the same journal step (see TaskStore.order_for_move()).
+
+        Args:
+            row (int): Row of the task to move
+            to (int): Row it should end up at
+
+        Returns:
+            bool: True if the task moved
+        """
+        count = self.rowCount()
+        if not self._movable() or not (0 <= row < count and 0 <= to < count) or row == to:
+            return False
+        store = self.store
+        task_id = store.id_at(row)
+        old_order = store.order_at(row)
+        order, task_ids, orders = store.order_for_move(task_id, to)
+        records, undo = [], []
+        if task_ids:
+            undo.append(rebalance_record(task_ids, [store.order_at(store.row_of(other))
+                                                    for other in task_ids]))
+            store.set_orders(task_ids, orders)
+            records.append(rebalance_record(task_ids, orders))
+        self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), to + 1 if to > row else to)
+        store.move(task_id, order)
+        self.endMoveRows()
+        records.append(move_record(task_id, order))
+        undo.append(move_record(task_id, old_order))
+        self._changed(records, undo)
+        return True
+
+    def moveRows(self, sourceParent, sourceRow, count, destinationParent, destinationChild):
+        """
+        Move rows to before destinationChild, one move_row() step per row.
+
+        This is what a view's internal drag and drop calls.
+        """
+        if sourceParent.isValid() or destinationParent.isValid() or count < 1:
+            return False
+        if sourceRow <= destinationChild <= sourceRow + count:
+            return False
+        moved = False
+        for i in range(count):
+            if destinationChild < sourceRow:
+                moved |= self.move_row(sourceRow + i, destinationChild + i)
+            else:
+                moved |= self.move_row(sourceRow, destinationChild - 1)
+        return moved
+
+    def set_checked_id(self, task_id, checked):
+        """
+        Set the completion state of a task by ID, shown or not.
+
+        Returns:
+            bool: False if the task is not in the list
+        """
+        store_row = self.store.row_of(task_id)
+        if store_row < 0:
+            return False
+        if self.store.checked_at(store_row) == bool(checked):
+            return True
+        self.store.set_checked(task_id, bool(checked))
+        row = self._model_row(store_row)
+        if row >= 0:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [self.CheckedRole, Qt.CheckStateRole])
+        self._changed([checked_record(task_id, bool(checked))],
+                      [checked_record(task_id, not checked)])
+        return True
+
+    def toggle_row(self, row):
+        """Flip the completion state of the task at the given row."""
+        index = self.index(row)
+        self.setData(index, not self.store.checked_at(self._store_row(row)), self.CheckedRole)
+
+    def add_tasks(self, texts):
+        """
+        Append several tasks with one insert notification.
+
+        Args:
+            texts (iterable): Task texts; blank ones are skipped
+
+        Returns:
+            int: Number of tasks added
+        """
+        tasks = [new_task(text.strip()) for text in texts if text.strip()]
+        if not tasks:
+            return 0
+        row = self.rowCount()
+        store_row = len(self.store)
+        self.beginInsertRows(QModelIndex(), row, row + len(tasks) - 1)
+        for task in tasks:
+            task["order"] = self.store.order_at(self.store.append(task))
+        if self._visible is not None:
+            self._visible.extend(range(store_row, store_row + len(tasks)))
+        self.endInsertRows()
+        self._changed([add_record(task) for task in tasks],
+                      [remove_many_record(task["id"] for task in tasks)])
+        return len(tasks)
+
+    def remove_ids(self, task_ids):
+        """
+        Remove several tasks with one model reset and one journal record.
+
+        Args:
+            task_ids (iterable): IDs of the tasks to remove
+
+        Returns:
+            int: Number of tasks removed
+        """
+        task_ids = [task_id for task_id in task_ids if task_id in self.store]
+        if not task_ids:
+            return 0
+        rows = self.store.rows_of(set(task_ids))
+        restore = insert_record(rows, [self.store.task_at(row).to_dict() for row in rows])
+        self.beginResetModel()
+        keep_ids = None if self._visible is None else self._visible_ids()
+        removed = self.store.remove_many(task_ids)
+        if keep_ids is not None:
+            self._refilter(keep_ids.difference(removed))
+        self.endResetModel()
+        self._changed([remove_many_record(removed)], [restore])
+        return len(removed)
+
+    def archive_ids(self, task_ids):
+        """
+        Remove tasks that were moved to the archive.
+
+        Not recorded in the undo history: the tasks live on in the archive.
+
+        Args:
+            task_ids (iterable): IDs of the archived tasks
+
+        Returns:
+            int: Number of tasks removed
+        """
+        task_ids = [task_id for task_id in task_ids if task_id in self.store]
+        if task_ids:
+            self._replay([remove_many_record(task_ids)])
+        return len(task_ids)
+
+    def remove_rows(self, rows):
+        """Remove the tasks at several rows (see remove_ids)."""
+        return self.remove_ids([self.store.id_at(self._store_row(row)) for row in rows
+                                if 0 <= row < self.rowCount()])
+
+    def clear_completed(self):
+        """Remove every completed task. Returns the number removed."""
+        return self.remove_ids(self.store.checked_ids())
+
+    def set_all_checked(self, checked):
+        """
+        Check or uncheck every task with one change notification.
+
+        Returns:
+            int: Number of tasks whose state changed
+        """
+        changed = self.store.set_checked_many(self.store.checked_ids(not checked), checked)
+        if not changed:
+            return 0
+        if self.rowCount() > 0:
+            # A filter may hide every changed task
+            self.dataChanged.emit(self.index(0), self.index(self.rowCount() - 1),
+                                  [self.CheckedRole, Qt.CheckStateRole])
+        self._changed([checked_many_record(changed, checked)],
+                      [checked_many_record(changed, not checked)])
+        return len(changed)
+
+    def replace_tasks(self, tasks):
+        """
+        Replace the whole list, persisting it as a clear plus adds.
+
+        Args:
+            tasks (list): Task dicts; tasks without an "id" get a new one
+        """
+        tasks = [task if "id" in task else new_task(task["text"], task.get("checked", False))
+                 for task in tasks]
+        old = self.store.to_dicts()
+        self.set_tasks(tasks)
+        self._changed([clear_record()] + [add_record(task) for task in tasks],
+                      [clear_record(), insert_record(range(len(old)), old)])
+
+    def set_tasks(self, tasks):
+        """
+        Replace all tasks in one model reset.
+
+        Args:
+            tasks (list): Task dicts as returned by the storage backend
+        """
+        self.beginResetModel()
+        self.store.clear()
+        self.store.extend(tasks)
+        self._refilter()
+        self.endResetModel()
+
+    def insert_tasks(self, row, tasks):
+        """
+        Insert already-stored tasks at a row without emitting tasks_changed.
+        Used to stream tasks in while loading.
+
+        Args:
+            row (int): Store row to insert before
+            tasks (list): Task dicts as returned by the storage backend
+        """
+        if not tasks:
+            return
+        if self._visible is None:
+            self.beginInsertRows(QModelIndex(), row, row + len(tasks) - 1)
+            self.store.insert(row, tasks, loaded=True)
+            self.endInsertRows()
+            return
+
+        # Shown rows after the insertion point move down; matching new
+        # tasks are shown in one contiguous block
+        shown = [row + i for i, task in enumerate(tasks)
+                 if matches(task["text"], self.filter_terms)]
+        pos = bisect_left(self._visible, row)
+        if shown:
+            self.beginInsertRows(QModelIndex(), pos, pos + len(shown) - 1)
+        self.store.insert(row, tasks, loaded=True)
+        self._visible[pos:] = shown + [r + len(tasks) for r in self._visible[pos:]]
+        if shown:
+            self.endInsertRows()
+
+    def apply_records(self, records):
+        """
+        Apply journal records written by another process, without emitting
+        tasks_changed or touching the undo history. A few changes are
+        patched in row by row; many, a clear or an active filter take one
+        model reset.
+
+        Args:
+            records (list): Journal records in the order they were written
+        """
+        records = [single for bulk in records for single in expand_record(bulk)]
+        if not records:
+            return
+        changes = sum(len(record.get("tasks", ())) or 1 for record in records)
+        if (self._visible is not None or changes > self.PATCH_LIMIT
+                or any(record.get("op") == "clear" for record in records)):
+            self.beginResetModel()
+            for record in records:
+                self._apply_record(record, notify=False)
+            self._refilter()
+            self.endResetModel()
+        else:
+            for record in records:
+                self._apply_record(record, notify=True)
+
+    def _apply_record(self, record, notify):
+        """
+        Apply one journal record without "ids" to the store.
+
+        Args:
+            record (dict): Single-task, clear or insert record
+            notify (bool): Emit row notifications; only while unfiltered
+        """
+        op = record.get("op")
+        task_id = record.get("id")
+        store = self.store
+        if op == "clear":
+            store.clear()
+        elif op == "add":
+            if task_id in store:
+                return
+            order = record.get("order")
+            # Equal keys (tasks added at once elsewhere) go by ID, as on disk
+            row = len(store) if order is None else store.order_row(order, task_id)
+            if notify:
+                self.beginInsertRows(QModelIndex(), row, row)
+            store.append({"id": task_id, "text": record["text"],
+                          "checked": bool(record.get("checked", False)),
+                          "created": record.get("created", 0.0), "order": order})
+            if notify:
+                self.endInsertRows()
+        elif op == "insert":
+            placed = [(row, task) for row, task in zip(record["rows"], record["tasks"])
+                      if task["id"] not in store]
+            if not notify:
+                store.insert_rows([row for row, _ in placed], [task for _, task in placed])
+                return
+            for row, task in placed:
+                row = min(row, len(store))
+                self.beginInsertRows(QModelIndex(), row, row)
+                store.insert(row, [task])
+                self.endInsertRows()
+        elif op == "remove":
+            row = store.row_of(task_id)
+            if row < 0:
+                return
+            if notify:
+                self.beginRemoveRows(QModelIndex(), row, row)
+            store.remove(task_id)
+            if notify:
+                self.endRemoveRows()
+        elif op == "move":
+            if task_id not in store:
+                return
+            if not notify:
+                store.move(task_id, record["order"])
+                return
+            row, to = store.row_of(task_id), store.move_row(task_id, record["order"])
+            if row != to:
+                self.beginMoveRows(QModelIndex(), row, row, QModelIndex(),
+                                   to + 1 if to > row else to)
+            store.move(task_id, record["order"])
+            if row != to:
+                self.endMoveRows()
+        elif op == "rebalance":
+            store.set_orders([task_id], [record["order"]])
+        elif op in ("check", "uncheck"):
+            row = store.set_checked(task_id, op == "check")
+            if notify and row >= 0:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [self.CheckedRole, Qt.CheckStateRole])
+        elif op == "edit":
+            row = store.set_text(task_id, record["text"])
+            if notify and row >= 0:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+
+    def undo(self):
+        """
+        Revert the most recent change made through the model.
+
+        The step is replayed as one batch: a bulk clear of thousands of
+        tasks comes back with one model reset and one tasks_changed.
+
+        Returns:
+            bool: True if there was a change to undo
+        """
+        return self._replay(self.history.undo())
+
+    def redo(self):
+        """
+        Make the most recently undone change again.
+
+        Returns:
+            bool: True if there was a change to redo
+        """
+        return self._replay(self.history.redo())
+
+    def _replay(self, records):
+        """Apply undo or redo records and have them persisted."""
+        if records is None:
+            return False
+        self.apply_records(records)
+        self.tasks_changed.emit(records)
+        return True
+
+    def sync_tasks(self, tasks):
+        """
+        Bring the store in line with tasks re-read from storage, patching
+        in only what differs, without emitting tasks_changed. Falls back
+        to set_tasks() when tasks were reordered or too much changed.
+
+        Args:
+            tasks (list): Task dicts in display order, as from TaskStorage.load()
+        """
+        store = self.store
+        wanted = {task["id"]: task for task in tasks}
+        current = store.ids()
+        removed = [task_id for task_id in current if task_id not in wanted]
+        kept = [task["id"] for task in tasks if task["id"] in store]
+        added = len(tasks) - len(kept)
+        if (len(wanted) != len(tasks) or len(removed) + added > self.PATCH_LIMIT
+                or kept != [task_id for task_id in current if task_id in wanted]):
+            # Duplicate IDs in the file, many tasks coming and going, or a new order
+            self.set_tasks(tasks)
+            return
+
+        records = [remove_many_record(removed)] if removed else []
+        for task_id in kept:
+            task = wanted[task_id]
+            row = store.row_of(task_id)
+            if store.checked_at(row) != bool(task["checked"]):
+                records.append(checked_record(task_id, task["checked"]))
+            if store.text_at(row) != task["text"]:
+                records.append(edit_record(task_id, task["text"]))
+        # Same order, but another process may have spread the keys out
+        respread = [task_id for task_id in kept if wanted[task_id].get("order") is not None
+                    and wanted[task_id]["order"] != store.order_at(store.row_of(task_id))]
+        if respread:
+            records.append(rebalance_record(respread,
+                                            [wanted[task_id]["order"] for task_id in respread]))
+
+        self.apply_records(records)
+        # New tasks go before the kept task that follows them in the file
+        run = []
+        for task in tasks:
+            if task["id"] in store:
+                if run:
+                    self.insert_tasks(store.row_of(task["id"]), run)
+                    run = []
+            else:
+                run.append(task)
+        if run:
+            self.insert_tasks(len(store), run)
+
+    def tasks(self):
+        """Return all tasks as a list of storage dicts."""
+        return self.store.to_dicts()